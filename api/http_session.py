@@ -0,0 +1,53 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.app_config import AppConfig
+
+# Transient server-side failures worth retrying. 429 is left to the caller so
+# it can apply its own jittered backoff on top of the Retry-After hint.
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+
+def create_session(pool_size: int = AppConfig.HTTP_POOL_SIZE,
+                   max_retries: int = AppConfig.HTTP_MAX_RETRIES,
+                   backoff_factor: float = AppConfig.HTTP_BACKOFF_FACTOR) -> requests.Session:
+    """
+    Create a pooled, keep-alive HTTP session with a retry policy.
+
+    The session keeps up to ``pool_size`` connections per host alive, so repeated
+    requests reuse the TCP+TLS connection instead of handshaking every time.
+    Connection resets, read errors and 5xx responses are retried with exponential
+    backoff, honoring the ``Retry-After`` header when the server sends one.
+
+    Args:
+        pool_size (int): Number of connections to keep alive per host
+        max_retries (int): Maximum number of retries for connection errors and 5xx responses
+        backoff_factor (float): Backoff factor between retries (seconds)
+
+    Returns:
+        requests.Session: Session with the pooled adapter mounted for http and https
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        # POST is only used for read-only batch lookups, so it is safe to retry
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def default_timeout() -> tuple:
+    """Return the default (connect, read) timeout tuple for HTTP requests."""
+    return AppConfig.HTTP_CONNECT_TIMEOUT, AppConfig.HTTP_READ_TIMEOUT
@@ -0,0 +1,169 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+
+class TokenBucketRateLimiter:
+    """
+    Client-side token-bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``. Callers that
+    find the bucket empty reserve a future token and sleep until it is due, so concurrent
+    callers are spaced out instead of bursting into the server's rate limit.
+
+    The bucket state lives in memory by default. With a ``state_path``, it is kept in a
+    SQLite file and updated in a write transaction, so every process on the host using
+    the same file draws from one budget.
+
+    The rate adapts to the server: each 429 halves it (down to ``min_rate``), and each
+    successful request restores a small fraction of the configured rate.
+    """
+
+    # Per-process instances returned by shared(), keyed by name
+    _shared_instances: Dict[str, "TokenBucketRateLimiter"] = {}
+    _shared_lock = threading.Lock()
+
+    DECREASE_FACTOR = 0.5
+    INCREASE_FRACTION = 0.05
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 state_path: Optional[str] = None, name: str = "default",
+                 min_rate: Optional[float] = None):
+        """
+        Initialize the TokenBucketRateLimiter class.
+
+        Args:
+            rate (float): Requests per second allowed by the API key's quota
+            capacity (float, optional): Maximum burst size in requests (default: max(1, rate))
+            state_path (str, optional): SQLite file to share the bucket between processes
+            name (str): Bucket name, so several limiters can share one state file
+            min_rate (float, optional): Lowest rate the limiter backs off to (default: rate / 16)
+        """
+        self.max_rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.name = name
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._state = {'tokens': self.capacity, 'updated_at': time.time(), 'rate': rate}
+        self._conn = None
+
+        if state_path:
+            directory = os.path.dirname(state_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Autocommit mode, transactions are opened explicitly with BEGIN IMMEDIATE
+            self._conn = sqlite3.connect(state_path, check_same_thread=False, timeout=30, isolation_level=None)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, rate REAL NOT NULL)"
+            )
+
+    @classmethod
+    def shared(cls, name: str, rate: float, capacity: Optional[float] = None,
+               state_path: Optional[str] = None) -> "TokenBucketRateLimiter":
+        """
+        Return the limiter shared by every caller in this process under the given name.
+
+        The first call creates the limiter; later calls return the same instance
+        and ignore the remaining arguments.
+
+        Args:
+            name (str): Bucket name
+            rate (float): Requests per second
+            capacity (float, optional): Maximum burst size in requests
+            state_path (str, optional): SQLite file to share the bucket between processes
+
+        Returns:
+            TokenBucketRateLimiter: The shared limiter
+        """
+        with cls._shared_lock:
+            if name not in cls._shared_instances:
+                cls._shared_instances[name] = cls(rate, capacity=capacity, state_path=state_path, name=name)
+            return cls._shared_instances[name]
+
+    @property
+    def rate(self) -> float:
+        """Current (possibly reduced) refill rate in requests per second."""
+        return self._update(lambda state, now: (state, state['rate']))
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, sleeping until they are available.
+
+        Args:
+            tokens (float): Number of tokens to take
+
+        Returns:
+            float: Number of seconds spent waiting
+        """
+        wait = self._update(lambda state, now: self._reserve(state, now, tokens))
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_rate_limited(self):
+        """Halve the refill rate and drain the bucket after the server answered 429."""
+        def decrease(state, now):
+            state = self._refill(state, now)
+            state['rate'] = max(self.min_rate, state['rate'] * self.DECREASE_FACTOR)
+            state['tokens'] = min(state['tokens'], 0.0)
+            return state, None
+        self._update(decrease)
+
+    def on_success(self):
+        """Recover part of the configured rate after a successful request."""
+        def increase(state, now):
+            if state['rate'] < self.max_rate:
+                state = self._refill(state, now)
+                state['rate'] = min(self.max_rate, state['rate'] + self.max_rate * self.INCREASE_FRACTION)
+            return state, None
+        self._update(increase)
+
+    def close(self):
+        """Close the SQLite connection of a shared-file limiter."""
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+
+    def _refill(self, state: Dict, now: float) -> Dict:
+        """Add the tokens accumulated since the last update, up to the bucket capacity."""
+        elapsed = max(0.0, now - state['updated_at'])
+        state['tokens'] = min(self.capacity, state['tokens'] + elapsed * state['rate'])
+        state['updated_at'] = now
+        return state
+
+    def _reserve(self, state: Dict, now: float, tokens: float) -> Tuple[Dict, float]:
+        """Take tokens, letting the balance go negative, and return how long to wait for them."""
+        state = self._refill(state, now)
+        state['tokens'] -= tokens
+        wait = -state['tokens'] / state['rate'] if state['tokens'] < 0 else 0.0
+        return state, wait
+
+    def _update(self, func: Callable[[Dict, float], Tuple[Dict, object]]):
+        """Apply func to the bucket state atomically, in memory or in the shared SQLite file."""
+        with self._lock:
+            now = time.time()
+            if self._conn is None:
+                self._state, result = func(dict(self._state), now)
+                return result
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at, rate FROM rate_limit_buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                state = dict(zip(('tokens', 'updated_at', 'rate'), row)) if row else dict(self._state)
+                state, result = func(state, now)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_limit_buckets (name, tokens, updated_at, rate) VALUES (?, ?, ?, ?)",
+                    (self.name, state['tokens'], state['updated_at'], state['rate'])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return result
@@ -0,0 +1,76 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from config.app_config import AppConfig
+from utils.sqlite_cache import SqliteCache
+
+# Parameters holding comma-separated lists whose order does not change the response
+LIST_PARAMS = ("fields", "fieldsOfStudy")
+
+
+class ResponseCache(SqliteCache):
+    """On-disk cache of Semantic Scholar JSON responses keyed by normalized query parameters."""
+
+    def __init__(self, path: str = AppConfig.RESPONSE_CACHE_PATH,
+                 ttl: float = AppConfig.RESPONSE_CACHE_TTL,
+                 max_bytes: int = AppConfig.RESPONSE_CACHE_MAX_BYTES):
+        """
+        Initialize the ResponseCache class.
+
+        Args:
+            path (str): Path of the SQLite cache file
+            ttl (float): Time-to-live of each cached response in seconds
+            max_bytes (int): Maximum total size of cached responses before LRU eviction
+        """
+        super().__init__(path, max_bytes=max_bytes, default_ttl=ttl)
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict[str, Any]) -> str:
+        """
+        Build a cache key from an endpoint and its query parameters.
+
+        The query is lower-cased with whitespace collapsed and list parameters are sorted,
+        so requests that only differ in formatting share a cache entry.
+
+        Args:
+            endpoint (str): Request URL without query string
+            params (dict): Query parameters of the request
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        normalized = {}
+        for name, value in params.items():
+            if name == "query":
+                value = " ".join(str(value).lower().split())
+            elif name in LIST_PARAMS:
+                value = sorted(item.strip() for item in str(value).split(",") if item.strip())
+            normalized[name] = value
+        payload = json.dumps([endpoint, normalized], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_response(self, endpoint: str, params: Dict[str, Any]) -> Optional[Any]:
+        """
+        Return the cached JSON response for a request.
+
+        Args:
+            endpoint (str): Request URL without query string
+            params (dict): Query parameters of the request
+
+        Returns:
+            The decoded JSON response, or None on a cache miss
+        """
+        value = self.get(self.make_key(endpoint, params))
+        return json.loads(value) if value is not None else None
+
+    def set_response(self, endpoint: str, params: Dict[str, Any], data: Any):
+        """
+        Store the JSON response of a request.
+
+        Args:
+            endpoint (str): Request URL without query string
+            params (dict): Query parameters of the request
+            data: Decoded JSON response
+        """
+        self.set(self.make_key(endpoint, params), json.dumps(data).encode("utf-8"))
@@ -1,27 +1,65 @@
 import requests
-from typing import Dict, List, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 import urllib.parse
 import time
 import random
 import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from api.http_session import create_session, default_timeout
+from api.rate_limiter import TokenBucketRateLimiter
+from api.response_cache import ResponseCache
+from config.app_config import AppConfig
 
 class SemanticScholarClient:
     """Client for interacting with the Semantic Scholar API."""
 
     BASE_URL = "https://api.semanticscholar.org/graph/v1"
+    # Relevance search returns at most 100 papers per page and only the first 1000 results
+    MAX_PAGE_SIZE = 100
+    MAX_SEARCH_RESULTS = 1000
+    # The batch endpoint accepts at most 500 IDs per request
+    MAX_BATCH_SIZE = 500
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None,
+                 session: Optional[requests.Session] = None,
+                 timeout: Optional[Tuple[float, float]] = None,
+                 cache: Optional[ResponseCache] = None,
+                 rate_limiter: Optional[TokenBucketRateLimiter] = None):
         """
         Initialize the Semantic Scholar API client.
 
         Args:
             api_key (str, optional): API key for authenticated requests.
                                     Higher rate limits with an API key.
+            session (requests.Session, optional): Pooled HTTP session to use. A new pooled
+                                    session with the default retry policy is created if omitted.
+            timeout (tuple, optional): (connect, read) timeout in seconds for every request
+            cache (ResponseCache, optional): On-disk response cache. Cached searches skip the network.
+            rate_limiter (TokenBucketRateLimiter, optional): Limiter paced before every request.
+                                    Defaults to the limiter shared by all clients in the process.
         """
         self.api_key = api_key
+        # The API key is sent per request rather than set on the session, so the
+        # session can be shared with other hosts without leaking the key.
         self.headers = {}
         if api_key:
             self.headers["x-api-key"] = api_key
+        self.session = session or create_session()
+        self.timeout = timeout or default_timeout()
+        self.cache = cache
+        self.rate_limiter = rate_limiter or TokenBucketRateLimiter.shared(
+            "semantic_scholar",
+            rate=AppConfig.S2_RATE_LIMIT,
+            capacity=AppConfig.S2_RATE_LIMIT_BURST,
+            state_path=AppConfig.S2_RATE_LIMIT_STATE_PATH
+        )
+
+    def close(self):
+        """Close the underlying HTTP session and release pooled connections."""
+        self.session.close()
 
     def search_papers(
             self,
@@ -90,23 +128,119 @@ class SemanticScholarClient:
         if fields and len(fields) > 0:
             params["fields"] = ",".join(fields)
 
-        # Make the request with retry logic
+        # Serve identical searches from the cache
+        if self.cache is not None:
+            cached_response = self.cache.get_response(endpoint, params)
+            if cached_response is not None:
+                return cached_response
+
+        data = self._request_with_retry(
+            "GET", endpoint,
+            params=params,
+            max_retries=max_retries,
+            initial_backoff=initial_backoff,
+            backoff_factor=backoff_factor,
+            jitter=jitter
+        )
+        if self.cache is not None:
+            self.cache.set_response(endpoint, params, data)
+        return data
+
+    def get_papers_batch(
+            self,
+            paper_ids: List[str],
+            fields: Optional[List[str]] = None,
+            max_workers: int = AppConfig.S2_BATCH_CONCURRENCY
+    ) -> List[Optional[Dict]]:
+        """
+        Fetch metadata for many papers through the /paper/batch endpoint.
+
+        The IDs are split into chunks of at most MAX_BATCH_SIZE, one POST per chunk,
+        and the chunks are fetched with at most ``max_workers`` requests in flight.
+
+        Args:
+            paper_ids (list): Semantic Scholar paper IDs (or any ID format the API accepts)
+            fields (list, optional): Fields to include for each paper
+            max_workers (int, optional): Maximum number of concurrent batch requests
+
+        Returns:
+            list: One entry per requested ID, in the same order; None for unknown IDs
+
+        Raises:
+            requests.HTTPError: If a batch request fails
+        """
+        endpoint = f"{self.BASE_URL}/paper/batch"
+        params = {"fields": ",".join(fields)} if fields else None
+        chunks = [paper_ids[i:i + self.MAX_BATCH_SIZE] for i in range(0, len(paper_ids), self.MAX_BATCH_SIZE)]
+
+        def fetch_chunk(chunk: List[str]) -> List[Optional[Dict]]:
+            return self._request_with_retry("POST", endpoint, params=params, json={"ids": chunk})
+
+        if len(chunks) <= 1 or max_workers <= 1:
+            results = [fetch_chunk(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                results = list(executor.map(fetch_chunk, chunks))
+
+        return [paper for chunk_result in results for paper in chunk_result]
+
+    def _request_with_retry(
+            self,
+            method: str,
+            endpoint: str,
+            params: Optional[Dict] = None,
+            json: Optional[Dict] = None,
+            max_retries: int = 10,
+            initial_backoff: float = 1.0,
+            backoff_factor: float = 2.0,
+            jitter: float = 0.1
+    ):
+        """
+        Send a request, retrying with exponential backoff on rate limit errors (429).
+
+        Every attempt first takes a token from the rate limiter, and 429 responses slow
+        the limiter down. Connection errors and 5xx responses are already retried by the
+        session's adapter.
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): Request URL
+            params (dict, optional): Query parameters
+            json (dict, optional): JSON request body
+            max_retries (int, optional): Maximum number of retry attempts for rate limit errors
+            initial_backoff (float, optional): Initial backoff time in seconds
+            backoff_factor (float, optional): Multiplicative factor for backoff after each retry
+            jitter (float, optional): Random jitter factor to add to backoff times
+
+        Returns:
+            Decoded JSON response
+
+        Raises:
+            requests.HTTPError: If the API request fails
+        """
         retry_count = 0
         backoff_time = initial_backoff
 
         while True:
             try:
-                response = requests.get(endpoint, params=params, headers=self.headers)
+                self.rate_limiter.acquire()
+                response = self.session.request(method, endpoint, params=params, json=json,
+                                                headers=self.headers, timeout=self.timeout)
                 response.raise_for_status()
+                self.rate_limiter.on_success()
                 return response.json()
 
             except requests.exceptions.HTTPError as e:
                 # Check if we got a rate limit error (429)
+                if e.response.status_code == 429:
+                    self.rate_limiter.on_rate_limited()
+
                 if e.response.status_code == 429 and retry_count < max_retries:
                     retry_count += 1
 
-                    # Calculate sleep time with jitter
+                    # Calculate sleep time with jitter, never shorter than the server's Retry-After
                     sleep_time = backoff_time * (1 + random.uniform(-jitter, jitter))
+                    sleep_time = max(sleep_time, self._retry_after_seconds(e.response))
 
                     # Log the retry attempt
                     logging.warning(
@@ -124,4 +258,134 @@ class SemanticScholarClient:
                     # Either it's not a 429 error or we've exceeded retries
                     raise
 
+    def iter_search_papers(
+            self,
+            query: str,
+            year: Optional[Dict] = None,
+            fields_of_study: Optional[List[str]] = None,
+            fields: Optional[List[str]] = None,
+            max_results: Optional[int] = None,
+            page_size: int = MAX_PAGE_SIZE
+    ) -> Iterator[Dict]:
+        """
+        Search for papers page by page, yielding papers one at a time.
+
+        Pages are fetched lazily: while the caller consumes the current page, the next
+        page is already being fetched in a background thread. Iteration stops as soon as
+        ``max_results`` papers have been yielded or the API has no more results, and
+        closing the generator early abandons the pending prefetch.
+
+        Args:
+            query (str): Search query keywords
+            year (dict, optional): Year range with 'start_year' and/or 'end_year' keys
+            fields_of_study (list, optional): List of fields of study to filter by
+            fields (list, optional): Fields to include in the response
+            max_results (int, optional): Maximum number of papers to yield
+                                    (default and upper bound: MAX_SEARCH_RESULTS)
+            page_size (int, optional): Number of papers per request (at most MAX_PAGE_SIZE)
+
+        Yields:
+            dict: Paper records from the 'data' field of each response page
+        """
+        max_results = min(max_results or self.MAX_SEARCH_RESULTS, self.MAX_SEARCH_RESULTS)
+        page_size = max(1, min(page_size, self.MAX_PAGE_SIZE))
+
+        def fetch_page(offset: int) -> Dict:
+            return self.search_papers(
+                query=query,
+                year=year,
+                fields_of_study=fields_of_study,
+                limit=min(page_size, max_results - offset),
+                offset=offset,
+                fields=fields
+            )
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="s2-prefetch")
+        try:
+            offset = 0
+            pending = executor.submit(fetch_page, offset)
+            while pending is not None:
+                page = pending.result()
+                papers = page.get('data') or []
+                offset = page.get('next', offset + len(papers))
+
+                # Prefetch the next page before handing out the current one
+                has_more = papers and 'next' in page and offset < max_results
+                pending = executor.submit(fetch_page, offset) if has_more else None
+
+                for paper in papers:
+                    yield paper
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_bulk_search(
+            self,
+            query: str,
+            year: Optional[Dict] = None,
+            fields_of_study: Optional[List[str]] = None,
+            fields: Optional[List[str]] = None,
+            token: Optional[str] = None
+    ) -> Iterator[Tuple[List[Dict], Optional[str]]]:
+        """
+        Page through the bulk search endpoint using its continuation token.
 
+        Unlike relevance search, bulk search has no offset ceiling, which makes it suitable
+        for harvesting large corpora. Each page is yielded together with the token that
+        fetches the next one, so callers can checkpoint and resume an interrupted harvest.
+
+        Args:
+            query (str): Search query (bulk search supports boolean query syntax)
+            year (dict, optional): Year range with 'start_year' and/or 'end_year' keys
+            fields_of_study (list, optional): List of fields of study to filter by
+            fields (list, optional): Fields to include in the response
+            token (str, optional): Continuation token to resume from
+
+        Yields:
+            tuple: (papers, next_token) where next_token is None on the last page
+
+        Raises:
+            requests.HTTPError: If the API request fails
+        """
+        endpoint = f"{self.BASE_URL}/paper/search/bulk"
+
+        params = {"query": query}
+        if year and (year.get('start_year') or year.get('end_year')):
+            params["year"] = f"{year.get('start_year') or ''}-{year.get('end_year') or ''}"
+        if fields_of_study:
+            params["fieldsOfStudy"] = ",".join(fields_of_study)
+        if fields:
+            params["fields"] = ",".join(fields)
+
+        while True:
+            page_params = dict(params, token=token) if token else params
+            page = self._request_with_retry("GET", endpoint, params=page_params)
+            token = page.get('token')
+            yield page.get('data') or [], token
+            if not token:
+                return
+
+    @staticmethod
+    def _retry_after_seconds(response) -> float:
+        """
+        Parse the Retry-After header of a response, given either in seconds or as an HTTP date.
+
+        Args:
+            response (requests.Response): Response to inspect
+
+        Returns:
+            float: Number of seconds to wait, or 0 if the header is missing or malformed
+        """
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if not retry_after:
+            return 0.0
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return 0.0
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
@@ -0,0 +1,99 @@
+"""
+Benchmark embedding throughput of the ingest embedding stage against a single model call.
+
+The baseline passes all texts to the model in one call in their original order, which is
+what Chroma's add_texts does. The embedding stage sorts texts by length, batches them and
+optionally spreads the batches over worker processes.
+
+Without --model, a synthetic model is used whose cost, like a transformer's, grows with
+the padded length of each batch. sentence-transformers already sorts texts by length
+within a call, so with a real model most of the gain comes from the worker processes.
+
+Usage:
+    python -m benchmarks.bench_embedding --texts 2000 --batch-size 64 --workers 1 2 4
+    python -m benchmarks.bench_embedding --model sentence-transformers/all-MiniLM-L6-v2
+"""
+import argparse
+import random
+import time
+from functools import partial
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from utils.embedding_engine import EmbeddingEngine
+
+
+class PaddedEmbeddings(Embeddings):
+    """Synthetic model that pads each internal batch to its longest text, like a transformer."""
+
+    INTERNAL_BATCH = 32
+    DIMENSION = 384
+    CHARS_PER_TOKEN = 4
+    MAX_TOKENS = 256
+
+    def __init__(self):
+        self.weights = np.random.default_rng(0).standard_normal((self.DIMENSION, self.DIMENSION)).astype(np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.INTERNAL_BATCH):
+            batch = texts[start:start + self.INTERNAL_BATCH]
+            tokens = min(self.MAX_TOKENS, max(len(text) for text in batch) // self.CHARS_PER_TOKEN + 1)
+            hidden = np.ones((len(batch), tokens, self.DIMENSION), dtype=np.float32)
+            for _ in range(2):
+                hidden = np.tanh(hidden @ self.weights)
+            vectors.extend(hidden.mean(axis=1).tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def create_texts(count: int) -> List[str]:
+    """Create abstracts of widely varying length, as found in a paper corpus."""
+    rng = random.Random(0)
+    return [" ".join(f"word{rng.randrange(1000)}" for _ in range(rng.choice([10, 40, 120, 250])))
+            for _ in range(count)]
+
+
+def throughput(embed, texts: List[str], repeat: int) -> float:
+    """Return the best throughput of embedding all texts, in texts per second."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        embed(texts)
+        timings.append(time.perf_counter() - start)
+    return len(texts) / min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--model", default=None, help="Hugging Face model to load instead of the synthetic model")
+    args = parser.parse_args()
+
+    if args.model:
+        from langchain_huggingface import HuggingFaceEmbeddings
+        factory = partial(HuggingFaceEmbeddings, model_name=args.model)
+    else:
+        factory = PaddedEmbeddings
+    embeddings = factory()
+    texts = create_texts(args.texts)
+
+    print(f"single call: {throughput(embeddings.embed_documents, texts, args.repeat):8.1f} texts/s")
+    for workers in args.workers:
+        engine = EmbeddingEngine(embeddings, batch_size=args.batch_size, max_workers=workers, worker_factory=factory)
+        # Start the workers and load the model before timing
+        engine.embed_documents(texts[:2 * args.batch_size])
+        print(f"stage, batch {args.batch_size}, {workers} worker(s): "
+              f"{throughput(engine.embed_documents, texts, args.repeat):8.1f} texts/s")
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark the embedding backends: query latency and batch throughput on the CPU.
+
+Each backend runs the same model; backends whose dependencies or model files are missing
+are reported and skipped. The onnx-int8 backend also needs the onnx package to quantize.
+
+Usage:
+    python -m benchmarks.bench_embedding_backends --texts 1000 --queries 50
+    python -m benchmarks.bench_embedding_backends --backends torch onnx-int8
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.bench_embedding import create_texts
+from classes.vector_db.vector_database import VectorDatabase
+from config.app_config import AppConfig
+from utils.embedding_engine import EmbeddingEngine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=AppConfig.DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=AppConfig.EMBEDDING_BATCH_SIZE)
+    args = parser.parse_args()
+
+    texts = create_texts(args.texts)
+    queries = [f"query about topic {index}" for index in range(args.queries)]
+
+    for backend in args.backends:
+        start = time.perf_counter()
+        try:
+            embeddings = VectorDatabase._embedding_factory(args.model, backend)()
+        except (ImportError, OSError, ValueError) as error:
+            print(f"{backend:<10} skipped: {error}")
+            continue
+        load_time = time.perf_counter() - start
+
+        # Warm up so one-time initialization is not counted
+        embeddings.embed_query(queries[0])
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            embeddings.embed_query(query)
+            latencies.append(time.perf_counter() - start)
+
+        engine = EmbeddingEngine(embeddings, batch_size=args.batch_size, max_workers=1)
+        start = time.perf_counter()
+        engine.embed_documents(texts)
+        throughput = len(texts) / (time.perf_counter() - start)
+
+        print(f"{backend:<10} load {load_time:6.2f} s, query median {statistics.median(latencies) * 1000:7.2f} ms, "
+              f"p95 {sorted(latencies)[int(0.95 * (len(latencies) - 1))] * 1000:7.2f} ms, "
+              f"{throughput:8.1f} texts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark the flat memory-mapped vector database against Chroma: the time to open a
+store and answer the first query, the median latency of later queries, and the memory
+the process needs for it.
+
+Both stores are filled with the same random vectors, bypassing the embedding model.
+Each measurement runs in a fresh process, so the open time includes loading the index
+(or mapping the files) and the RSS delta covers only the store, not the build.
+
+Usage:
+    python -m benchmarks.bench_flat_vector_db --sizes 10000 100000 --queries 50
+    python -m benchmarks.bench_flat_vector_db --sizes 1000000 --backends flat --dtype float16
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_vector_db import HashEmbeddings
+
+BACKENDS = ("flat", "chroma")
+
+
+def rss_mb() -> float:
+    """Return the resident set size of this process in MB."""
+    with open("/proc/self/status", "r", encoding="utf-8") as status_file:
+        for line in status_file:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def create_vector_db(backend: str, base_dir: str, dimension: int, dtype: str):
+    """Create a store that embeds queries with hash embeddings."""
+    embeddings = HashEmbeddings(dimension=dimension)
+    if backend == "flat":
+        from classes.vector_db.flat_vector_db import FlatVectorDb
+        return FlatVectorDb(base_dir, embeddings=embeddings, use_embedding_cache=False, dtype=dtype)
+    from classes.vector_db.chroma_vector_db import ChromaVectorDb
+    return ChromaVectorDb(base_dir, embeddings=embeddings, use_embedding_cache=False)
+
+
+def build(backend: str, base_dir: str, size: int, dimension: int, dtype: str, batch_size: int = 4096):
+    """Fill a store with random vectors and short records."""
+    rng = np.random.default_rng(0)
+    vector_db = create_vector_db(backend, base_dir, dimension, dtype)
+    for start in range(0, size, batch_size):
+        count = min(batch_size, size - start)
+        ids = [f"paper_{index}" for index in range(start, start + count)]
+        documents = [f"Abstract {index}" for index in range(start, start + count)]
+        metadatas = [{"paperId": str(index), "title": f"Paper {index}", "retrieved_at": 0}
+                     for index in range(start, start + count)]
+        vectors = rng.standard_normal((count, dimension), dtype=np.float32)
+        if backend == "flat":
+            vector_db._append(ids, documents, metadatas, vectors)
+        else:
+            vector_db._get_store(create=True)._collection.upsert(
+                ids=ids, embeddings=vectors.tolist(), metadatas=metadatas, documents=documents)
+    vector_db.close()
+
+
+def measure(backend: str, base_dir: str, dimension: int, dtype: str, queries: int, results) -> None:
+    """Open a built store in this fresh process and time its queries."""
+    vector_db = create_vector_db(backend, base_dir, dimension, dtype)
+    baseline = rss_mb()
+
+    start = time.perf_counter()
+    vector_db.query_vector_database("query 0", n_results=10)
+    first_query = time.perf_counter() - start
+
+    latencies = []
+    for index in range(1, queries + 1):
+        start = time.perf_counter()
+        vector_db.query_vector_database(f"query {index}", n_results=10)
+        latencies.append(time.perf_counter() - start)
+
+    results.put({
+        'open': first_query,
+        'query': statistics.median(latencies),
+        'rss': rss_mb() - baseline,
+    })
+    vector_db.close()
+
+
+def directory_size(path: str) -> int:
+    """Return the total size of the files below a directory."""
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--dtype", choices=("float32", "float16"), default="float32",
+                        help="Storage type of the flat store's vectors")
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{'backend':<8} {'vectors':>9} {'build s':>8} {'open+1st ms':>12} {'query ms':>9} "
+          f"{'RSS MB':>8} {'disk MB':>8}")
+    for size in args.sizes:
+        for backend in args.backends:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                start = time.perf_counter()
+                build(backend, temp_dir, size, args.dimension, args.dtype)
+                build_time = time.perf_counter() - start
+
+                results = context.Queue()
+                process = context.Process(target=measure,
+                                          args=(backend, temp_dir, args.dimension, args.dtype, args.queries, results))
+                process.start()
+                result = results.get()
+                process.join()
+                print(f"{backend:<8} {size:>9} {build_time:>8.1f} {result['open'] * 1000:>12.1f} "
+                      f"{result['query'] * 1000:>9.2f} {result['rss']:>8.1f} {directory_size(temp_dir) / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark payload size and encode time of the page image settings.
+
+Usage:
+    python -m benchmarks.bench_image_encoding --pages 10
+    python -m benchmarks.bench_image_encoding --pdf data/papers/raw/some_paper.pdf
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_pdf_rendering import create_pdf
+from utils import page_renderer
+from utils.page_renderer import RenderSettings
+
+SETTINGS = [
+    ("png, 144 DPI (previous default)", RenderSettings(image_format="png", dpi=144)),
+    ("png, max 1568 px", RenderSettings(image_format="png", max_dimension=1568)),
+    ("png, grayscale, max 1568 px", RenderSettings(image_format="png", grayscale=True, max_dimension=1568)),
+    ("jpeg q80, max 1568 px", RenderSettings(image_format="jpeg", quality=80, max_dimension=1568)),
+    ("jpeg q60, max 1568 px", RenderSettings(image_format="jpeg", quality=60, max_dimension=1568)),
+    ("jpeg q80, grayscale, max 1568 px", RenderSettings(image_format="jpeg", quality=80, grayscale=True,
+                                                        max_dimension=1568)),
+    ("jpeg q80, 96 DPI", RenderSettings(image_format="jpeg", quality=80, dpi=96)),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark page image encodings")
+    parser.add_argument("--pdf", help="PDF to render instead of a synthetic one")
+    parser.add_argument("--pages", type=int, default=10, help="Pages to render")
+    args = parser.parse_args()
+
+    settings = list(SETTINGS)
+    try:
+        settings.append(("webp q80, max 1568 px", RenderSettings(image_format="webp", quality=80, max_dimension=1568)))
+    except ImportError:
+        print("Pillow is not installed, skipping WebP")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = os.path.join(temp_dir, "bench.pdf")
+            create_pdf(pdf_path, args.pages)
+        page_numbers = list(range(min(args.pages, page_renderer.page_count(pdf_path))))
+
+        print(f"{'Settings':<36} {'KiB/page':>9} {'ms/page':>8}")
+        for label, render_settings in settings:
+            start = time.perf_counter()
+            images = page_renderer.render_pages(pdf_path, page_numbers, render_settings)
+            elapsed = time.perf_counter() - start
+            kib_per_page = sum(len(image) for image in images) / len(images) / 1024
+            print(f"{label:<36} {kib_per_page:>9.1f} {elapsed / len(images) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark PDFProcessor page rendering with one worker versus a process pool.
+
+Usage:
+    python -m benchmarks.bench_pdf_rendering --documents 4 --pages 10 --workers 4
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from utils.pdf_processor import PDFProcessor
+
+
+def create_pdf(path: str, page_count: int):
+    """Create a text and vector-graphics heavy PDF so rendering dominates the runtime."""
+    pdf_document = fitz.open()
+    for page_num in range(page_count):
+        page = pdf_document.new_page()
+        for line in range(60):
+            page.insert_text((40, 40 + line * 12), f"Page {page_num} line {line} " * 4, fontsize=8)
+        for shape in range(200):
+            x, y = (shape * 37) % 500 + 40, (shape * 53) % 700 + 40
+            page.draw_circle((x, y), 10 + shape % 15, color=(shape % 3 / 2, 0, 0.5))
+    pdf_document.save(path)
+    pdf_document.close()
+
+
+def time_rendering(processor: PDFProcessor, documents, repeat: int) -> float:
+    """Return the best wall-clock time of rendering all documents."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in processor.process_pdf_documents(documents)[1]:
+            pass
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel PDF page rendering")
+    parser.add_argument("--documents", type=int, default=4, help="Number of synthetic PDFs")
+    parser.add_argument("--pages", type=int, default=10, help="Pages per PDF")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes of the parallel run")
+    parser.add_argument("--pages-per-task", type=int, default=4, help="Pages rendered per worker task")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per configuration, the best is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        documents = []
+        for doc_num in range(args.documents):
+            pdf_path = os.path.join(temp_dir, f"bench_{doc_num}.pdf")
+            create_pdf(pdf_path, args.pages)
+            documents.append({'metadata': {'title': f"Benchmark {doc_num}", 'local_file_path': pdf_path}})
+
+        serial = PDFProcessor(max_pages_per_pdf=args.pages, max_workers=1, use_page_cache=False)
+        parallel = PDFProcessor(max_pages_per_pdf=args.pages, max_workers=args.workers,
+                                pages_per_task=args.pages_per_task, use_page_cache=False)
+
+        serial_time = time_rendering(serial, documents, args.repeat)
+        parallel_time = time_rendering(parallel, documents, args.repeat)
+
+    total_pages = args.documents * args.pages
+    print(f"{'Pages rendered:':<22} {total_pages}")
+    for label, seconds in (("1 worker:", serial_time), (f"{args.workers} workers:", parallel_time)):
+        print(f"{label:<22} {seconds:.2f}s ({total_pages / seconds:.1f} pages/s)")
+    print(f"{'Speedup:':<22} {serial_time / parallel_time:.2f}x")
+
+if __name__ == "__main__":
+    main()
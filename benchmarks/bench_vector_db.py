@@ -0,0 +1,99 @@
+"""
+Benchmark vector database queries with a cold store per query versus a warm store,
+and the time to append a few papers to a populated store.
+
+The cold case closes the store before every query, which is what reopening the Chroma
+client on each call used to cost.
+
+Usage:
+    python -m benchmarks.bench_vector_db --papers 2000 --queries 50
+"""
+import argparse
+import hashlib
+import statistics
+import tempfile
+import time
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from classes.vector_db.chroma_vector_db import ChromaVectorDb
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic embeddings derived from a hash, so the benchmark measures the store, not a model."""
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        digest = hashlib.shake_256(text.encode("utf-8")).digest(self.dimension)
+        return [value / 255 - 0.5 for value in digest]
+
+
+def create_papers(count: int):
+    """Create paper dictionaries with distinct abstracts."""
+    return [
+        {
+            "paperId": f"paper{index}",
+            "title": f"Paper {index}",
+            "abstract": f"Abstract {index} about topic {index % 37} and method {index % 11}",
+            "year": 2000 + index % 25,
+        }
+        for index in range(count)
+    ]
+
+
+def time_queries(vector_db: ChromaVectorDb, queries: List[str], cold: bool) -> List[float]:
+    """Return per-query latencies in seconds."""
+    latencies = []
+    for query in queries:
+        if cold:
+            vector_db.close()
+        start = time.perf_counter()
+        vector_db.query_vector_database(query, n_results=5)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def time_append(vector_db: ChromaVectorDb, papers, repeat: int = 5) -> float:
+    """Return the best time of appending papers, each repeat with fresh paper IDs."""
+    timings = []
+    for attempt in range(repeat):
+        batch = [{**paper, "paperId": f"{paper['paperId']}-{attempt}"} for paper in papers]
+        start = time.perf_counter()
+        vector_db.create_embeddings_and_store(batch, append=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--append", type=int, default=10, help="Number of papers per timed append")
+    parser.add_argument("--model", default=None, help="Embedding model to load instead of hash embeddings")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if args.model:
+            vector_db = ChromaVectorDb(temp_dir, model_name=args.model, use_embedding_cache=False)
+        else:
+            vector_db = ChromaVectorDb(temp_dir, embeddings=HashEmbeddings(), use_embedding_cache=False)
+        vector_db.create_embeddings_and_store(create_papers(args.papers), append=False)
+        queries = [f"topic {index % 37} method {index % 11}" for index in range(args.queries)]
+
+        for label, cold in (("cold", True), ("warm", False)):
+            latencies = time_queries(vector_db, queries, cold)
+            print(f"{label}: median {statistics.median(latencies) * 1000:7.2f} ms, "
+                  f"total {sum(latencies):6.2f} s over {len(latencies)} queries")
+        append_time = time_append(vector_db, create_papers(args.append))
+        print(f"append {args.append} papers to {args.papers}: {append_time * 1000:7.2f} ms")
+        vector_db.close()
+
+
+if __name__ == "__main__":
+    main()
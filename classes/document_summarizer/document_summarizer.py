@@ -3,5 +3,5 @@ from abc import ABC, abstractmethod
 
 class DocumentSummarizer(ABC):
     @abstractmethod
-    def create_summary(self, documents):
+    def create_summary(self, documents, query=None):
         pass
@@ -10,33 +10,39 @@ from utils.error_handler import handle_exceptions, ResearchAgentError
 class MultimodalDocumentSummarizer(DocumentSummarizer):
     """
     Creates summaries of PDF documents retrieved from a vector database using 
-    a multimodal LLM by attaching the PDF pages as images.
+    a multimodal LLM by attaching the PDF pages as images, or the PDFs themselves
+    when the model accepts documents.
     """
 
     def __init__(self, focus: str, model_adapter: ModelAdapter,
                  pdf_processor: PDFProcessor = None,
-                 max_pages_per_pdf: int = AppConfig.MAX_PAGES_PER_PDF):
+                 max_pages_per_pdf: int = AppConfig.MAX_PAGES_PER_PDF,
+                 prefer_documents: bool = AppConfig.PREFER_DOCUMENT_INPUT):
         """
         Initialize the MultimodalDocumentSummarizer class.
         
         Args:
             max_pages_per_pdf: Maximum number of pages to process per PDF to avoid token limits
+            prefer_documents: Attach PDFs as documents when the model adapter supports it
         """
+        self.prefer_documents = prefer_documents
         self.max_pages_per_pdf = max_pages_per_pdf
         self.focus = focus
         self.model_adapter = model_adapter
         self.pdf_processor = pdf_processor or PDFProcessor(max_pages_per_pdf=self.max_pages_per_pdf)
 
     @handle_exceptions(error_type=ResearchAgentError, default_return="Error generating summary")
-    def create_summary(self, documents: List[Dict[str, Any]]) -> str:
+    def create_summary(self, documents: List[Dict[str, Any]], query: Optional[str] = None) -> str:
         """
         Generate a summary of a list of documents using the provided multimodal LLM model.
-        Instead of extracting text, this method renders PDF pages as images and attaches them
-        to the prompt.
+        This method renders PDF pages as images and attaches them to the prompt; in the
+        PDF processor's text-first mode only pages with visual content are attached and
+        the text of the other pages is included in the prompt. Model adapters that support
+        documents get the PDFs themselves, trimmed to the selected pages.
 
         Args:
             documents: List of document dictionaries from vector_db.query_vector_database
-            llm_model: Multimodal LangChain compatible LLM model
+            query: Research query, used to send the most relevant pages of the documents
 
         Returns:
             str: A summary of the provided documents
@@ -44,8 +50,14 @@ class MultimodalDocumentSummarizer(DocumentSummarizer):
         if not documents:
             return "No documents provided for summarization."
 
+        # Models that read PDFs natively get the files, which skips rendering altogether
+        if self.prefer_documents and self.model_adapter.supports_documents:
+            metadata_list, pdf_documents = self.pdf_processor.prepare_pdf_documents(documents, query=query)
+            prompt = self._create_summarization_prompt(metadata_list, attachment_type="PDF documents")
+            return self.model_adapter.invoke_with_documents(prompt, pdf_documents)
+
         # Extract document metadata and create PDF image attachments
-        metadata_list, pdf_images = self.pdf_processor.process_pdf_documents(documents)
+        metadata_list, pdf_images = self.pdf_processor.process_pdf_documents(documents, query=query)
         
         # Create the prompt with document metadata
         prompt = self._create_summarization_prompt(metadata_list)
@@ -55,29 +67,22 @@ class MultimodalDocumentSummarizer(DocumentSummarizer):
             # This is for models that support the with_images method
             response = self.model_adapter.with_images(pdf_images).invoke(prompt)
         elif hasattr(self.model_adapter, 'invoke_with_images'):
-            # Alternative approach for some models
-            message = {"role": "user", "content": [{"type": "text", "text": prompt}]}
-
-            # Add image attachments to message
-            for i, image in enumerate(pdf_images):
-                message["content"].append({
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{image}"}
-                })
-
-            response = self.model_adapter.invoke([message])
+            # Alternative approach for some models, attaching the images in their rendered format
+            response = self.model_adapter.invoke_with_images(prompt, pdf_images,
+                                                             mime_type=self.pdf_processor.mime_type)
         else:
             # Fallback for basic models without multimodal support
             return "Error: The provided LLM model does not support multimodal inputs with images."
 
         return response
 
-    def _create_summarization_prompt(self, metadata_list: List[Dict[str, Any]]) -> str:
+    def _create_summarization_prompt(self, metadata_list: List[Dict[str, Any]], attachment_type: str = "images") -> str:
         """
         Create a prompt for the LLM to generate a summary.
         
         Args:
             metadata_list: List of document metadata
+            attachment_type: How the papers are attached, e.g. "images" or "PDF documents"
             
         Returns:
             str: The complete prompt for summarization
@@ -91,13 +96,28 @@ class MultimodalDocumentSummarizer(DocumentSummarizer):
             f"  Relevance Score: {meta['similarity_score']}"
             for meta in metadata_list
         ])
-        
+
+        # In text-first mode plain text pages arrive as text and only visual pages as images
+        if any('text' in meta for meta in metadata_list):
+            document_text = "\n\n".join(
+                f"=== Document {meta['document_number']} (pages attached as images: "
+                f"{', '.join(map(str, meta.get('image_pages', []))) or 'none'}) ===\n{meta.get('text', '')}"
+                for meta in metadata_list
+            )
+            introduction = (f"I'm providing {len(metadata_list)} research papers for you to analyze. The text of "
+                            f"their plain text pages is included below; pages with figures, tables or "
+                            f"no text layer are attached as images.")
+            content_section = f"\n\nExtracted text of the documents:\n\n{document_text}\n"
+        else:
+            introduction = f"I'm attaching {len(metadata_list)} research papers as {attachment_type} for you to analyze. "
+            content_section = ""
+
         prompt = f"""
-I'm attaching {len(metadata_list)} research papers as images for you to analyze. 
+{introduction}
 Here's information about the documents I'm providing:
 
 {document_overview}
-
+{content_section}
 Please examine the attached PDF pages and create a comprehensive summary that:
 
 1. Identifies the main research themes and questions across these papers
@@ -2,19 +2,32 @@ from langchain.chat_models import init_chat_model
 from classes.model_adapter.model_adapter import ModelAdapter
 
 class ClaudeModelAdapter(ModelAdapter):
+    supports_documents = True
+
     def __init__(self, model_str = "claude-3-5-sonnet-latest"):
         self.model = init_chat_model(model_str, model_provider="anthropic", temperature=0)
 
     def invoke(self, prompt):
         return self.model.invoke(prompt)
 
-    def invoke_with_images(self, prompt, images):
+    def invoke_with_images(self, prompt, images, mime_type="image/png"):
         message = {"role": "user", "content": [{"type": "text", "text": prompt}]}
         for img in images:
             message["content"].append({
                 "type": "image_url",
-                "image_url": {"url": f"data:image/png;base64,{img}"}
+                "image_url": {"url": f"data:{mime_type};base64,{img}"}
+            })
+        return self.model.invoke([message])
+
+    def invoke_with_documents(self, prompt, documents):
+        # PDFs go before the instructions, which is the order the API recommends
+        message = {"role": "user", "content": []}
+        for document in documents:
+            message["content"].append({
+                "type": "document",
+                "source": {"type": "base64", "media_type": "application/pdf", "data": document}
             })
+        message["content"].append({"type": "text", "text": prompt})
         return self.model.invoke([message])
 
     def with_structured_output(self, output_type, prompt):
@@ -3,16 +3,25 @@ from abc import ABC, abstractmethod
 class ModelAdapter(ABC):
     """Abstract adapter for different LLM model interfaces"""
 
+    # Whether the model accepts PDF files through invoke_with_documents
+    supports_documents = False
+
     @abstractmethod
     def invoke(self, prompt):
         """Invoke the model with a text prompt and images"""
         pass
 
     @abstractmethod
-    def invoke_with_images(self, prompt, images):
-        """Invoke the model with a text prompt and images"""
+    def invoke_with_images(self, prompt, images, mime_type="image/png"):
+        """Invoke the model with a text prompt and base64-encoded images of the given MIME type.
+        The images may be a generator; it is consumed once, one image at a time. The request
+        message still holds every image as a data URL, so the payload is in memory once."""
         pass
 
+    def invoke_with_documents(self, prompt, documents):
+        """Invoke the model with a text prompt and base64-encoded PDF documents"""
+        raise NotImplementedError(f"{self.__class__.__name__} does not support PDF document input")
+
     @abstractmethod
     def with_structured_output(self, output_type, prompt):
         """Invoke the model with a text prompt, returning structured output"""
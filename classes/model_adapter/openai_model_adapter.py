@@ -9,12 +9,12 @@ class OpenAIModelAdapter(ModelAdapter):
     def invoke(self, prompt):
         return self.model.invoke(prompt)
 
-    def invoke_with_images(self, prompt, images):
+    def invoke_with_images(self, prompt, images, mime_type="image/png"):
         message = {"role": "user", "content": [{"type": "text", "text": prompt}]}
         for img in images:
             message["content"].append({
                 "type": "image_url",
-                "image_url": {"url": f"data:image/png;base64,{img}"}
+                "image_url": {"url": f"data:{mime_type};base64,{img}"}
             })
         return self.model.invoke([message])
 
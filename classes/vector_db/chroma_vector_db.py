@@ -1,5 +1,6 @@
 import os
-from langchain_huggingface import HuggingFaceEmbeddings
+import threading
+import time
 from langchain_chroma import Chroma
 
 from classes.vector_db.vector_database import VectorDatabase
@@ -10,21 +11,62 @@ from utils.logger import Logger
 
 
 class ChromaVectorDb(VectorDatabase):
-    def __init__(self, base_dir, model_name=AppConfig.DEFAULT_EMBEDDING_MODEL):
+    # Collection metadata flag set once papers without retrieved_at have been given one
+    RETRIEVED_AT_BACKFILLED = "retrieved_at_backfilled"
+
+    def __init__(self, base_dir, model_name=AppConfig.DEFAULT_EMBEDDING_MODEL, embeddings=None,
+                 embedding_cache=None, use_embedding_cache=AppConfig.EMBEDDING_CACHE_ENABLED,
+                 embedding_workers=AppConfig.EMBEDDING_WORKERS, embedding_backend=AppConfig.EMBEDDING_BACKEND):
         """
         Initialize the VectorDb class.
         
         Args:
             base_dir (str): The base directory where the vector database will be stored
             model_name (str): The embedding model name to use
+            embeddings (Embeddings, optional): Embeddings to use instead of loading model_name
+            embedding_cache (EmbeddingCache, optional): Cache of computed vectors.
+                                    If not provided, the default on-disk cache is used.
+            use_embedding_cache (bool): Whether computed vectors are cached at all
+            embedding_workers (int): Worker processes embedding new papers (1 embeds in-process,
+                                    0 = one per CPU core); only used with the default model
+            embedding_backend (str): Runtime of the default model: "torch", "onnx" or "onnx-int8"
         """
         self.logger = Logger.get_logger(self.__class__.__name__)
         self.db_directory = os.path.join(base_dir, AppConfig.VECTOR_DB_FOLDER)
         os.makedirs(self.db_directory, exist_ok=True)
-        self.model_name = model_name
-        
-        # Initialize embeddings model
-        self.embeddings = HuggingFaceEmbeddings(model_name=self.model_name)
+        self._init_embeddings(model_name, embeddings, embedding_cache, use_embedding_cache,
+                              embedding_workers, embedding_backend)
+
+        # The Chroma store is opened on first use and kept open, so the SQLite database and
+        # HNSW index are loaded once per instance instead of once per call
+        self._vectordb = None
+        self._lock = threading.RLock()
+
+    def _get_store(self, create=False):
+        """
+        Return the open Chroma store, opening it if the database exists on disk.
+
+        Args:
+            create (bool): Create the database if it does not exist yet
+
+        Returns:
+            Chroma: The vector store, or None if no database has been created yet
+        """
+        with self._lock:
+            if self._vectordb is None and (create or os.path.exists(os.path.join(self.db_directory, "chroma.sqlite3"))):
+                self._vectordb = Chroma(persist_directory=self.db_directory, embedding_function=self.embeddings)
+            return self._vectordb
+
+    def close(self):
+        """Close the Chroma client and embedding workers; both are started again on next use."""
+        self.embedding_engine.close()
+        with self._lock:
+            if self._vectordb is None:
+                return
+            client = getattr(self._vectordb, '_client', None)
+            self._vectordb = None
+            if client is not None and hasattr(client, 'close'):
+                client.close()
 
     @handle_exceptions(error_type=DatabaseError)
     def create_embeddings_and_store(self, papers, append=True):
@@ -38,15 +80,34 @@ class ChromaVectorDb(VectorDatabase):
         Returns:
             Chroma: The Chroma vector database instance
         """
-        # Check if the database already exists
-        db_exists = os.path.exists(os.path.join(self.db_directory, "chroma.sqlite3"))
-        
-        if db_exists and append:
-            # Load existing database
-            vectordb = Chroma(persist_directory=self.db_directory, embedding_function=self.embeddings)
+        with self._lock:
+            vectordb = self._store_papers(papers, append)
+
+        self._log_embedding_cache_stats()
+        return vectordb
+
+    def _store_papers(self, papers, append):
+        """Add papers to the open store or create it; callers hold the lock."""
+        vectordb = self._get_store()
+
+        if vectordb is not None and append:
             
-            # Get existing paper IDs to avoid duplicates
-            existing_ids = set(vectordb._collection.get()["ids"])
+            # Look up only the incoming paper IDs instead of loading the whole collection
+            candidate_ids = DocumentProcessor.candidate_ids(papers)
+            stored = vectordb._collection.get(ids=candidate_ids, include=["metadatas"]) if candidate_ids \
+                else {"ids": [], "metadatas": []}
+            stored_metadata = dict(zip(stored["ids"], stored["metadatas"]))
+            existing_ids = set(stored_metadata)
+
+            # Papers already stored keep their embeddings, but changed details such as a PDF
+            # downloaded since are written to their metadata
+            update_ids, update_metadatas = DocumentProcessor.changed_metadata(papers, stored_metadata)
+            if update_ids:
+                batch_size = AppConfig.VECTOR_DB_WRITE_BATCH_SIZE
+                for start in range(0, len(update_ids), batch_size):
+                    vectordb._collection.update(ids=update_ids[start:start + batch_size],
+                                                metadatas=update_metadatas[start:start + batch_size])
+                Logger.info(self.logger, f"Updated metadata for {len(update_ids)} papers already in the database")
             
             # Prepare documents for the vector database
             documents = []
@@ -59,19 +120,16 @@ class ChromaVectorDb(VectorDatabase):
             
             # Add documents to the existing database
             if documents:
-                vectordb.add_texts(
-                    texts=documents,
-                    metadatas=metadatas,
-                    ids=ids
-                )
+                self._add_documents(vectordb, documents, metadatas, ids)
                 Logger.info(self.logger, f"Added embeddings for {papers_added} new papers to the existing database")
             else:
                 Logger.info(self.logger, "No new papers to add to the database")
                 
         else:
             # Create a new database
-            if not append and db_exists:
+            if not append and vectordb is not None:
                 Logger.info(self.logger, "Creating a new vector database (overwriting existing one)")
+                vectordb.reset_collection()
             
             # Prepare documents for the vector database
             documents = []
@@ -81,18 +139,31 @@ class ChromaVectorDb(VectorDatabase):
             papers_added = 0
             papers_added = DocumentProcessor.prepare_documents(documents, existing_ids, ids, metadatas, papers, papers_added)
             
-            # Create the Chroma vector store
-            vectordb = Chroma.from_texts(
-                texts=documents,
-                embedding=self.embeddings,
-                metadatas=metadatas,
-                ids=ids,
-                persist_directory=self.db_directory
-            )
+            # Create the Chroma vector store, or refill the emptied one
+            vectordb = self._get_store(create=True)
+            self._add_documents(vectordb, documents, metadatas, ids)
             Logger.info(self.logger, f"Created a new database with embeddings for {len(documents)} papers")
         
         return vectordb
 
+    def _add_documents(self, vectordb, documents, metadatas, ids):
+        """
+        Embed documents in the embedding stage and upsert them with their precomputed vectors.
+
+        Documents are processed in steps of VECTOR_DB_WRITE_BATCH_SIZE, which bounds the
+        memory held by vectors and stays below Chroma's maximum write batch. Upserting means a
+        paper stored concurrently since the existence check is overwritten, not duplicated.
+        """
+        batch_size = AppConfig.VECTOR_DB_WRITE_BATCH_SIZE
+        for start in range(0, len(documents), batch_size):
+            batch = documents[start:start + batch_size]
+            vectordb._collection.upsert(
+                ids=ids[start:start + batch_size],
+                embeddings=self.embeddings.embed_documents(batch),
+                metadatas=metadatas[start:start + batch_size],
+                documents=batch
+            )
+
     @handle_exceptions(error_type=DatabaseError, default_return= [])
     def query_vector_database(self, query, n_results=5):
         """
@@ -106,13 +177,11 @@ class ChromaVectorDb(VectorDatabase):
             list: List of papers similar to the query
         """
         # Check if the vector database exists
-        if not os.path.exists(os.path.join(self.db_directory, "chroma.sqlite3")):
+        vectordb = self._get_store()
+        if vectordb is None:
             Logger.info(self.logger, "Vector database not found. Create it first by calling create_embeddings_and_store().")
             return []
         
-        # Load the vector database
-        vectordb = Chroma(persist_directory=self.db_directory, embedding_function=self.embeddings)
-        
         # Query the database
         results = vectordb.similarity_search_with_score(query, k=n_results)
         
@@ -126,4 +195,108 @@ class ChromaVectorDb(VectorDatabase):
             }
             formatted_results.append(result)
             
-        return formatted_results
\ No newline at end of file
+        return formatted_results
+
+    @handle_exceptions(error_type=DatabaseError, default_return=[])
+    def get_stale_paper_ids(self, max_age_days=AppConfig.METADATA_MAX_AGE_DAYS, limit=None):
+        """
+        Find indexed papers whose metadata has not been refreshed recently.
+
+        Args:
+            max_age_days (int): Maximum age of the metadata in days
+            limit (int, optional): Maximum number of IDs to return
+
+        Returns:
+            list: Semantic Scholar paper IDs of the stale papers
+        """
+        vectordb = self._get_store()
+        if vectordb is None:
+            return []
+
+        self._backfill_retrieved_at(vectordb._collection)
+        cutoff = time.time() - max_age_days * 24 * 60 * 60
+        # Filtered in Chroma, so only the stale rows are loaded instead of the whole collection
+        stored = vectordb._collection.get(where={"retrieved_at": {"$lt": cutoff}}, limit=limit,
+                                          include=["metadatas"])
+
+        return [metadata['paperId'] for metadata in stored["metadatas"] if metadata.get('paperId')]
+
+    def _backfill_retrieved_at(self, collection):
+        """
+        Give papers stored before retrieved_at was recorded a timestamp of 0, so that the
+        stale filter matches them. The collection is scanned once, then marked as done.
+        """
+        if (collection.metadata or {}).get(self.RETRIEVED_AT_BACKFILLED):
+            return
+
+        stored = collection.get(include=["metadatas"])
+        legacy_ids = [paper_id for paper_id, metadata in zip(stored["ids"], stored["metadatas"])
+                      if 'retrieved_at' not in (metadata or {})]
+        batch_size = AppConfig.VECTOR_DB_WRITE_BATCH_SIZE
+        for start in range(0, len(legacy_ids), batch_size):
+            batch = legacy_ids[start:start + batch_size]
+            # Chroma merges updated metadata into the stored metadata
+            collection.update(ids=batch, metadatas=[{'retrieved_at': 0}] * len(batch))
+        collection.modify(metadata={**(collection.metadata or {}), self.RETRIEVED_AT_BACKFILLED: True})
+        if legacy_ids:
+            Logger.info(self.logger, f"Marked {len(legacy_ids)} papers without a retrieval time as stale")
+
+    @handle_exceptions(error_type=DatabaseError, default_return=0)
+    def update_paper_metadata(self, papers):
+        """
+        Replace the metadata of already indexed papers with fresh paper details.
+
+        The embeddings are left untouched, and the local PDF path of each paper is kept.
+
+        Args:
+            papers (list): Paper dictionaries with up-to-date details
+
+        Returns:
+            int: Number of papers whose metadata was updated
+        """
+        papers = [paper for paper in papers if paper and paper.get('paperId')]
+        vectordb = self._get_store() if papers else None
+        if vectordb is None:
+            return 0
+
+        ids = [f"paper_{paper['paperId']}" for paper in papers]
+        stored = vectordb._collection.get(ids=ids, include=["metadatas"])
+        stored_metadata = dict(zip(stored["ids"], stored["metadatas"]))
+
+        update_ids = []
+        update_metadatas = []
+        for paper_id, paper in zip(ids, papers):
+            if paper_id not in stored_metadata:
+                continue
+            metadata = DocumentProcessor.build_metadata(paper)
+            metadata['local_file_path'] = stored_metadata[paper_id].get('local_file_path', '')
+            update_ids.append(paper_id)
+            update_metadatas.append(metadata)
+
+        if update_ids:
+            vectordb._collection.update(ids=update_ids, metadatas=update_metadatas)
+        Logger.info(self.logger, f"Refreshed metadata for {len(update_ids)} papers")
+        return len(update_ids)
+
+    @handle_exceptions(error_type=DatabaseError, default_return=0)
+    def mark_papers_refreshed(self, paper_ids):
+        """
+        Set the retrieval time of indexed papers to now, leaving the rest of their metadata as is.
+
+        Used for papers the API could not resolve, so they are not fetched again on every run.
+
+        Args:
+            paper_ids (list): Semantic Scholar paper IDs
+
+        Returns:
+            int: Number of papers marked
+        """
+        vectordb = self._get_store() if paper_ids else None
+        if vectordb is None:
+            return 0
+
+        stored_ids = vectordb._collection.get(ids=[f"paper_{paper_id}" for paper_id in paper_ids], include=[])["ids"]
+        if stored_ids:
+            # Chroma merges updated metadata into the stored metadata
+            vectordb._collection.update(ids=stored_ids, metadatas=[{'retrieved_at': time.time()}] * len(stored_ids))
+        return len(stored_ids)
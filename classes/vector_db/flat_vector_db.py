@@ -0,0 +1,447 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from classes.vector_db.vector_database import VectorDatabase
+from config.app_config import AppConfig
+from utils.document_processor import DocumentProcessor
+from utils.error_handler import handle_exceptions, DatabaseError
+from utils.logger import Logger
+
+
+class FlatVectorDb(VectorDatabase):
+    """
+    Vector database keeping normalized embeddings in a memory-mapped NumPy matrix.
+
+    The database folder holds:
+        header.json: dimension and storage type ("float32" or "float16") of the vectors
+        vectors.bin: one row per stored paper, appended in place
+        records.jsonl: ID, abstract and metadata of each row, one JSON line per row
+        offsets.bin: byte offset of each row's line in records.jsonl, as int64
+        ids.jsonl: the ID of each row, so the ID index loads without parsing the records
+        retrieved_at.bin: retrieval time of each row's metadata, as float64, to find stale papers
+        changes.jsonl: later metadata updates and replaced rows, replayed on open
+
+    Queries are exact: one matrix-vector product over all rows followed by argpartition,
+    with no index to build or load. A row is committed by appending its offset last, so an
+    interrupted append never exposes a partially written row.
+    """
+
+    HEADER_FILE = "header.json"
+    VECTORS_FILE = "vectors.bin"
+    RECORDS_FILE = "records.jsonl"
+    OFFSETS_FILE = "offsets.bin"
+    IDS_FILE = "ids.jsonl"
+    RETRIEVED_AT_FILE = "retrieved_at.bin"
+    CHANGES_FILE = "changes.jsonl"
+    DTYPES = ("float32", "float16")
+    # Rows multiplied at once during a search. float16 rows are converted into a float32 buffer
+    # of this many rows, small enough to stay in the CPU cache
+    SEARCH_CHUNK_ROWS = 4096
+
+    def __init__(self, base_dir, model_name=AppConfig.DEFAULT_EMBEDDING_MODEL, embeddings=None,
+                 embedding_cache=None, use_embedding_cache=AppConfig.EMBEDDING_CACHE_ENABLED,
+                 embedding_workers=AppConfig.EMBEDDING_WORKERS, embedding_backend=AppConfig.EMBEDDING_BACKEND,
+                 dtype=AppConfig.FLAT_VECTOR_DB_DTYPE):
+        """
+        Initialize the FlatVectorDb class.
+
+        Args:
+            base_dir (str): The base directory where the vector database will be stored
+            model_name (str): The embedding model name to use
+            embeddings (Embeddings, optional): Embeddings to use instead of loading model_name
+            embedding_cache (EmbeddingCache, optional): Cache of computed vectors.
+                                    If not provided, the default on-disk cache is used.
+            use_embedding_cache (bool): Whether computed vectors are cached at all
+            embedding_workers (int): Worker processes embedding new papers (1 embeds in-process,
+                                    0 = one per CPU core); only used with the default model
+            embedding_backend (str): Runtime of the default model: "torch", "onnx" or "onnx-int8"
+            dtype (str): Storage type of the vectors of a new database, "float32" or "float16"
+        """
+        if dtype not in self.DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self.db_directory = os.path.join(base_dir, AppConfig.FLAT_VECTOR_DB_FOLDER)
+        os.makedirs(self.db_directory, exist_ok=True)
+        self.dtype = dtype
+        self._init_embeddings(model_name, embeddings, embedding_cache, use_embedding_cache,
+                              embedding_workers, embedding_backend)
+
+        # The files are mapped on first use and kept open
+        self._lock = threading.RLock()
+        self._header = None
+        self._vectors = None
+        self._offsets = None
+        self._removed = None
+        self._retrieved_at = None
+        self._metadata_updates = {}
+        self._id_rows = None
+        self._ids_size = 0
+
+    def _path(self, file_name):
+        """Return the path of a file of the database."""
+        return os.path.join(self.db_directory, file_name)
+
+    def _open(self):
+        """
+        Map the stored vectors and replay the change log, once.
+
+        Returns:
+            bool: False if no database has been created yet
+        """
+        with self._lock:
+            if self._header is not None:
+                return True
+            if not os.path.exists(self._path(self.HEADER_FILE)):
+                return False
+
+            with open(self._path(self.HEADER_FILE), 'r', encoding='utf-8') as header_file:
+                self._header = json.load(header_file)
+            row_bytes = self._header['dimension'] * np.dtype(self._header['dtype']).itemsize
+            rows = min(self._file_size(self.VECTORS_FILE) // row_bytes, self._file_size(self.OFFSETS_FILE) // 8)
+            self._map(rows)
+
+            self._removed = np.zeros(rows, dtype=bool)
+            self._retrieved_at = np.fromfile(self._path(self.RETRIEVED_AT_FILE), dtype=np.float64, count=rows)
+            self._metadata_updates = {}
+            if os.path.exists(self._path(self.CHANGES_FILE)):
+                with open(self._path(self.CHANGES_FILE), 'r', encoding='utf-8') as changes_file:
+                    for line in changes_file:
+                        self._apply_change(json.loads(line))
+            return True
+
+    def _file_size(self, file_name):
+        """Return the size of a file of the database, 0 if it does not exist."""
+        path = self._path(file_name)
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def _map(self, rows):
+        """Memory-map the first rows of the vector and offset files."""
+        dimension, dtype = self._header['dimension'], np.dtype(self._header['dtype'])
+        if rows:
+            self._vectors = np.memmap(self._path(self.VECTORS_FILE), dtype=dtype, mode='r', shape=(rows, dimension))
+            self._offsets = np.memmap(self._path(self.OFFSETS_FILE), dtype=np.int64, mode='r', shape=(rows,))
+        else:
+            self._vectors = np.empty((0, dimension), dtype=dtype)
+            self._offsets = np.empty(0, dtype=np.int64)
+
+    def _apply_change(self, change):
+        """Apply a change log entry: a metadata update or a row replaced by a newer one."""
+        row = change['row']
+        if row >= len(self._removed):
+            return
+        if change.get('removed'):
+            self._removed[row] = True
+            self._metadata_updates.pop(row, None)
+        else:
+            self._metadata_updates[row] = change['metadata']
+            self._retrieved_at[row] = change['metadata'].get('retrieved_at', 0)
+
+    def _append_changes(self, changes):
+        """Write change log entries and apply them."""
+        with open(self._path(self.CHANGES_FILE), 'a', encoding='utf-8') as changes_file:
+            for change in changes:
+                changes_file.write(json.dumps(change) + "\n")
+        for change in changes:
+            self._apply_change(change)
+
+    def _ids(self):
+        """Return the row of every live paper ID, loading the ID file on first use."""
+        if self._id_rows is None:
+            self._id_rows = {}
+            self._ids_size = 0
+            rows = len(self._offsets)
+            if rows:
+                with open(self._path(self.IDS_FILE), 'rb') as ids_file:
+                    for row, line in zip(range(rows), ids_file):
+                        self._ids_size += len(line)
+                        if not self._removed[row]:
+                            self._id_rows[json.loads(line)] = row
+        return self._id_rows
+
+    def _read_records(self, rows):
+        """Read the records of rows, with their latest metadata."""
+        records = []
+        with open(self._path(self.RECORDS_FILE), 'rb') as records_file:
+            for row in rows:
+                records_file.seek(int(self._offsets[row]))
+                record = json.loads(records_file.readline())
+                record['metadata'] = self._metadata_updates.get(int(row), record['metadata'])
+                records.append(record)
+        return records
+
+    def _reset(self):
+        """Delete every file of the database."""
+        self.close()
+        for file_name in (self.HEADER_FILE, self.VECTORS_FILE, self.RECORDS_FILE, self.OFFSETS_FILE,
+                          self.IDS_FILE, self.RETRIEVED_AT_FILE, self.CHANGES_FILE):
+            if os.path.exists(self._path(file_name)):
+                os.remove(self._path(file_name))
+
+    def _append(self, ids, documents, metadatas, vectors):
+        """
+        Append rows to the end of the files, replacing rows of IDs that are already stored.
+
+        Args:
+            ids (list): Paper IDs
+            documents (list): Abstracts
+            metadatas (list): Metadata of each paper
+            vectors (list): Embeddings, normalized before they are stored
+        """
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+        matrix /= np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+
+        if not self._open():
+            # The header is written last, so a database only exists once all its files do
+            for file_name in (self.VECTORS_FILE, self.RECORDS_FILE, self.OFFSETS_FILE, self.IDS_FILE,
+                              self.RETRIEVED_AT_FILE):
+                open(self._path(file_name), 'wb').close()
+            with open(self._path(self.HEADER_FILE), 'w', encoding='utf-8') as header_file:
+                json.dump({'dimension': matrix.shape[1], 'dtype': self.dtype}, header_file)
+            self._open()
+        if matrix.shape[1] != self._header['dimension']:
+            raise DatabaseError(f"Expected {self._header['dimension']}-dimensional vectors, got {matrix.shape[1]}")
+
+        id_rows = self._ids()
+        rows = len(self._offsets)
+        row_bytes = self._header['dimension'] * np.dtype(self._header['dtype']).itemsize
+
+        # Drop whatever an interrupted append left behind the last committed row, so rows stay
+        # aligned across the files
+        offsets = []
+        with open(self._path(self.RECORDS_FILE), 'r+b') as records_file:
+            position = 0
+            if rows:
+                records_file.seek(int(self._offsets[-1]))
+                position = int(self._offsets[-1]) + len(records_file.readline())
+            records_file.truncate(position)
+            records_file.seek(position)
+            for paper_id, document, metadata in zip(ids, documents, metadatas):
+                line = (json.dumps({'id': paper_id, 'document': document, 'metadata': metadata}) + "\n").encode('utf-8')
+                records_file.write(line)
+                offsets.append(position)
+                position += len(line)
+        with open(self._path(self.IDS_FILE), 'r+b') as ids_file:
+            ids_file.truncate(self._ids_size)
+            ids_file.seek(self._ids_size)
+            id_lines = b"".join((json.dumps(paper_id) + "\n").encode('utf-8') for paper_id in ids)
+            ids_file.write(id_lines)
+        self._ids_size += len(id_lines)
+        with open(self._path(self.VECTORS_FILE), 'r+b') as vectors_file:
+            vectors_file.truncate(rows * row_bytes)
+            vectors_file.seek(0, os.SEEK_END)
+            vectors_file.write(matrix.astype(self._header['dtype']).tobytes())
+        retrieved_at = np.array([metadata.get('retrieved_at', 0) for metadata in metadatas], dtype=np.float64)
+        with open(self._path(self.RETRIEVED_AT_FILE), 'r+b') as retrieved_at_file:
+            retrieved_at_file.truncate(rows * 8)
+            retrieved_at_file.seek(0, os.SEEK_END)
+            retrieved_at_file.write(retrieved_at.tobytes())
+        with open(self._path(self.OFFSETS_FILE), 'r+b') as offsets_file:
+            offsets_file.truncate(rows * 8)
+            offsets_file.seek(0, os.SEEK_END)
+            offsets_file.write(np.asarray(offsets, dtype=np.int64).tobytes())
+
+        self._map(rows + len(ids))
+        self._removed = np.concatenate([self._removed, np.zeros(len(ids), dtype=bool)])
+        self._retrieved_at = np.concatenate([self._retrieved_at, retrieved_at])
+        replaced = [{'row': id_rows[paper_id], 'removed': True} for paper_id in ids if paper_id in id_rows]
+        if replaced:
+            self._append_changes(replaced)
+        id_rows.update((paper_id, rows + index) for index, paper_id in enumerate(ids))
+
+    @handle_exceptions(error_type=DatabaseError)
+    def create_embeddings_and_store(self, papers, append=True):
+        """
+        Create embeddings for paper abstracts and append them to the database.
+
+        Args:
+            papers (list): List of paper dictionaries containing abstracts
+            append (bool): If True, append to existing database; if False, create new database
+
+        Returns:
+            FlatVectorDb: The database
+        """
+        with self._lock:
+            if not append and self._open():
+                Logger.info(self.logger, "Creating a new vector database (overwriting existing one)")
+                self._reset()
+
+            existing_ids = set()
+            if self._open():
+                id_rows = self._ids()
+                existing_ids = {paper_id for paper_id in DocumentProcessor.candidate_ids(papers) if paper_id in id_rows}
+
+                # Papers already stored keep their embeddings, but changed details such as a PDF
+                # downloaded since are written to their metadata
+                existing_rows = [(paper_id, id_rows[paper_id]) for paper_id in existing_ids]
+                stored = self._read_records([row for _, row in existing_rows])
+                stored_metadata = {paper_id: record['metadata'] for (paper_id, _), record in zip(existing_rows, stored)}
+                update_ids, update_metadatas = DocumentProcessor.changed_metadata(papers, stored_metadata)
+                if update_ids:
+                    self._append_changes([{'row': id_rows[paper_id], 'metadata': metadata}
+                                          for paper_id, metadata in zip(update_ids, update_metadatas)])
+                    Logger.info(self.logger, f"Updated metadata for {len(update_ids)} papers already in the database")
+
+            documents = []
+            metadatas = []
+            ids = []
+            papers_added = DocumentProcessor.prepare_documents(documents, existing_ids, ids, metadatas, papers, 0)
+
+            batch_size = AppConfig.VECTOR_DB_WRITE_BATCH_SIZE
+            for start in range(0, len(documents), batch_size):
+                batch = documents[start:start + batch_size]
+                self._append(ids[start:start + batch_size], batch, metadatas[start:start + batch_size],
+                             self.embeddings.embed_documents(batch))
+            Logger.info(self.logger, f"Added embeddings for {papers_added} new papers to the database")
+
+        self._log_embedding_cache_stats()
+        return self
+
+    @handle_exceptions(error_type=DatabaseError, default_return=[])
+    def query_vector_database(self, query, n_results=5):
+        """
+        Query the vector database for papers similar to the query.
+
+        Args:
+            query (str): The query string
+            n_results (int): Number of results to return
+
+        Returns:
+            list: List of papers similar to the query, most similar first. As with Chroma, the
+                  similarity_score is the squared L2 distance of the normalized vectors (lower is closer)
+        """
+        with self._lock:
+            if not self._open() or not len(self._vectors):
+                Logger.info(self.logger, "Vector database not found. Create it first by calling create_embeddings_and_store().")
+                return []
+            vectors, removed = self._vectors, self._removed
+
+        query_vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        query_vector /= max(float(np.linalg.norm(query_vector)), 1e-12)
+
+        scores = np.empty(len(vectors), dtype=np.float32)
+        buffer = None if vectors.dtype == np.float32 else np.empty((self.SEARCH_CHUNK_ROWS, vectors.shape[1]), np.float32)
+        for start in range(0, len(vectors), self.SEARCH_CHUNK_ROWS):
+            chunk = vectors[start:start + self.SEARCH_CHUNK_ROWS]
+            if buffer is not None:
+                chunk = buffer[:len(chunk)]
+                chunk[...] = vectors[start:start + self.SEARCH_CHUNK_ROWS]
+            scores[start:start + self.SEARCH_CHUNK_ROWS] = chunk @ query_vector
+        scores[removed] = -np.inf
+
+        count = min(n_results, int(len(scores) - removed.sum()))
+        if count <= 0:
+            return []
+        top_rows = np.argpartition(-scores, count - 1)[:count]
+        top_rows = top_rows[np.argsort(-scores[top_rows])]
+
+        with self._lock:
+            records = self._read_records(top_rows)
+        return [
+            {
+                'content': record['document'],
+                'metadata': record['metadata'],
+                'similarity_score': float(2 - 2 * scores[row])
+            }
+            for row, record in zip(top_rows, records)
+        ]
+
+    @handle_exceptions(error_type=DatabaseError, default_return=[])
+    def get_stale_paper_ids(self, max_age_days=AppConfig.METADATA_MAX_AGE_DAYS, limit=None):
+        """
+        Find indexed papers whose metadata has not been refreshed recently.
+
+        Args:
+            max_age_days (int): Maximum age of the metadata in days
+            limit (int, optional): Maximum number of IDs to return
+
+        Returns:
+            list: Semantic Scholar paper IDs of the stale papers
+        """
+        with self._lock:
+            if not self._open():
+                return []
+
+            cutoff = time.time() - max_age_days * 24 * 60 * 60
+            # Only the records of stale rows are read
+            stale_rows = np.flatnonzero((self._retrieved_at < cutoff) & ~self._removed)[:limit]
+            return [
+                record['metadata']['paperId'] for record in self._read_records(stale_rows)
+                if record['metadata'].get('paperId')
+            ]
+
+    @handle_exceptions(error_type=DatabaseError, default_return=0)
+    def update_paper_metadata(self, papers):
+        """
+        Replace the metadata of already indexed papers with fresh paper details.
+
+        The embeddings are left untouched, and the local PDF path of each paper is kept.
+
+        Args:
+            papers (list): Paper dictionaries with up-to-date details
+
+        Returns:
+            int: Number of papers whose metadata was updated
+        """
+        papers = [paper for paper in papers if paper and paper.get('paperId')]
+        with self._lock:
+            if not papers or not self._open():
+                return 0
+
+            id_rows = self._ids()
+            updates = [(id_rows[f"paper_{paper['paperId']}"], paper) for paper in papers
+                       if f"paper_{paper['paperId']}" in id_rows]
+            stored = self._read_records([row for row, _ in updates])
+
+            changes = []
+            for (row, paper), record in zip(updates, stored):
+                metadata = DocumentProcessor.build_metadata(paper)
+                metadata['local_file_path'] = record['metadata'].get('local_file_path', '')
+                changes.append({'row': row, 'metadata': metadata})
+            if changes:
+                self._append_changes(changes)
+
+        Logger.info(self.logger, f"Refreshed metadata for {len(changes)} papers")
+        return len(changes)
+
+    @handle_exceptions(error_type=DatabaseError, default_return=0)
+    def mark_papers_refreshed(self, paper_ids):
+        """
+        Set the retrieval time of indexed papers to now, leaving the rest of their metadata as is.
+
+        Used for papers the API could not resolve, so they are not fetched again on every run.
+
+        Args:
+            paper_ids (list): Semantic Scholar paper IDs
+
+        Returns:
+            int: Number of papers marked
+        """
+        with self._lock:
+            if not paper_ids or not self._open():
+                return 0
+
+            id_rows = self._ids()
+            rows = [id_rows[f"paper_{paper_id}"] for paper_id in paper_ids if f"paper_{paper_id}" in id_rows]
+            now = time.time()
+            changes = [{'row': row, 'metadata': dict(record['metadata'], retrieved_at=now)}
+                       for row, record in zip(rows, self._read_records(rows))]
+            if changes:
+                self._append_changes(changes)
+            return len(changes)
+
+    def close(self):
+        """Unmap the files and stop the embedding workers; both are reopened on next use."""
+        self.embedding_engine.close()
+        with self._lock:
+            self._header = None
+            self._vectors = None
+            self._offsets = None
+            self._removed = None
+            self._retrieved_at = None
+            self._metadata_updates = {}
+            self._id_rows = None
+            self._ids_size = 0
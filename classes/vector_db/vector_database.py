@@ -1,4 +1,34 @@
 from abc import ABC, abstractmethod
+from functools import partial
+
+from config.app_config import AppConfig
+from utils.embedding_cache import CachedEmbeddings, EmbeddingCache
+from utils.embedding_engine import EmbeddingEngine
+from utils.logger import Logger
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def create_embeddings(model_name, backend):
+    """
+    Create the embeddings of a model on a backend.
+
+    The backend's library is imported here rather than at module load, and the function is
+    module-level so that a partial of it can be pickled into embedding workers.
+
+    Args:
+        model_name (str): Hugging Face model ID
+        backend (str): "torch", "onnx" or "onnx-int8"
+
+    Returns:
+        Embeddings: The embeddings of the model
+    """
+    if backend == "torch":
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=model_name)
+    from utils.onnx_embeddings import OnnxEmbeddings
+    return OnnxEmbeddings(model_name, quantized=backend == "onnx-int8")
+
 
 class VectorDatabase(ABC):
     """Interface for vector database implementations"""
@@ -11,4 +41,79 @@ class VectorDatabase(ABC):
     @abstractmethod
     def query_vector_database(self, query, n_results=5):
         """Query the database for similar documents"""
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def get_stale_paper_ids(self, max_age_days, limit=None):
+        """Return the IDs of at most limit stored papers whose metadata is older than max_age_days"""
+        pass
+
+    @abstractmethod
+    def update_paper_metadata(self, papers):
+        """Replace the stored metadata of already indexed papers"""
+        pass
+
+    @abstractmethod
+    def mark_papers_refreshed(self, paper_ids):
+        """Mark the metadata of stored papers as refreshed without changing it"""
+        pass
+
+    def close(self):
+        """Release the resources held by the database"""
+        pass
+
+    def _init_embeddings(self, model_name, embeddings=None, embedding_cache=None,
+                         use_embedding_cache=AppConfig.EMBEDDING_CACHE_ENABLED,
+                         embedding_workers=AppConfig.EMBEDDING_WORKERS,
+                         embedding_backend=AppConfig.EMBEDDING_BACKEND):
+        """
+        Set up the embeddings: the model, batched by the embedding stage, behind the embedding cache.
+
+        The default model is only loaded when the first text is embedded. Sets
+        ``embedding_engine`` and ``embeddings``, the latter being what the database embeds with.
+
+        Args:
+            model_name (str): The embedding model name to use
+            embeddings (Embeddings, optional): Embeddings to use instead of loading model_name
+            embedding_cache (EmbeddingCache, optional): Cache of computed vectors.
+                                    If not provided, the default on-disk cache is used.
+            use_embedding_cache (bool): Whether computed vectors are cached at all
+            embedding_workers (int): Worker processes embedding new papers (1 embeds in-process,
+                                    0 = one per CPU core); only used with the default model
+            embedding_backend (str): Runtime of the default model: "torch", "onnx" or "onnx-int8"
+        """
+        self.model_name = model_name
+        self.embedding_backend = embedding_backend
+
+        worker_factory = None if embeddings else self._embedding_factory(model_name, embedding_backend)
+        self.embedding_engine = EmbeddingEngine(embeddings, max_workers=embedding_workers,
+                                                worker_factory=worker_factory)
+        self.embeddings = self.embedding_engine
+        if use_embedding_cache:
+            # Texts embedded before, in any collection or run, are not sent through the model again;
+            # other backends produce slightly different vectors and are cached apart from torch
+            cache_model = model_name if embedding_backend == "torch" else f"{model_name}#{embedding_backend}"
+            self.embeddings = CachedEmbeddings(self.embeddings, cache_model, embedding_cache or EmbeddingCache())
+
+    def _log_embedding_cache_stats(self):
+        """Log the hit rate of the embedding cache, if there is one."""
+        if isinstance(self.embeddings, CachedEmbeddings):
+            stats = self.embeddings.cache.stats()
+            Logger.info(self.logger, f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+                                     f"({stats['hit_rate']:.0%} hit rate, {stats['entries']} entries)")
+
+    @staticmethod
+    def _embedding_factory(model_name, backend):
+        """
+        Return a picklable callable creating the embeddings of a model on a backend.
+
+        Args:
+            model_name (str): Hugging Face model ID
+            backend (str): "torch", "onnx" or "onnx-int8"
+
+        Returns:
+            Callable: Factory usable in the parent process and in embedding workers
+        """
+        if backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unsupported embedding backend: {backend}")
+        return partial(create_embeddings, model_name, backend)
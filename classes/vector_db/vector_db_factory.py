@@ -0,0 +1,17 @@
+# classes/vector_db/vector_db_factory.py
+from config.app_config import AppConfig
+
+
+class VectorDbFactory:
+    @staticmethod
+    def create_vector_db(db_type=None, base_dir=None, **kwargs):
+        """Create a vector database based on type, AppConfig.VECTOR_DB_BACKEND by default"""
+        db_type = (db_type or AppConfig.VECTOR_DB_BACKEND).lower()
+        if db_type == "chroma":
+            from classes.vector_db.chroma_vector_db import ChromaVectorDb
+            return ChromaVectorDb(base_dir, **kwargs)
+        elif db_type == "flat":
+            from classes.vector_db.flat_vector_db import FlatVectorDb
+            return FlatVectorDb(base_dir, **kwargs)
+        else:
+            raise ValueError(f"Unknown vector database type: {db_type}")
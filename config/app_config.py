@@ -1,6 +1,7 @@
 # config/app_config.py
 import os
 from dataclasses import dataclass
+from typing import Optional
 
 @dataclass
 class AppConfig:
@@ -8,13 +9,102 @@ class AppConfig:
     # Paths
     BASE_DIR: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     PAPERS_DIR: str = os.path.join(BASE_DIR, "data/papers/raw")
+    CACHE_DIR: str = os.path.join(BASE_DIR, "data/cache")
 
     # API settings
     DEFAULT_PAPER_COUNT: int = 20
+    S2_BATCH_CONCURRENCY: int = 4
+    # Client-side rate limit (requests per second, burst size) matching the API key's quota.
+    # Set S2_RATE_LIMIT_STATE_PATH to a SQLite file to share the budget between processes.
+    S2_RATE_LIMIT: float = 1.0
+    S2_RATE_LIMIT_BURST: float = 1.0
+    S2_RATE_LIMIT_STATE_PATH: Optional[str] = None
+    METADATA_MAX_AGE_DAYS: int = 30
+    # Stale papers refreshed per run, one /paper/batch request
+    METADATA_REFRESH_LIMIT: int = 500
+    HARVEST_STATE_PATH: str = os.path.join(CACHE_DIR, "harvest_state.json")
+
+    # HTTP transport
+    HTTP_POOL_SIZE: int = 10
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 30.0
+    HTTP_MAX_RETRIES: int = 3
+    HTTP_BACKOFF_FACTOR: float = 1.0
+
+    # PDF downloads: worker pool size, per-host concurrency, per-download and global time limits (seconds)
+    DOWNLOAD_WORKERS: int = 8
+    DOWNLOAD_PER_HOST_LIMIT: int = 2
+    DOWNLOAD_TIMEOUT: float = 60.0
+    DOWNLOAD_DEADLINE: float = 300.0
+    DOWNLOAD_CHUNK_SIZE: int = 1024 * 1024
+    DOWNLOAD_MAX_BYTES: int = 50 * 1024 * 1024
+    # Download manifest (stored in the papers directory) and failure handling
+    DOWNLOAD_MANIFEST_FILE: str = "download_manifest.sqlite3"
+    DOWNLOAD_FAILURE_COOLDOWN: float = 24 * 60 * 60
+    HOST_FAILURE_THRESHOLD: int = 5
+    HOST_RESET_TIMEOUT: float = 300.0
+
+    # Semantic Scholar response cache
+    RESPONSE_CACHE_PATH: str = os.path.join(CACHE_DIR, "semantic_scholar.sqlite3")
+    RESPONSE_CACHE_TTL: float = 24 * 60 * 60
+    RESPONSE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
 
     # Model settings
     DEFAULT_EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    # Embedding backend: "torch" (sentence-transformers), "onnx" (ONNX Runtime) or
+    # "onnx-int8" (ONNX Runtime with dynamically int8-quantized weights)
+    EMBEDDING_BACKEND: str = "torch"
+    EMBEDDING_ONNX_DIR: str = os.path.join(CACHE_DIR, "onnx")
+    EMBEDDING_MAX_TOKENS: int = 256
+    # Embedding cache keyed by model and text hash: vectors are stored as "float32" or
+    # "float16" rows, and the least recently used are evicted beyond the entry limit
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_DIR: str = os.path.join(CACHE_DIR, "embeddings")
+    EMBEDDING_CACHE_DTYPE: str = "float32"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 500_000
+    # Ingest embedding stage: texts per model call, worker processes (1 embeds in-process,
+    # 0 = one per CPU core) and texts embedded and written to the vector database per step
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_WORKERS: int = 1
+    VECTOR_DB_WRITE_BATCH_SIZE: int = 4096
     MAX_PAGES_PER_PDF: int = 20
+    # PDF page rendering: worker processes (0 = one per CPU core) and pages per worker task
+    RENDER_WORKERS: int = 0
+    RENDER_PAGES_PER_TASK: int = 4
+    # Page image encoding: "png", "jpeg" or "webp" (needs Pillow), quality for lossy formats,
+    # resolution, color and a cap on the longest edge (the largest size the model makes use of)
+    RENDER_IMAGE_FORMAT: str = "jpeg"
+    RENDER_IMAGE_QUALITY: int = 80
+    RENDER_DPI: float = 144.0
+    RENDER_GRAYSCALE: bool = False
+    RENDER_MAX_DIMENSION: int = 1568
+    # Text-first hybrid mode: send the text layer of plain text pages and rasterize only pages
+    # with little text, large images, vector figures or tables
+    PDF_TEXT_FIRST: bool = False
+    TEXT_FIRST_MIN_TEXT_CHARS: int = 200
+    TEXT_FIRST_MIN_IMAGE_AREA: float = 0.1
+    TEXT_FIRST_MIN_DRAWINGS: int = 50
+    # Query-aware page selection: pages scanned per PDF, global number of pages sent for all
+    # documents together (each paper's first page is always kept) and encoded image byte budget (0 = none)
+    PAGE_SELECTION_MAX_SCAN_PAGES: int = 100
+    PAGE_BUDGET: int = 30
+    PAGE_BYTE_BUDGET: int = 0
+    # Attach PDFs as documents instead of page images when the model supports it
+    PREFER_DOCUMENT_INPUT: bool = True
+    # Blank and near-duplicate page removal: ink pixel ratio below which a page is blank,
+    # maximum dHash distance (of 256 bits) and minimum word overlap of duplicate pages
+    DROP_REDUNDANT_PAGES: bool = True
+    BLANK_PAGE_MAX_INK_RATIO: float = 0.002
+    DUPLICATE_PAGE_MAX_DISTANCE: int = 12
+    DUPLICATE_PAGE_MIN_WORD_OVERLAP: float = 0.8
+    # Rendered page image cache
+    PAGE_CACHE_ENABLED: bool = True
+    PAGE_CACHE_PATH: str = os.path.join(CACHE_DIR, "page_images.sqlite3")
+    PAGE_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024
 
-    # Database
-    VECTOR_DB_FOLDER: str = "vector_db"
\ No newline at end of file
+    # Database: "chroma" (Chroma with an HNSW index) or "flat" (exact search over a
+    # memory-mapped NumPy matrix, whose vectors are stored as "float32" or "float16")
+    VECTOR_DB_BACKEND: str = "chroma"
+    VECTOR_DB_FOLDER: str = "vector_db"
+    FLAT_VECTOR_DB_FOLDER: str = "flat_vector_db"
+    FLAT_VECTOR_DB_DTYPE: str = "float32"
\ No newline at end of file
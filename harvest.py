@@ -0,0 +1,89 @@
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime
+
+from main import validate_date, validate_positive_int
+from utils.error_handler import ResearchAgentError, handle_exceptions
+from utils.logging_config import configure_logging
+from utils.logger import Logger
+from config.app_config import AppConfig
+
+# Entry point of the bulk harvester, kept apart from main.py so that no research query is
+# mistaken for a subcommand. The harvester, Chroma and the embedding model are imported
+# where they are used, so that --help and invalid arguments return without loading them
+
+
+def parse_harvest_arguments(argv):
+    """Parse and validate command line arguments of the harvester."""
+    parser = argparse.ArgumentParser(description='Harvest a large topic corpus with the Semantic Scholar bulk search',
+                                     epilog='Research queries are run with "main.py".')
+
+    parser.add_argument('query', type=str, help='Bulk search query (supports boolean syntax, e.g. "gnn + traffic")')
+    parser.add_argument('--output', type=str, help='JSONL file to append harvested papers to')
+    parser.add_argument('--ingest', action='store_true', help='Ingest harvested papers into the vector database')
+    parser.add_argument('--state', type=str, default=AppConfig.HARVEST_STATE_PATH,
+                        help='Checkpoint file used to resume an interrupted harvest')
+    parser.add_argument('--start-date', type=validate_date, help='Start date for paper search (format: YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=validate_date, help='End date for paper search (format: YYYY-MM-DD)')
+    parser.add_argument('--max-papers', type=validate_positive_int, help='Stop after this many papers')
+    parser.add_argument(
+        '--log-level',
+        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
+        default='INFO',
+        help='Set the logging level'
+    )
+
+    args = parser.parse_args(argv)
+
+    if not args.output and not args.ingest:
+        parser.error("Provide --output, --ingest, or both.")
+
+    if args.start_date and args.end_date and args.start_date > args.end_date:
+        parser.error("Start date must be before end date.")
+
+    if not args.query.strip():
+        parser.error("Harvest query cannot be empty.")
+
+    return args
+
+
+def harvest(args):
+    """Harvest the papers matching the query."""
+    from services.bulk_harvester import BulkHarvester
+    from services.paper_retriever import PaperRetriever
+
+    logger = configure_logging(log_level=getattr(logging, args.log_level))
+
+    year = {}
+    if args.start_date:
+        year['start_year'] = datetime.strptime(args.start_date, '%Y-%m-%d').year
+    if args.end_date:
+        year['end_year'] = datetime.strptime(args.end_date, '%Y-%m-%d').year
+
+    vector_db = None
+    if args.ingest:
+        from classes.vector_db.vector_db_factory import VectorDbFactory
+        vector_db = VectorDbFactory.create_vector_db(base_dir=os.path.dirname(PaperRetriever.DOWNLOAD_DIR))
+    harvester = BulkHarvester(vector_db=vector_db)
+    paper_count = harvester.harvest(
+        query=args.query,
+        state_path=args.state,
+        output_path=args.output,
+        year=year or None,
+        max_papers=args.max_papers
+    )
+
+    Logger.info(logger, f"Harvest complete: {paper_count} papers.")
+    return 0
+
+
+@handle_exceptions(error_type=ResearchAgentError)
+def main():
+    """Main entry point for the bulk harvester."""
+    return harvest(parse_harvest_arguments(sys.argv[1:]))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,8 +8,9 @@ from classes.model_adapter.model_adapter_factory import ModelAdapterFactory
 from utils.error_handler import ResearchAgentError, handle_exceptions
 from utils.logging_config import configure_logging
 from utils.logger import Logger
-from classes.model_adapter.claude_model_adapter import ClaudeModelAdapter
-from services.langchain import ResearchAgent
+
+# langchain, Chroma, PyMuPDF and the embedding model are imported where they are used,
+# so that --help and invalid arguments return without loading them
 
 def validate_date(date_str):
     """Validate date string format (YYYY-MM-DD)."""
@@ -33,7 +34,9 @@ def validate_positive_int(value):
 
 def parse_arguments():
     """Parse and validate command line arguments."""
-    parser = argparse.ArgumentParser(description='LLM-Based Research Agent for Literature Review')
+    parser = argparse.ArgumentParser(description='LLM-Based Research Agent for Literature Review',
+                                     epilog='To build a large topic corpus with the Semantic Scholar bulk search, '
+                                            'use the separate harvest entry point: "harvest.py --help".')
 
     # Required argument: research query/topic
     parser.add_argument('query', type=str,
@@ -64,6 +67,7 @@ def parse_arguments():
 
     return args
 
+
 @handle_exceptions(error_type=ResearchAgentError)
 def main():
     """Main entry point for the research agent."""
@@ -82,6 +86,8 @@ def main():
     if not os.environ.get("ANTHROPIC_API_KEY"):
         Logger.info(logger,"ANTHROPIC_API_KEY undefined! Please set it in your environment variables.")
         return 1
+    from services.langchain import ResearchAgent
+
     model_adapter = ModelAdapterFactory.create_adapter("claude")
     research_agent = ResearchAgent(args, model_adapter)
     research_agent.research_pipeline()
@@ -0,0 +1,130 @@
+import json
+import os
+from typing import Dict, Optional
+
+from api.semantic_scholar import SemanticScholarClient
+from classes.vector_db.vector_database import VectorDatabase
+from config.app_config import AppConfig
+from utils.error_handler import handle_exceptions, APIError
+from utils.logger import Logger
+
+
+class BulkHarvester:
+    """
+    Harvests large topic corpora through the Semantic Scholar bulk search endpoint.
+
+    Results are streamed page by page to a JSONL file and/or straight into a vector
+    database, so memory use stays constant regardless of the corpus size. After every
+    page the continuation token is checkpointed to a state file, and a rerun with the
+    same state file resumes where the previous run stopped.
+    """
+
+    # Fields to retrieve for each harvested paper
+    PAPER_FIELDS = ["title", "abstract", "year", "authors", "url", "paperId", "openAccessPdf"]
+
+    def __init__(self, client: Optional[SemanticScholarClient] = None,
+                 vector_db: Optional[VectorDatabase] = None):
+        """
+        Initialize the BulkHarvester class.
+
+        Args:
+            client (Optional[SemanticScholarClient]): Client used for the bulk search
+            vector_db (Optional[VectorDatabase]): Vector database to ingest harvested papers into
+        """
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self.client = client or SemanticScholarClient()
+        self.vector_db = vector_db
+
+    @handle_exceptions(error_type=APIError)
+    def harvest(self,
+                query: str,
+                state_path: str = AppConfig.HARVEST_STATE_PATH,
+                output_path: Optional[str] = None,
+                year: Optional[Dict] = None,
+                max_papers: Optional[int] = None) -> int:
+        """
+        Harvest every paper matching the query.
+
+        Args:
+            query (str): Bulk search query
+            state_path (str): JSON file holding the resume checkpoint
+            output_path (Optional[str]): JSONL file the papers are appended to
+            year (Optional[Dict]): Year range with 'start_year' and/or 'end_year' keys
+            max_papers (Optional[int]): Stop once this many papers were harvested in total.
+                                    The rest of the last page is skipped, also on resume.
+
+        Returns:
+            int: Total number of papers harvested, including earlier runs on the same state
+        """
+        if output_path is None and self.vector_db is None:
+            raise ValueError("Provide an output path, a vector database, or both")
+
+        state = self._load_state(state_path, query, year)
+        if state['done'] or (max_papers is not None and state['papers'] >= max_papers):
+            Logger.info(self.logger, f"Harvest already complete ({state['papers']} papers)")
+            return state['papers']
+        if state['token']:
+            Logger.info(self.logger, f"Resuming harvest after {state['papers']} papers")
+
+        output_file = None
+        if output_path:
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            output_file = open(output_path, 'a', encoding='utf-8')
+
+        try:
+            for papers, next_token in self.client.iter_bulk_search(
+                query=query,
+                year=year,
+                fields=self.PAPER_FIELDS,
+                token=state['token']
+            ):
+                if max_papers is not None:
+                    papers = papers[:max(0, max_papers - state['papers'])]
+
+                if output_file is not None:
+                    for paper in papers:
+                        output_file.write(json.dumps(paper) + "\n")
+                    output_file.flush()
+                    os.fsync(output_file.fileno())
+                if self.vector_db is not None and papers:
+                    self.vector_db.create_embeddings_and_store(papers, append=True)
+
+                # Only checkpoint once the page is safely written
+                state['papers'] += len(papers)
+                state['token'] = next_token
+                state['done'] = next_token is None
+                self._save_state(state_path, state)
+                Logger.info(self.logger, f"Harvested {state['papers']} papers")
+
+                if max_papers is not None and state['papers'] >= max_papers:
+                    break
+        finally:
+            if output_file is not None:
+                output_file.close()
+
+        Logger.info(self.logger, f"Harvest finished with {state['papers']} papers")
+        return state['papers']
+
+    def _load_state(self, state_path: str, query: str, year: Optional[Dict]) -> Dict:
+        """Load the checkpoint for this query, or start a new one."""
+        fresh_state = {'query': query, 'year': year, 'token': None, 'papers': 0, 'done': False}
+        if not os.path.exists(state_path):
+            return fresh_state
+
+        with open(state_path, 'r', encoding='utf-8') as state_file:
+            state = json.load(state_file)
+        if state.get('query') != query or state.get('year') != year:
+            Logger.warning(self.logger, f"State file {state_path} belongs to another harvest, starting over")
+            return fresh_state
+        return state
+
+    @staticmethod
+    def _save_state(state_path: str, state: Dict):
+        """Write the checkpoint atomically, so a crash never leaves a truncated state file."""
+        os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+        temp_path = f"{state_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as state_file:
+            json.dump(state, state_file)
+            state_file.flush()
+            os.fsync(state_file.fileno())
+        os.replace(temp_path, state_path)
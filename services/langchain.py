@@ -1,8 +1,8 @@
 import os
 from models.query_keywords import QueryKeywords
-from classes.document_summarizer.multimodal_document_summarizer import MultimodalDocumentSummarizer
 from services.paper_retriever import PaperRetriever
-from classes.vector_db.chroma_vector_db import ChromaVectorDb
+from config.app_config import AppConfig
+from utils.error_handler import APIError
 from utils.logger import Logger
 
 
@@ -27,10 +27,34 @@ class ResearchAgent:
         self.model_adapter = model_adapter
         self.logger = Logger.get_logger(self.__class__.__name__)
 
-        # Use provided components or create defaults
+        # Use provided components or create defaults; the vector database and the summarizer
+        # pull in Chroma, the embedding model and PyMuPDF, so they are created on first use
         self.paper_retriever = paper_retriever or PaperRetriever()
-        self.vector_db = vector_db or ChromaVectorDb(os.path.dirname(self.paper_retriever.DOWNLOAD_DIR))
-        self.document_summarizer = document_summarizer or MultimodalDocumentSummarizer(self.focus, self.model_adapter)
+        self._vector_db = vector_db
+        self._document_summarizer = document_summarizer
+
+    @property
+    def vector_db(self):
+        """The vector database, created on first access."""
+        if self._vector_db is None:
+            from classes.vector_db.vector_db_factory import VectorDbFactory
+            self._vector_db = VectorDbFactory.create_vector_db(base_dir=os.path.dirname(self.paper_retriever.DOWNLOAD_DIR))
+        return self._vector_db
+
+    @property
+    def document_summarizer(self):
+        """The document summarizer, created on first access."""
+        if self._document_summarizer is None:
+            from classes.document_summarizer.multimodal_document_summarizer import MultimodalDocumentSummarizer
+            from utils.page_selector import PageSelector
+            from utils.pdf_processor import PDFProcessor
+            # Page texts are embedded without the embedding cache, which would otherwise
+            # fill up with them and evict the vectors of the stored abstracts
+            self._document_summarizer = MultimodalDocumentSummarizer(
+                self.focus, self.model_adapter,
+                pdf_processor=PDFProcessor(page_selector=PageSelector(self.vector_db.embedding_engine))
+            )
+        return self._document_summarizer
 
     def research_pipeline(self):
         """
@@ -44,19 +68,45 @@ class ResearchAgent:
             keywords=keywords,
             start_date=self.start_date,
             end_date=self.end_date,
-            max_papers=10
+            max_papers=self.paper_count
         )
         # Store the papers in the vector database
         self.vector_db.create_embeddings_and_store(papers, append=True)
+        self.refresh_stale_metadata()
 
         # Query the vector database
         Logger.info(self.logger,"\nQuerying vector database for similar papers...")
         search_results = self.vector_db.query_vector_database(self.query, n_results=2)
 
         Logger.info(self.logger,"\nProducing papers summary...")
-        summary = self.document_summarizer.create_summary(search_results)
+        summary = self.document_summarizer.create_summary(search_results, query=self.query)
         Logger.info(self.logger,f"\nSummary:\n{summary}")
 
+    def refresh_stale_metadata(self):
+        """
+        Refresh the metadata of indexed papers that has not been updated for a while.
+
+        At most METADATA_REFRESH_LIMIT papers are refreshed per run. Papers the API no longer
+        resolves are marked as refreshed, so they are not requested again on every run.
+        """
+        stale_ids = self.vector_db.get_stale_paper_ids(AppConfig.METADATA_MAX_AGE_DAYS,
+                                                       limit=AppConfig.METADATA_REFRESH_LIMIT)
+        if not stale_ids:
+            return
+        Logger.info(self.logger, f"Refreshing metadata for {len(stale_ids)} indexed papers...")
+        try:
+            papers = self.paper_retriever.refresh_papers(stale_ids)
+        except APIError:
+            # Already logged; the papers stay stale and are retried on the next run
+            return
+        self.vector_db.update_paper_metadata(papers)
+
+        resolved_ids = {paper['paperId'] for paper in papers}
+        unresolved_ids = [paper_id for paper_id in stale_ids if paper_id not in resolved_ids]
+        if unresolved_ids:
+            Logger.info(self.logger, f"{len(unresolved_ids)} indexed papers are unknown to the API")
+            self.vector_db.mark_papers_refreshed(unresolved_ids)
+
     def get_query_keywords(self, query):
         result = self.model_adapter.with_structured_output(QueryKeywords,query)
         return result.keywords
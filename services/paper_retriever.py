@@ -1,12 +1,17 @@
 import os
 import sys
-from typing import List, Dict, Optional, Any
+import time
+from concurrent.futures import as_completed, TimeoutError
+from typing import List, Dict, Optional, Any, Iterator, Tuple
 from datetime import datetime
+from api.response_cache import ResponseCache
 from api.semantic_scholar import SemanticScholarClient
 import urllib.parse
 
 from config.app_config import AppConfig
 from utils.error_handler import handle_exceptions, APIError
+from utils.download_pool import DownloadPool
+from utils.logger import Logger
 from utils.paper_downloader import PaperDownloader
 
 
@@ -16,17 +21,30 @@ class PaperRetriever:
     This class uses the SemanticScholarClient to search for papers and retrieve their details.
     """
     DOWNLOAD_DIR = AppConfig.PAPERS_DIR
+    # Fields to retrieve for each paper
+    PAPER_FIELDS = ["title", "abstract", "year", "authors", "url", "paperId", "openAccessPdf"]
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, response_cache: Optional[ResponseCache] = None,
+                 download_workers: int = AppConfig.DOWNLOAD_WORKERS,
+                 download_deadline: float = AppConfig.DOWNLOAD_DEADLINE):
         """
         Initialize the PaperRetriever class.
 
         Args:
             api_key (Optional[str]): The API key for Semantic Scholar.
                                     If not provided, will use default from SemanticScholarClient.
+            response_cache (Optional[ResponseCache]): Cache for search responses.
+                                    If not provided, the default on-disk cache is used.
+            download_workers (int): Maximum number of concurrent PDF downloads
+            download_deadline (float): Seconds after which unfinished downloads of a retrieval are abandoned
         """
-        self.client = SemanticScholarClient(api_key=api_key)
-        self.downloader = PaperDownloader(download_dir=self.DOWNLOAD_DIR)
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self.client = SemanticScholarClient(api_key=api_key, cache=response_cache or ResponseCache())
+        # Share the client's pooled transport so downloads reuse keep-alive connections
+        self.downloader = PaperDownloader(download_dir=self.DOWNLOAD_DIR, session=self.client.session,
+                                          timeout=self.client.timeout)
+        self.download_workers = download_workers
+        self.download_deadline = download_deadline
 
     @handle_exceptions(error_type=APIError, default_return=[])
     def retrieve_papers(self,
@@ -47,6 +65,47 @@ class PaperRetriever:
         Returns:
             List[Dict[str, Any]]: List of paper details
         """
+        # Keep the search ranking, downloads finish in arbitrary order
+        ranked_papers = sorted(self._iter_downloaded_papers(keywords, start_date, end_date, max_papers),
+                               key=lambda ranked_paper: ranked_paper[0])
+        papers = [paper for _, paper in ranked_papers]
+
+        cache_stats = self.client.cache.stats()
+        Logger.info(self.logger, f"Search cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+        Logger.debug(self.logger, f"Download report:\n{self.downloader.manifest.format_report()}")
+        return papers
+
+    def iter_papers(self,
+                    keywords: List[str],
+                    start_date: Optional[str] = None,
+                    end_date: Optional[str] = None,
+                    max_papers: int = AppConfig.DEFAULT_PAPER_COUNT) -> Iterator[Dict[str, Any]]:
+        """
+        Stream papers matching the keywords as soon as their PDF download finishes.
+
+        Search results are paged lazily and each paper is handed to the download pool as
+        soon as it arrives, so downloads overlap the search and each other. Papers are
+        yielded in completion order. Papers whose download fails, times out or misses the
+        global deadline are still yielded, with an empty 'local_file_path'.
+
+        Args:
+            keywords (List[str]): List of keywords to search for
+            start_date (Optional[str]): Start date in format 'YYYY-MM-DD'
+            end_date (Optional[str]): End date in format 'YYYY-MM-DD'
+            max_papers (int): Maximum number of papers to retrieve
+
+        Yields:
+            Dict[str, Any]: Paper details, with 'local_file_path' set when the PDF was downloaded
+        """
+        for _, paper in self._iter_downloaded_papers(keywords, start_date, end_date, max_papers):
+            yield paper
+
+    def _iter_downloaded_papers(self,
+                                keywords: List[str],
+                                start_date: Optional[str],
+                                end_date: Optional[str],
+                                max_papers: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (search rank, paper) pairs as the downloads complete."""
         # Prepare query string from keywords
         encoded_keywords = [urllib.parse.quote(keyword) for keyword in keywords]
         query = "+".join(encoded_keywords)  # Use "+" to represent spaces in URL
@@ -58,25 +117,55 @@ class PaperRetriever:
         if end_date:
             year_filter["end_year"] = datetime.strptime(end_date, '%Y-%m-%d').year
 
-        # Determine which fields to retrieve
-        fields = ["title", "abstract", "year", "authors", "url", "paperId", "openAccessPdf"]
-        # Search for papers
-        search_results = self.client.search_papers(
-            query=query,
-            year=year_filter if year_filter else None,
-            limit=max_papers,
-            fields=fields
-        )
-
-        # Get detailed information for each paper
-        paper_details = []
         # Directory to save downloaded files
         os.makedirs(self.DOWNLOAD_DIR, exist_ok=True)
-        for result in search_results.get('data', []):
-            paper_details.append(result)
-            self.downloader.download_paper(result)
 
-        return paper_details
+        deadline = time.monotonic() + self.download_deadline
+        pool = DownloadPool(self.downloader, max_workers=self.download_workers)
+        pending = {}
+        try:
+            # Search for papers, one page at a time, and start downloading right away
+            for rank, result in enumerate(self.client.iter_search_papers(
+                query=query,
+                year=year_filter if year_filter else None,
+                fields=self.PAPER_FIELDS,
+                max_results=max_papers
+            )):
+                pending[pool.submit(result, deadline=deadline)] = (rank, result)
+
+                # Hand out finished downloads without waiting for the search to end
+                for future in [future for future in pending if future.done()]:
+                    yield pending.pop(future)
+
+            try:
+                for future in as_completed(list(pending), timeout=max(0.0, deadline - time.monotonic())):
+                    yield pending.pop(future)
+            except TimeoutError:
+                Logger.warning(self.logger, f"Download deadline reached, {len(pending)} downloads abandoned")
+        finally:
+            pool.shutdown()
+
+        # Downloads that missed the deadline are returned without a local PDF. Their threads
+        # may still be running and writing into the paper, so the caller gets a copy
+        for future, (rank, paper) in pending.items():
+            future.cancel()
+            yield rank, dict(paper, local_file_path="")
 
+    @handle_exceptions(error_type=APIError)
+    def refresh_papers(self, paper_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch up-to-date details for papers that are already known, without downloading them.
 
+        Args:
+            paper_ids (List[str]): Semantic Scholar paper IDs
 
+        Returns:
+            List[Dict[str, Any]]: Paper details for the IDs the API still knows about
+
+        Raises:
+            APIError: If the details could not be fetched
+        """
+        if not paper_ids:
+            return []
+        papers = self.client.get_papers_batch(paper_ids, fields=self.PAPER_FIELDS)
+        return [paper for paper in papers if paper]
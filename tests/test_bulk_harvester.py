@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+from api.semantic_scholar import SemanticScholarClient
+from classes.vector_db.vector_database import VectorDatabase
+from services.bulk_harvester import BulkHarvester
+
+
+class TestBulkHarvester(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.temp_dir.name, "state.json")
+        self.output_path = os.path.join(self.temp_dir.name, "corpus.jsonl")
+        self.pages = {
+            None: ([{"paperId": "1"}, {"paperId": "2"}], "token-2"),
+            "token-2": ([{"paperId": "3"}], "token-3"),
+            "token-3": ([{"paperId": "4"}], None),
+        }
+        self.mock_client = Mock(spec=SemanticScholarClient)
+        self.mock_client.iter_bulk_search.side_effect = self._iter_bulk_search
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _iter_bulk_search(self, query, year=None, fields=None, token=None):
+        while True:
+            papers, token = self.pages[token]
+            yield papers, token
+            if token is None:
+                return
+
+    def _read_output(self):
+        with open(self.output_path, encoding='utf-8') as output_file:
+            return [json.loads(line)["paperId"] for line in output_file]
+
+    def test_harvest_streams_all_pages_to_jsonl(self):
+        # Arrange
+        harvester = BulkHarvester(client=self.mock_client)
+
+        # Act
+        count = harvester.harvest("gnn", state_path=self.state_path, output_path=self.output_path)
+
+        # Assert
+        self.assertEqual(count, 4)
+        self.assertEqual(self._read_output(), ["1", "2", "3", "4"])
+        with open(self.state_path, encoding='utf-8') as state_file:
+            state = json.load(state_file)
+        self.assertTrue(state["done"])
+
+    def test_harvest_resumes_from_checkpoint(self):
+        # Arrange
+        harvester = BulkHarvester(client=self.mock_client)
+        harvester.harvest("gnn", state_path=self.state_path, output_path=self.output_path, max_papers=2)
+
+        # Act
+        count = harvester.harvest("gnn", state_path=self.state_path, output_path=self.output_path)
+
+        # Assert
+        self.assertEqual(count, 4)
+        self.assertEqual(self._read_output(), ["1", "2", "3", "4"])
+        self.assertEqual(self.mock_client.iter_bulk_search.call_args.kwargs["token"], "token-2")
+
+    def test_harvest_restarts_for_another_query(self):
+        # Arrange
+        harvester = BulkHarvester(client=self.mock_client)
+        harvester.harvest("gnn", state_path=self.state_path, output_path=self.output_path, max_papers=2)
+
+        # Act
+        harvester.harvest("transformers", state_path=self.state_path, output_path=self.output_path, max_papers=1)
+
+        # Assert
+        self.assertIsNone(self.mock_client.iter_bulk_search.call_args.kwargs["token"])
+
+    def test_harvest_ingests_each_page_into_vector_db(self):
+        # Arrange
+        mock_vector_db = Mock(spec=VectorDatabase)
+        harvester = BulkHarvester(client=self.mock_client, vector_db=mock_vector_db)
+
+        # Act
+        count = harvester.harvest("gnn", state_path=self.state_path)
+
+        # Assert
+        self.assertEqual(count, 4)
+        self.assertEqual(mock_vector_db.create_embeddings_and_store.call_count, 3)
+        mock_vector_db.create_embeddings_and_store.assert_any_call([{"paperId": "3"}], append=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@ from unittest.mock import Mock, patch, MagicMock
 import os
 import tempfile
 from classes.vector_db.chroma_vector_db import ChromaVectorDb
+from utils.document_processor import DocumentProcessor
 from utils.error_handler import DatabaseError
 
 class TestChromaVectorDb(unittest.TestCase):
@@ -12,8 +13,11 @@ class TestChromaVectorDb(unittest.TestCase):
         self.temp_dir = tempfile.TemporaryDirectory()
         # Mock HuggingFaceEmbeddings
         self.mock_embeddings = Mock()
-        with patch('classes.vector_db.chroma_vector_db.HuggingFaceEmbeddings', return_value=self.mock_embeddings):
-            self.vector_db = ChromaVectorDb(self.temp_dir.name, model_name="test-model")
+        self.mock_embeddings.embed_documents.side_effect = lambda texts: [[float(len(text)), 1.0] for text in texts]
+        embeddings_patcher = patch('langchain_huggingface.HuggingFaceEmbeddings', return_value=self.mock_embeddings)
+        self.mock_hf = embeddings_patcher.start()
+        self.addCleanup(embeddings_patcher.stop)
+        self.vector_db = ChromaVectorDb(self.temp_dir.name, model_name="test-model", use_embedding_cache=False)
     
     def tearDown(self):
         self.temp_dir.cleanup()
@@ -26,7 +30,7 @@ class TestChromaVectorDb(unittest.TestCase):
         mock_exists.return_value = False
         mock_prepare_docs.return_value = 5  # 5 papers added
         mock_chroma_instance = MagicMock()
-        mock_chroma.from_texts.return_value = mock_chroma_instance
+        mock_chroma.return_value = mock_chroma_instance
         
         test_papers = [{"title": "Test Paper", "abstract": "Test abstract"}]
         mock_documents = ["doc1", "doc2"]
@@ -38,7 +42,11 @@ class TestChromaVectorDb(unittest.TestCase):
         
         # Assert
         self.assertEqual(result, mock_chroma_instance)
-        mock_chroma.from_texts.assert_called_once()
+        mock_chroma.assert_called_once_with(
+            persist_directory=self.vector_db.db_directory,
+            embedding_function=self.vector_db.embeddings
+        )
+        mock_chroma.from_texts.assert_not_called()
     
     @patch('classes.vector_db.chroma_vector_db.Chroma')
     @patch('classes.vector_db.chroma_vector_db.os.path.exists')
@@ -74,8 +82,9 @@ class TestChromaVectorDb(unittest.TestCase):
         
         mock_chroma.assert_called_once_with(
             persist_directory=self.vector_db.db_directory,
-            embedding_function=self.mock_embeddings
+            embedding_function=self.vector_db.embeddings
         )
+        self.assertIs(self.vector_db.embedding_engine.embeddings, self.mock_embeddings)
         mock_chroma_instance.similarity_search_with_score.assert_called_once_with("test query", k=2)
     
     @patch('classes.vector_db.chroma_vector_db.os.path.exists')
@@ -88,6 +97,257 @@ class TestChromaVectorDb(unittest.TestCase):
         
         # Assert
         self.assertEqual(results, [])
+    @patch('classes.vector_db.chroma_vector_db.time.time')
+    @patch('classes.vector_db.chroma_vector_db.Chroma')
+    @patch('classes.vector_db.chroma_vector_db.os.path.exists')
+    def test_get_stale_paper_ids(self, mock_exists, mock_chroma, mock_time):
+        # Arrange
+        mock_exists.return_value = True
+        mock_time.return_value = 100 * 24 * 60 * 60
+        mock_chroma_instance = MagicMock()
+        mock_chroma.return_value = mock_chroma_instance
+        mock_chroma_instance._collection.metadata = {"retrieved_at_backfilled": True}
+        mock_chroma_instance._collection.get.return_value = {
+            "ids": ["paper_old", "paper_legacy"],
+            "metadatas": [
+                {"paperId": "old", "retrieved_at": 50 * 24 * 60 * 60},
+                {"paperId": "legacy", "retrieved_at": 0},
+            ]
+        }
+
+        # Act
+        stale_ids = self.vector_db.get_stale_paper_ids(max_age_days=30)
+
+        # Assert
+        self.assertEqual(stale_ids, ["old", "legacy"])
+        mock_chroma_instance._collection.get.assert_called_once_with(
+            where={"retrieved_at": {"$lt": 70 * 24 * 60 * 60}}, limit=None, include=["metadatas"]
+        )
+        mock_chroma_instance._collection.update.assert_not_called()
+
+    @patch('classes.vector_db.chroma_vector_db.Chroma')
+    @patch('classes.vector_db.chroma_vector_db.os.path.exists')
+    def test_get_stale_paper_ids_backfills_legacy_papers_once(self, mock_exists, mock_chroma):
+        # Arrange
+        mock_exists.return_value = True
+        mock_chroma_instance = MagicMock()
+        mock_chroma.return_value = mock_chroma_instance
+        collection = mock_chroma_instance._collection
+        collection.metadata = None
+        collection.get.side_effect = [
+            {"ids": ["paper_new", "paper_legacy"],
+             "metadatas": [{"paperId": "new", "retrieved_at": 1}, {"paperId": "legacy"}]},
+            {"ids": [], "metadatas": []},
+        ]
+
+        # Act
+        self.vector_db.get_stale_paper_ids()
+
+        # Assert
+        collection.update.assert_called_once_with(ids=["paper_legacy"], metadatas=[{"retrieved_at": 0}])
+        collection.modify.assert_called_once_with(metadata={"retrieved_at_backfilled": True})
+
+    @patch('classes.vector_db.chroma_vector_db.Chroma')
+    @patch('classes.vector_db.chroma_vector_db.os.path.exists')
+    def test_update_paper_metadata_keeps_local_file_path(self, mock_exists, mock_chroma):
+        # Arrange
+        mock_exists.return_value = True
+        mock_chroma_instance = MagicMock()
+        mock_chroma.return_value = mock_chroma_instance
+        mock_chroma_instance._collection.get.return_value = {
+            "ids": ["paper_1"],
+            "metadatas": [{"paperId": "1", "local_file_path": "/papers/1.pdf"}]
+        }
+        papers = [{"paperId": "1", "title": "New title"}, {"paperId": "2", "title": "Not indexed"}]
+
+        # Act
+        updated = self.vector_db.update_paper_metadata(papers)
+
+        # Assert
+        self.assertEqual(updated, 1)
+        update_kwargs = mock_chroma_instance._collection.update.call_args.kwargs
+        self.assertEqual(update_kwargs["ids"], ["paper_1"])
+        self.assertEqual(update_kwargs["metadatas"][0]["title"], "New title")
+        self.assertEqual(update_kwargs["metadatas"][0]["local_file_path"], "/papers/1.pdf")
+
+    @patch('classes.vector_db.chroma_vector_db.Chroma')
+    @patch('classes.vector_db.chroma_vector_db.os.path.exists')
+    def test_store_is_opened_once_across_calls(self, mock_exists, mock_chroma):
+        # Arrange
+        mock_exists.return_value = True
+        mock_chroma_instance = MagicMock()
+        mock_chroma.return_value = mock_chroma_instance
+        mock_chroma_instance.similarity_search_with_score.return_value = []
+        mock_chroma_instance._collection.get.return_value = {"ids": [], "metadatas": []}
+
+        # Act
+        self.vector_db.query_vector_database("first query")
+        self.vector_db.query_vector_database("second query")
+        self.vector_db.get_stale_paper_ids()
+
+        # Assert
+        mock_chroma.assert_called_once()
+        self.assertEqual(mock_chroma_instance.similarity_search_with_score.call_count, 2)
+
+    @patch('classes.vector_db.chroma_vector_db.Chroma')
+    @patch('classes.vector_db.chroma_vector_db.os.path.exists')
+    def test_close_releases_client_and_reopens_on_next_use(self, mock_exists, mock_chroma):
+        # Arrange
+        mock_exists.return_value = True
+        mock_chroma_instance = MagicMock()
+        mock_chroma.return_value = mock_chroma_instance
+        mock_chroma_instance.similarity_search_with_score.return_value = []
+        self.vector_db.query_vector_database("test query")
+
+        # Act
+        self.vector_db.close()
+        self.vector_db.close()
+        self.vector_db.query_vector_database("test query")
+
+        # Assert
+        mock_chroma_instance._client.close.assert_called_once()
+        self.assertEqual(mock_chroma.call_count, 2)
+
+    @patch('classes.vector_db.chroma_vector_db.Chroma')
+    @patch('classes.vector_db.chroma_vector_db.os.path.exists')
+    @patch('classes.vector_db.chroma_vector_db.DocumentProcessor.prepare_documents')
+    def test_create_embeddings_and_store_overwrite_resets_open_store(self, mock_prepare_docs, mock_exists, mock_chroma):
+        # Arrange
+        mock_exists.return_value = True
+        mock_chroma_instance = MagicMock()
+        mock_chroma.return_value = mock_chroma_instance
+
+        def prepare(documents, existing_ids, ids, metadatas, papers, papers_added):
+            documents.append("doc1")
+            ids.append("paper_1")
+            metadatas.append({"paperId": "1"})
+            return 1
+        mock_prepare_docs.side_effect = prepare
+
+        # Act
+        result = self.vector_db.create_embeddings_and_store([{"paperId": "1"}], append=False)
+
+        # Assert
+        self.assertEqual(result, mock_chroma_instance)
+        mock_chroma_instance.reset_collection.assert_called_once()
+        mock_chroma_instance._collection.upsert.assert_called_once_with(
+            ids=["paper_1"], embeddings=[[4.0, 1.0]], metadatas=[{"paperId": "1"}], documents=["doc1"]
+        )
+        mock_chroma.from_texts.assert_not_called()
+
+    @patch('classes.vector_db.chroma_vector_db.Chroma')
+    @patch('classes.vector_db.chroma_vector_db.os.path.exists')
+    @patch('classes.vector_db.chroma_vector_db.DocumentProcessor.prepare_documents')
+    def test_new_store_is_reused_by_queries(self, mock_prepare_docs, mock_exists, mock_chroma):
+        # Arrange
+        mock_exists.return_value = False
+        mock_prepare_docs.return_value = 0
+        mock_chroma_instance = MagicMock()
+        mock_chroma.return_value = mock_chroma_instance
+        mock_chroma_instance.similarity_search_with_score.return_value = []
+
+        # Act
+        self.vector_db.create_embeddings_and_store([], append=False)
+        self.vector_db.query_vector_database("test query")
+
+        # Assert
+        mock_chroma.assert_called_once()
+        mock_chroma_instance.similarity_search_with_score.assert_called_once_with("test query", k=5)
+
+    @patch('classes.vector_db.chroma_vector_db.Chroma')
+    @patch('classes.vector_db.chroma_vector_db.os.path.exists')
+    def test_append_checks_only_candidate_ids(self, mock_exists, mock_chroma):
+        # Arrange
+        mock_exists.return_value = True
+        mock_chroma_instance = MagicMock()
+        mock_chroma.return_value = mock_chroma_instance
+        mock_chroma_instance._collection.get.return_value = {
+            "ids": ["paper_1"], "metadatas": [DocumentProcessor.build_metadata({"paperId": "1"})]
+        }
+        papers = [
+            {"paperId": "1", "abstract": "Stored abstract"},
+            {"paperId": "2", "abstract": "New abstract"},
+            {"paperId": "3"},
+        ]
+
+        # Act
+        self.vector_db.create_embeddings_and_store(papers, append=True)
+
+        # Assert
+        mock_chroma_instance._collection.get.assert_called_once_with(ids=["paper_1", "paper_2"],
+                                                                     include=["metadatas"])
+        mock_chroma_instance._collection.update.assert_not_called()
+        upsert_kwargs = mock_chroma_instance._collection.upsert.call_args.kwargs
+        self.assertEqual(upsert_kwargs["ids"], ["paper_2"])
+        self.assertEqual(upsert_kwargs["documents"], ["New abstract"])
+        self.assertEqual(upsert_kwargs["embeddings"], [[12.0, 1.0]])
+
+    @patch('classes.vector_db.chroma_vector_db.AppConfig.VECTOR_DB_WRITE_BATCH_SIZE', 2)
+    @patch('classes.vector_db.chroma_vector_db.Chroma')
+    @patch('classes.vector_db.chroma_vector_db.os.path.exists')
+    def test_documents_are_upserted_in_write_batches(self, mock_exists, mock_chroma):
+        # Arrange
+        mock_exists.return_value = False
+        mock_chroma_instance = MagicMock()
+        mock_chroma.return_value = mock_chroma_instance
+        papers = [{"paperId": str(index), "abstract": "a" * (index + 1)} for index in range(5)]
+
+        # Act
+        self.vector_db.create_embeddings_and_store(papers, append=False)
+
+        # Assert
+        calls = mock_chroma_instance._collection.upsert.call_args_list
+        self.assertEqual([call.kwargs["ids"] for call in calls],
+                         [["paper_0", "paper_1"], ["paper_2", "paper_3"], ["paper_4"]])
+        self.assertEqual(calls[2].kwargs["embeddings"], [[5.0, 1.0]])
+
+    def test_storing_a_paper_again_updates_its_metadata(self):
+        # Arrange
+        paper = {"paperId": "1", "title": "Paper", "abstract": "Abstract"}
+        self.vector_db.create_embeddings_and_store([paper])
+
+        # Act
+        self.vector_db.create_embeddings_and_store([dict(paper, local_file_path="/x.pdf")])
+        self.vector_db.create_embeddings_and_store([dict(paper, title="Renamed")])
+
+        # Assert
+        stored = self.vector_db._get_store()._collection.get(ids=["paper_1"], include=["metadatas"])
+        self.assertEqual(stored["metadatas"][0]["local_file_path"], "/x.pdf")
+        self.assertEqual(stored["metadatas"][0]["title"], "Renamed")
+        self.assertEqual(self.mock_embeddings.embed_documents.call_count, 1)
+        self.vector_db.close()
+
+    def test_marked_papers_are_no_longer_stale(self):
+        # Arrange
+        papers = [{"paperId": str(index), "title": f"Paper {index}", "abstract": "Abstract"} for index in range(3)]
+        with patch('utils.document_processor.time.time', return_value=1000.0):
+            self.vector_db.create_embeddings_and_store(papers)
+
+        # Act
+        limited = self.vector_db.get_stale_paper_ids(max_age_days=30, limit=2)
+        marked = self.vector_db.mark_papers_refreshed(["0", "9"])
+        stale_ids = self.vector_db.get_stale_paper_ids(max_age_days=30)
+
+        # Assert
+        self.assertEqual(len(limited), 2)
+        self.assertEqual(marked, 1)
+        self.assertEqual(sorted(stale_ids), ["1", "2"])
+        stored = self.vector_db._get_store()._collection.get(ids=["paper_0"], include=["metadatas"])
+        self.assertEqual(stored["metadatas"][0]["title"], "Paper 0")
+        self.vector_db.close()
+
+    def test_embedding_model_is_loaded_on_first_use(self):
+        # Arrange
+        vector_db = ChromaVectorDb(self.temp_dir.name, model_name="test-model", use_embedding_cache=False)
+
+        # Act
+        loaded_before_use = self.mock_hf.call_count
+        vectors = vector_db.embeddings.embed_documents(["abc"])
+
+        # Assert
+        self.assertEqual(loaded_before_use, 0)
+        self.mock_hf.assert_called_once_with(model_name="test-model")
+        self.assertEqual(vectors, [[3.0, 1.0]])
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,69 @@
+import unittest
+
+from utils.document_processor import DocumentProcessor
+
+
+class TestDocumentProcessor(unittest.TestCase):
+
+    def test_candidate_ids_skips_papers_without_abstract_and_repeats(self):
+        # Arrange
+        papers = [
+            {"paperId": "1", "abstract": "First"},
+            {"paperId": "2"},
+            {"paperId": "1", "abstract": "First again"},
+            {"abstract": "No ID"},
+            {"paperId": "3", "abstract": "Third"},
+        ]
+
+        # Act
+        candidate_ids = DocumentProcessor.candidate_ids(papers)
+
+        # Assert
+        self.assertEqual(candidate_ids, ["paper_1", "paper_3"])
+
+    def test_prepare_documents_skips_existing_and_repeated_papers(self):
+        # Arrange
+        papers = [
+            {"paperId": "1", "abstract": "Stored"},
+            {"paperId": "2", "abstract": "New"},
+            {"paperId": "2", "abstract": "New again"},
+        ]
+        existing_ids = {"paper_1"}
+        documents, ids, metadatas = [], [], []
+
+        # Act
+        papers_added = DocumentProcessor.prepare_documents(documents, existing_ids, ids, metadatas, papers, 0)
+
+        # Assert
+        self.assertEqual(papers_added, 1)
+        self.assertEqual(documents, ["New"])
+        self.assertEqual(ids, ["paper_2"])
+        self.assertEqual(metadatas[0]["paperId"], "2")
+        self.assertEqual(existing_ids, {"paper_1"})
+
+
+    def test_changed_metadata_keeps_stored_pdf_path_and_ignores_retrieval_time(self):
+        # Arrange
+        stored_metadata = {
+            "paper_1": DocumentProcessor.build_metadata({"paperId": "1", "title": "One"}),
+            "paper_2": DocumentProcessor.build_metadata({"paperId": "2", "title": "Two", "local_file_path": "/2.pdf"}),
+            "paper_3": DocumentProcessor.build_metadata({"paperId": "3", "title": "Three"}),
+        }
+        stored_metadata["paper_3"]["retrieved_at"] = 0
+        papers = [
+            {"paperId": "1", "title": "One", "abstract": "A", "local_file_path": "/1.pdf"},
+            {"paperId": "2", "title": "Two", "abstract": "B"},
+            {"paperId": "3", "title": "Three", "abstract": "C"},
+            {"paperId": "4", "title": "New", "abstract": "D"},
+        ]
+
+        # Act
+        ids, metadatas = DocumentProcessor.changed_metadata(papers, stored_metadata)
+
+        # Assert
+        self.assertEqual(ids, ["paper_1"])
+        self.assertEqual(metadatas[0]["local_file_path"], "/1.pdf")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+from services.paper_retriever import PaperRetriever
+from utils.download_pool import DownloadPool
+from utils.error_handler import APIError
+
+
+class FakeDownloader:
+    """Downloader stub that records how many downloads per host run at once."""
+
+    def __init__(self, duration=0.05, fail_urls=()):
+        self.duration = duration
+        self.fail_urls = set(fail_urls)
+        self.active = {}
+        self.max_active = {}
+        self.lock = threading.Lock()
+        self.manifest = Mock()
+
+    def download_paper(self, paper, deadline=None):
+        url = paper['openAccessPdf']['url']
+        host = url.split('/')[2]
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.max_active[host] = max(self.max_active.get(host, 0), self.active[host])
+        time.sleep(self.duration)
+        with self.lock:
+            self.active[host] -= 1
+        if url in self.fail_urls:
+            raise APIError(f"Failed: {url}")
+        paper['local_file_path'] = f"/papers/{paper['paperId']}.pdf"
+
+
+def make_paper(paper_id, host="arxiv.org"):
+    return {"paperId": paper_id, "openAccessPdf": {"url": f"https://{host}/{paper_id}.pdf"}}
+
+
+class TestDownloadPool(unittest.TestCase):
+
+    def test_per_host_limit_is_respected(self):
+        # Arrange
+        downloader = FakeDownloader()
+        pool = DownloadPool(downloader, max_workers=6, per_host_limit=2)
+        papers = [make_paper(str(i)) for i in range(6)] + [make_paper(f"o{i}", host="other.org") for i in range(2)]
+
+        # Act
+        futures = [pool.submit(paper) for paper in papers]
+        results = [future.result(timeout=5) for future in futures]
+        pool.shutdown()
+
+        # Assert
+        self.assertEqual(downloader.max_active["arxiv.org"], 2)
+        self.assertTrue(all(paper['local_file_path'] for paper in results))
+
+    def test_failed_download_keeps_paper_without_pdf(self):
+        # Arrange
+        downloader = FakeDownloader(duration=0, fail_urls={"https://arxiv.org/bad.pdf"})
+        pool = DownloadPool(downloader, max_workers=2)
+
+        # Act
+        result = pool.submit(make_paper("bad")).result(timeout=5)
+        pool.shutdown()
+
+        # Assert
+        self.assertEqual(result['local_file_path'], "")
+
+    def test_paper_without_pdf_is_returned_unchanged(self):
+        # Arrange
+        downloader = Mock()
+        pool = DownloadPool(downloader)
+
+        # Act
+        result = pool.submit({"paperId": "1"}).result(timeout=5)
+        pool.shutdown()
+
+        # Assert
+        self.assertEqual(result, {"paperId": "1", "local_file_path": ""})
+        downloader.download_paper.assert_not_called()
+
+
+class TestPaperRetrieverDownloads(unittest.TestCase):
+
+    def setUp(self):
+        # Keep the real downloader from creating its store and manifest in the papers folder
+        with patch('services.paper_retriever.ResponseCache'), patch('services.paper_retriever.PaperDownloader'):
+            self.retriever = PaperRetriever(download_workers=4, download_deadline=0.5)
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.retriever.DOWNLOAD_DIR = temp_dir.name
+        self.retriever.client = Mock()
+        self.retriever.client.cache.stats.return_value = {"hits": 0, "misses": 1}
+
+    def test_retrieve_papers_downloads_concurrently_in_rank_order(self):
+        # Arrange
+        papers = [make_paper(str(i), host=f"host{i}.org") for i in range(4)]
+        self.retriever.client.iter_search_papers.return_value = iter(papers)
+        self.retriever.downloader = FakeDownloader(duration=0.2)
+
+        # Act
+        start = time.monotonic()
+        result = self.retriever.retrieve_papers(["gnn"], max_papers=4)
+        elapsed = time.monotonic() - start
+
+        # Assert
+        self.assertEqual([paper["paperId"] for paper in result], ["0", "1", "2", "3"])
+        self.assertTrue(all(paper["local_file_path"] for paper in result))
+        self.assertLess(elapsed, 0.6)
+
+    def test_retrieve_papers_abandons_downloads_after_deadline(self):
+        # Arrange
+        papers = [make_paper("fast", host="fast.org"), make_paper("slow", host="slow.org")]
+        self.retriever.client.iter_search_papers.return_value = iter(papers)
+        downloader = FakeDownloader(duration=0)
+        slow_download = downloader.download_paper
+
+        def download_paper(paper, deadline=None):
+            if paper["paperId"] == "slow":
+                time.sleep(0.7)
+                paper["local_file_path"] = "/papers/slow.pdf"
+                return
+            slow_download(paper, deadline)
+
+        self.retriever.downloader = Mock(download_paper=download_paper)
+
+        # Act
+        result = self.retriever.retrieve_papers(["gnn"], max_papers=2)
+        # Let the abandoned download finish in the background
+        time.sleep(0.4)
+
+        # Assert
+        self.assertEqual([paper["paperId"] for paper in result], ["fast", "slow"])
+        self.assertEqual(result[0]["local_file_path"], "/papers/fast.pdf")
+        self.assertEqual(result[1]["local_file_path"], "")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from utils.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+class CountingEmbeddings(Embeddings):
+    """Embeddings derived from the text's characters that count how many texts they embed."""
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        self.embedded.append(text)
+        return self._vector(text)
+
+    @staticmethod
+    def _vector(text):
+        return [len(text) / 10, sum(map(ord, text)) % 97 / 97, 0.125, -0.5]
+
+
+class TestEmbeddingCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_repeated_texts_are_embedded_once(self):
+        # Arrange
+        model = CountingEmbeddings()
+        cache = EmbeddingCache(self.temp_dir.name)
+        embeddings = CachedEmbeddings(model, "test-model", cache)
+        first = embeddings.embed_documents(["alpha", "beta", "alpha"])
+
+        # Act
+        second = embeddings.embed_documents(["beta", "alpha", "gamma"])
+
+        # Assert
+        self.assertEqual(model.embedded, ["alpha", "beta", "gamma"])
+        self.assertEqual(second[:2], [first[1], first[0]])
+        np.testing.assert_allclose(first[0], CountingEmbeddings._vector("alpha"), rtol=1e-6)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (2, 3, 3))
+        self.assertAlmostEqual(stats['hit_rate'], 0.4)
+        cache.close()
+
+    def test_cache_persists_across_instances(self):
+        # Arrange
+        first_model = CountingEmbeddings()
+        cache = EmbeddingCache(self.temp_dir.name)
+        expected = CachedEmbeddings(first_model, "test-model", cache).embed_documents(["alpha", "beta"])
+        cache.close()
+        second_model = CountingEmbeddings()
+
+        # Act
+        reopened = EmbeddingCache(self.temp_dir.name)
+        vectors = CachedEmbeddings(second_model, "test-model", reopened).embed_documents(["alpha", "beta"])
+        other_model = CachedEmbeddings(second_model, "other-model", reopened).embed_documents(["alpha"])
+
+        # Assert
+        self.assertEqual(vectors, expected)
+        self.assertEqual(second_model.embedded, ["alpha"])
+        self.assertEqual(other_model, [expected[0]])
+        reopened.close()
+
+    def test_queries_are_cached_apart_from_documents(self):
+        # Arrange
+        model = CountingEmbeddings()
+        embeddings = CachedEmbeddings(model, "test-model", EmbeddingCache(self.temp_dir.name))
+        embeddings.embed_documents(["alpha"])
+
+        # Act
+        vector = embeddings.embed_query("alpha")
+        embeddings.embed_query("alpha")
+
+        # Assert
+        self.assertEqual(model.embedded, ["alpha", "alpha"])
+        np.testing.assert_allclose(vector, CountingEmbeddings._vector("alpha"), rtol=1e-6)
+        embeddings.cache.close()
+
+    def test_float16_storage_halves_the_file_and_rounds_consistently(self):
+        # Arrange
+        vectors = {EmbeddingCache.text_hash(str(index)): [index / 3] * 8 for index in range(10)}
+        float32_cache = EmbeddingCache(os.path.join(self.temp_dir.name, "float32"), dtype="float32")
+        float16_cache = EmbeddingCache(os.path.join(self.temp_dir.name, "float16"), dtype="float16")
+
+        # Act
+        float32_cache.set_many("test-model", vectors)
+        stored = float16_cache.set_many("test-model", vectors)
+        found = float16_cache.get_many("test-model", list(vectors))
+
+        # Assert
+        self.assertEqual(float16_cache.stats()['bytes'] * 2, float32_cache.stats()['bytes'])
+        for text_hash, vector in vectors.items():
+            np.testing.assert_array_equal(found[text_hash], stored[text_hash])
+            np.testing.assert_allclose(found[text_hash], vector, rtol=1e-3)
+        float32_cache.close()
+        float16_cache.close()
+
+    def test_least_recently_used_entries_are_evicted_and_their_rows_reused(self):
+        # Arrange
+        cache = EmbeddingCache(self.temp_dir.name, max_entries=2)
+        hashes = [EmbeddingCache.text_hash(text) for text in ("a", "b", "c")]
+        cache.set_many("test-model", {hashes[0]: [1.0, 0.0]})
+        cache.set_many("test-model", {hashes[1]: [0.0, 1.0]})
+        cache.get_many("test-model", [hashes[0]])
+        size = cache.stats()['bytes']
+
+        # Act
+        cache.set_many("test-model", {hashes[2]: [1.0, 1.0]})
+        found = cache.get_many("test-model", hashes)
+
+        # Assert
+        self.assertEqual(sorted(found), sorted([hashes[0], hashes[2]]))
+        np.testing.assert_array_equal(found[hashes[2]], [1.0, 1.0])
+        np.testing.assert_array_equal(found[hashes[0]], [1.0, 0.0])
+        self.assertEqual(cache.stats()['entries'], 2)
+        self.assertEqual(cache.stats()['bytes'], size)
+        cache.set_many("test-model", {hashes[1]: [0.5, 0.5]})
+        self.assertEqual(cache._model_info("test-model")['next_row'], 3)
+        cache.close()
+
+    def test_vectors_of_another_dimension_are_rejected(self):
+        # Arrange
+        cache = EmbeddingCache(self.temp_dir.name)
+        cache.set_many("test-model", {EmbeddingCache.text_hash("a"): [1.0, 0.0]})
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            cache.set_many("test-model", {EmbeddingCache.text_hash("b"): [1.0, 0.0, 0.0]})
+        self.assertEqual(cache.stats()['entries'], 1)
+        cache.close()
+
+    def test_growing_the_vector_file_keeps_stored_vectors(self):
+        # Arrange
+        cache = EmbeddingCache(self.temp_dir.name)
+        count = EmbeddingCache.INITIAL_ROWS + 10
+        vectors = {EmbeddingCache.text_hash(str(index)): [float(index), 1.0] for index in range(count)}
+
+        # Act
+        cache.set_many("test-model", dict(list(vectors.items())[:10]))
+        cache.set_many("test-model", vectors)
+        found = cache.get_many("test-model", list(vectors))
+
+        # Assert
+        self.assertEqual(len(found), count)
+        for index, text_hash in enumerate(vectors):
+            self.assertEqual(found[text_hash][0], index)
+        self.assertEqual(cache._model_info("test-model")['next_row'], count)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import sys
+import unittest
+from unittest.mock import Mock, patch
+
+from langchain_core.embeddings import Embeddings
+
+from utils import embedding_engine
+from utils.embedding_engine import EmbeddingEngine
+
+
+class LengthEmbeddings(Embeddings):
+    """Embeddings that record their batches and map a text to its length and worker process."""
+
+    def __init__(self):
+        self.batches = []
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(text)), float(os.getpid())] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), float(os.getpid())]
+
+
+class TestEmbeddingEngine(unittest.TestCase):
+
+    def test_batches_are_length_sorted_and_vectors_keep_input_order(self):
+        # Arrange
+        model = LengthEmbeddings()
+        engine = EmbeddingEngine(model, batch_size=2, max_workers=1)
+        texts = ["ccc", "a", "eeeee", "bb", "dddd"]
+
+        # Act
+        vectors = engine.embed_documents(texts)
+
+        # Assert
+        self.assertEqual(model.batches, [["a", "bb"], ["ccc", "dddd"], ["eeeee"]])
+        self.assertEqual([vector[0] for vector in vectors], [3.0, 1.0, 5.0, 2.0, 4.0])
+
+    def test_without_worker_factory_texts_are_embedded_in_process(self):
+        # Arrange
+        model = LengthEmbeddings()
+        engine = EmbeddingEngine(model, batch_size=1, max_workers=2)
+
+        # Act
+        vectors = engine.embed_documents(["a", "bb"])
+
+        # Assert
+        self.assertEqual(len(model.batches), 2)
+        self.assertEqual({vector[1] for vector in vectors}, {float(os.getpid())})
+        self.assertIsNone(engine._executor)
+
+    def test_worker_processes_embed_batches_in_input_order(self):
+        # Arrange
+        model = LengthEmbeddings()
+        engine = EmbeddingEngine(model, batch_size=2, max_workers=2, worker_factory=LengthEmbeddings)
+        texts = ["x" * length for length in (7, 1, 4, 2, 6, 3, 5)]
+
+        # Act
+        vectors = engine.embed_documents(texts)
+        engine.close()
+
+        # Assert
+        self.assertEqual([vector[0] for vector in vectors], [7.0, 1.0, 4.0, 2.0, 6.0, 3.0, 5.0])
+        self.assertNotIn(float(os.getpid()), {vector[1] for vector in vectors})
+        self.assertEqual(model.batches, [])
+        self.assertIsNone(engine._executor)
+
+    def test_queries_are_embedded_in_process(self):
+        # Arrange
+        engine = EmbeddingEngine(LengthEmbeddings(), worker_factory=LengthEmbeddings, max_workers=2)
+
+        # Act
+        vector = engine.embed_query("query")
+
+        # Assert
+        self.assertEqual(vector, [5.0, float(os.getpid())])
+        self.assertIsNone(engine._executor)
+
+
+    def test_model_is_created_on_first_use(self):
+        # Arrange
+        created = []
+
+        def factory():
+            created.append(LengthEmbeddings())
+            return created[-1]
+        engine = EmbeddingEngine(worker_factory=factory, max_workers=1)
+
+        # Act
+        created_before_use = len(created)
+        engine.embed_documents(["a"])
+        engine.embed_query("b")
+
+        # Assert
+        self.assertEqual(created_before_use, 0)
+        self.assertEqual(len(created), 1)
+        self.assertEqual(created[0].batches, [["a"]])
+
+    def test_worker_limits_threads_of_backend_loaded_by_factory(self):
+        # Arrange
+        torch = Mock()
+
+        def factory():
+            # Loading the model is what imports torch in a fresh worker
+            sys.modules["torch"] = torch
+            self.assertEqual(os.environ["OMP_NUM_THREADS"], "3")
+            return LengthEmbeddings()
+
+        # Act
+        with patch.dict(sys.modules), patch.dict(os.environ), patch.object(embedding_engine, "_worker_embeddings"):
+            sys.modules.pop("torch", None)
+            embedding_engine._init_worker(factory, 3)
+
+        # Assert
+        torch.set_num_threads.assert_called_once_with(3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,224 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from classes.vector_db.flat_vector_db import FlatVectorDb
+
+
+class KeywordEmbeddings:
+    """Embeddings counting a few keywords, so the expected ranking is easy to reason about."""
+
+    KEYWORDS = ("graph", "neural", "protein")
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [text.count(keyword) + 0.01 for keyword in self.KEYWORDS]
+
+
+def create_paper(paper_id, abstract, **details):
+    return {"paperId": paper_id, "title": f"Title {paper_id}", "abstract": abstract, **details}
+
+
+class TestFlatVectorDb(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.vector_db = self.open_db()
+        self.papers = [
+            create_paper("1", "graph graph networks"),
+            create_paper("2", "neural networks for neural search"),
+            create_paper("3", "protein folding with graph models"),
+        ]
+
+    def tearDown(self):
+        self.vector_db.close()
+
+    def open_db(self, dtype="float32"):
+        return FlatVectorDb(self.temp_dir.name, embeddings=KeywordEmbeddings(), use_embedding_cache=False, dtype=dtype)
+
+    def test_query_returns_most_similar_first(self):
+        # Arrange
+        self.vector_db.create_embeddings_and_store(self.papers)
+
+        # Act
+        results = self.vector_db.query_vector_database("neural", n_results=2)
+
+        # Assert
+        self.assertEqual([result['metadata']['paperId'] for result in results], ["2", "3"])
+        self.assertEqual(results[0]['content'], "neural networks for neural search")
+        self.assertLess(results[0]['similarity_score'], results[1]['similarity_score'])
+        self.assertAlmostEqual(results[0]['similarity_score'], 0.0, places=3)
+
+    def test_query_without_database(self):
+        # Act
+        results = self.vector_db.query_vector_database("graph")
+
+        # Assert
+        self.assertEqual(results, [])
+
+    def test_append_grows_files_and_skips_existing_papers(self):
+        # Arrange
+        self.vector_db.create_embeddings_and_store(self.papers[:2])
+        vectors_path = os.path.join(self.vector_db.db_directory, FlatVectorDb.VECTORS_FILE)
+        first_row = open(vectors_path, 'rb').read()
+
+        # Act
+        self.vector_db.create_embeddings_and_store(self.papers)
+
+        # Assert
+        stored = open(vectors_path, 'rb').read()
+        self.assertEqual(len(stored), 3 * 3 * 4)
+        self.assertEqual(stored[:len(first_row)], first_row)
+        self.assertEqual(len(self.vector_db.query_vector_database("graph", n_results=10)), 3)
+
+    def test_storing_a_paper_again_updates_its_metadata(self):
+        # Arrange
+        self.vector_db.create_embeddings_and_store(self.papers)
+        vectors_path = os.path.join(self.vector_db.db_directory, FlatVectorDb.VECTORS_FILE)
+        vectors_size = os.path.getsize(vectors_path)
+
+        # Act
+        self.vector_db.create_embeddings_and_store([dict(self.papers[1], local_file_path="/x.pdf")])
+        self.vector_db.create_embeddings_and_store([self.papers[1]])
+        result = self.vector_db.query_vector_database("neural", n_results=1)[0]
+
+        # Assert
+        self.assertEqual(result['metadata']['local_file_path'], "/x.pdf")
+        self.assertEqual(os.path.getsize(vectors_path), vectors_size)
+
+    def test_overwrite_replaces_database(self):
+        # Arrange
+        self.vector_db.create_embeddings_and_store(self.papers)
+
+        # Act
+        self.vector_db.create_embeddings_and_store(self.papers[2:], append=False)
+
+        # Assert
+        results = self.vector_db.query_vector_database("graph", n_results=10)
+        self.assertEqual([result['metadata']['paperId'] for result in results], ["3"])
+
+    def test_appending_a_stored_id_replaces_its_row(self):
+        # Arrange
+        self.vector_db.create_embeddings_and_store(self.papers)
+
+        # Act
+        self.vector_db._append(["paper_1"], ["protein protein"], [{"paperId": "1"}], [[0.0, 0.0, 1.0]])
+        self.vector_db.close()
+        reopened = self.open_db()
+        results = reopened.query_vector_database("protein", n_results=10)
+
+        # Assert
+        self.assertEqual([result['metadata']['paperId'] for result in results], ["1", "3", "2"])
+        self.assertEqual(results[0]['content'], "protein protein")
+        reopened.close()
+
+    def test_reopen_after_close(self):
+        # Arrange
+        self.vector_db.create_embeddings_and_store(self.papers)
+        self.vector_db.close()
+
+        # Act
+        reopened = self.open_db(dtype="float16")
+        results = reopened.query_vector_database("graph", n_results=1)
+
+        # Assert
+        self.assertEqual(results[0]['metadata']['paperId'], "1")
+        self.assertEqual(reopened._vectors.dtype, np.float32)
+        reopened.close()
+
+    def test_float16_storage(self):
+        # Arrange
+        vector_db = FlatVectorDb(os.path.join(self.temp_dir.name, "half"), embeddings=KeywordEmbeddings(),
+                                 use_embedding_cache=False, dtype="float16")
+
+        # Act
+        vector_db.create_embeddings_and_store(self.papers)
+        results = vector_db.query_vector_database("protein", n_results=1)
+
+        # Assert
+        self.assertEqual(vector_db._vectors.dtype, np.float16)
+        self.assertEqual(results[0]['metadata']['paperId'], "3")
+        vector_db.close()
+
+    def test_unsupported_dtype(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            self.open_db(dtype="int8")
+
+    def test_interrupted_append_is_discarded(self):
+        # Arrange
+        self.vector_db.create_embeddings_and_store(self.papers[:2])
+        self.vector_db.close()
+        # Simulate a crash after the record, ID and vector of a row were written but before its offset
+        with open(os.path.join(self.vector_db.db_directory, FlatVectorDb.RECORDS_FILE), 'ab') as records_file:
+            records_file.write(b'{"id": "paper_torn", "document": "torn')
+        with open(os.path.join(self.vector_db.db_directory, FlatVectorDb.IDS_FILE), 'ab') as ids_file:
+            ids_file.write(b'"paper_torn"\n')
+        with open(os.path.join(self.vector_db.db_directory, FlatVectorDb.VECTORS_FILE), 'ab') as vectors_file:
+            vectors_file.write(np.ones(3, dtype=np.float32).tobytes())
+
+        # Act
+        reopened = self.open_db()
+        before = reopened.query_vector_database("graph", n_results=10)
+        reopened.create_embeddings_and_store(self.papers)
+        stale_ids = reopened.get_stale_paper_ids(max_age_days=-1)
+
+        # Assert
+        self.assertEqual(len(before), 2)
+        self.assertEqual(sorted(stale_ids), ["1", "2", "3"])
+        self.assertEqual(len(reopened.query_vector_database("graph", n_results=10)), 3)
+        reopened.close()
+
+    def test_stale_ids_and_metadata_update(self):
+        # Arrange
+        papers = [dict(paper, local_file_path=f"/pdfs/{paper['paperId']}.pdf") for paper in self.papers]
+        with patch('utils.document_processor.time.time', return_value=time.time() - 90 * 24 * 60 * 60):
+            self.vector_db.create_embeddings_and_store(papers)
+        fresh = create_paper("2", "ignored", title="Renamed", year=2024)
+
+        # Act
+        updated = self.vector_db.update_paper_metadata([fresh, create_paper("9", "unknown")])
+        self.vector_db.close()
+        reopened = self.open_db()
+        stale_ids = reopened.get_stale_paper_ids(max_age_days=30)
+        result = reopened.query_vector_database("neural", n_results=1)[0]
+
+        # Assert
+        self.assertEqual(updated, 1)
+        self.assertEqual(sorted(stale_ids), ["1", "3"])
+        self.assertEqual(result['metadata']['title'], "Renamed")
+        self.assertEqual(result['metadata']['year'], 2024)
+        self.assertEqual(result['metadata']['local_file_path'], "/pdfs/2.pdf")
+        self.assertEqual(result['content'], "neural networks for neural search")
+        reopened.close()
+
+    def test_marked_papers_are_no_longer_stale(self):
+        # Arrange
+        with patch('utils.document_processor.time.time', return_value=time.time() - 90 * 24 * 60 * 60):
+            self.vector_db.create_embeddings_and_store(self.papers)
+
+        # Act
+        limited = self.vector_db.get_stale_paper_ids(max_age_days=30, limit=2)
+        marked = self.vector_db.mark_papers_refreshed(["1", "9"])
+        self.vector_db.close()
+        reopened = self.open_db()
+        stale_ids = reopened.get_stale_paper_ids(max_age_days=30)
+        result = reopened.query_vector_database("graph graph", n_results=1)[0]
+
+        # Assert
+        self.assertEqual(len(limited), 2)
+        self.assertEqual(marked, 1)
+        self.assertEqual(sorted(stale_ids), ["2", "3"])
+        self.assertEqual(result['metadata']['title'], "Title 1")
+        reopened.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
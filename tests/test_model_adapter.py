@@ -42,6 +42,47 @@ class TestClaudeModelAdapter(unittest.TestCase):
         self.assertEqual(result, "Test response with images")
         self.mock_model.invoke.assert_called_once_with([expected_message])
 
+    def test_invoke_with_images_uses_mime_type(self):
+        # Arrange
+        self.mock_model.invoke.return_value = "Test response with images"
+
+        # Act
+        self.adapter.invoke_with_images("Test prompt", ["jpeg_data"], mime_type="image/jpeg")
+
+        # Assert
+        message = self.mock_model.invoke.call_args[0][0][0]
+        self.assertEqual(message["content"][1]["image_url"]["url"], "data:image/jpeg;base64,jpeg_data")
+
+    def test_invoke_with_images_consumes_a_generator(self):
+        # Arrange
+        images = (f"image_{page}" for page in range(3))
+
+        # Act
+        self.adapter.invoke_with_images("Test prompt", images)
+
+        # Assert
+        message = self.mock_model.invoke.call_args[0][0][0]
+        self.assertEqual([block["image_url"]["url"] for block in message["content"][1:]],
+                         [f"data:image/png;base64,image_{page}" for page in range(3)])
+
+    def test_invoke_with_documents(self):
+        # Arrange
+        self.mock_model.invoke.return_value = "Test response with documents"
+
+        # Act
+        result = self.adapter.invoke_with_documents("Test prompt", ["pdf_data1", "pdf_data2"])
+
+        # Assert
+        self.assertTrue(self.adapter.supports_documents)
+        self.assertEqual(result, "Test response with documents")
+        message = self.mock_model.invoke.call_args[0][0][0]
+        self.assertEqual(message["content"][0], {
+            "type": "document",
+            "source": {"type": "base64", "media_type": "application/pdf", "data": "pdf_data1"}
+        })
+        self.assertEqual(message["content"][1]["source"]["data"], "pdf_data2")
+        self.assertEqual(message["content"][2], {"type": "text", "text": "Test prompt"})
+
     def test_with_structured_output(self):
         # Arrange
         mock_structured_model = Mock()
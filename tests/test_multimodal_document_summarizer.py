@@ -8,6 +8,7 @@ class TestMultimodalDocumentSummarizer(unittest.TestCase):
     
     def setUp(self):
         self.mock_model_adapter = Mock(spec=ModelAdapter)
+        self.mock_model_adapter.supports_documents = False
         self.mock_pdf_processor = Mock(spec=PDFProcessor)
         self.summarizer = MultimodalDocumentSummarizer(
             focus="Test focus",
@@ -43,7 +44,7 @@ class TestMultimodalDocumentSummarizer(unittest.TestCase):
         
         # Assert
         self.assertEqual(result, "Generated summary")
-        self.mock_pdf_processor.process_pdf_documents.assert_called_once_with(documents)
+        self.mock_pdf_processor.process_pdf_documents.assert_called_once_with(documents, query=None)
         self.mock_model_adapter.with_images.assert_called_once_with(pdf_images)
         mock_model_with_images.invoke.assert_called_once()
         # Verify that prompt contains expected metadata
@@ -70,7 +71,7 @@ class TestMultimodalDocumentSummarizer(unittest.TestCase):
         
         # Assert
         self.assertEqual(result, "Generated summary")
-        self.mock_pdf_processor.process_pdf_documents.assert_called_once_with(documents)
+        self.mock_pdf_processor.process_pdf_documents.assert_called_once_with(documents, query=None)
         # Verify appropriate message format was used
         expected_message = {
             "role": "user", 
@@ -101,5 +102,41 @@ class TestMultimodalDocumentSummarizer(unittest.TestCase):
         # Assert
         self.assertEqual(result, "Error: The provided LLM model does not support multimodal inputs with images.")
 
+    def test_create_summary_prefers_documents_when_supported(self):
+        # Arrange
+        documents = [{"id": "doc1"}]
+        metadata_list = [
+            {"document_number": 1, "title": "Paper 1", "authors": "Author 1", "year": "2023", "similarity_score": 0.95}
+        ]
+        self.mock_pdf_processor.prepare_pdf_documents.return_value = (metadata_list, ["pdf_1"])
+        self.mock_model_adapter.supports_documents = True
+        self.mock_model_adapter.invoke_with_documents.return_value = "Generated summary"
+
+        # Act
+        result = self.summarizer.create_summary(documents, query="Test query")
+
+        # Assert
+        self.assertEqual(result, "Generated summary")
+        self.mock_pdf_processor.prepare_pdf_documents.assert_called_once_with(documents, query="Test query")
+        self.mock_pdf_processor.process_pdf_documents.assert_not_called()
+        prompt = self.mock_model_adapter.invoke_with_documents.call_args[0][0]
+        self.assertIn("as PDF documents", prompt)
+        self.assertEqual(self.mock_model_adapter.invoke_with_documents.call_args[0][1], ["pdf_1"])
+
+    def test_prompt_includes_text_of_text_first_documents(self):
+        # Arrange
+        metadata_list = [
+            {"document_number": 1, "title": "Paper 1", "authors": "Author 1", "year": "2023", "similarity_score": 0.95,
+             "text": "[Page 1]\nIntroduction text", "image_pages": [2, 5]}
+        ]
+
+        # Act
+        prompt = self.summarizer._create_summarization_prompt(metadata_list)
+
+        # Assert
+        self.assertIn("[Page 1]\nIntroduction text", prompt)
+        self.assertIn("pages attached as images: 2, 5", prompt)
+        self.assertNotIn("as images for you to analyze", prompt)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,110 @@
+import importlib.util
+import unittest
+
+import numpy as np
+
+from classes.vector_db.vector_database import VectorDatabase
+from config.app_config import AppConfig
+from utils.onnx_embeddings import OnnxEmbeddings, mean_pool
+
+# Fixed corpus for the parity check: short and long texts, related and unrelated topics
+PARITY_CORPUS = [
+    "Attention is all you need.",
+    "We propose a new simple network architecture, the Transformer, based solely on attention mechanisms.",
+    "Deep residual learning for image recognition eases the training of very deep networks.",
+    "Convolutional neural networks for large-scale image classification.",
+    "A survey of reinforcement learning methods for robotic manipulation.",
+    "Policy gradient methods learn a parameterized policy that selects actions without a value function.",
+    "Protein structure prediction with deep learning reaches near-experimental accuracy.",
+    "The effect of monetary policy on inflation expectations in emerging markets.",
+    "Graph neural networks aggregate information from neighbouring nodes to learn representations "
+    "of graph-structured data such as molecules, citation networks and social networks.",
+    "Retrieval-augmented generation combines a parametric language model with a non-parametric "
+    "memory of documents retrieved by dense vector search.",
+    "BERT",
+    "Quantum error correction protects logical qubits from decoherence.",
+]
+
+
+def cosine_similarities(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Return the row-wise cosine similarity of two matrices."""
+    first = first / np.linalg.norm(first, axis=1, keepdims=True)
+    second = second / np.linalg.norm(second, axis=1, keepdims=True)
+    return (first * second).sum(axis=1)
+
+
+class TestMeanPool(unittest.TestCase):
+
+    def test_padding_tokens_are_ignored_and_vectors_normalized(self):
+        # Arrange
+        hidden_states = np.array([[[1.0, 0.0], [3.0, 0.0], [100.0, 100.0]],
+                                  [[0.0, 2.0], [0.0, 4.0], [0.0, 6.0]]], dtype=np.float32)
+        attention_mask = np.array([[1, 1, 0], [1, 1, 1]])
+
+        # Act
+        pooled = mean_pool(hidden_states, attention_mask, normalize=False)
+        normalized = mean_pool(hidden_states, attention_mask)
+
+        # Assert
+        np.testing.assert_allclose(pooled, [[2.0, 0.0], [0.0, 4.0]])
+        np.testing.assert_allclose(normalized, [[1.0, 0.0], [0.0, 1.0]])
+
+    def test_unknown_backend_is_rejected(self):
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            VectorDatabase._embedding_factory(AppConfig.DEFAULT_EMBEDDING_MODEL, "tensorrt")
+
+
+@unittest.skipUnless(importlib.util.find_spec("onnxruntime") and importlib.util.find_spec("tokenizers")
+                     and importlib.util.find_spec("sentence_transformers"),
+                     "onnxruntime, tokenizers and sentence-transformers are required")
+class TestOnnxEmbeddingsParity(unittest.TestCase):
+    """Compare the ONNX backends against the sentence-transformers reference vectors."""
+
+    @classmethod
+    def setUpClass(cls):
+        from langchain_huggingface import HuggingFaceEmbeddings
+        try:
+            cls.reference = np.array(HuggingFaceEmbeddings(
+                model_name=AppConfig.DEFAULT_EMBEDDING_MODEL).embed_documents(PARITY_CORPUS))
+            cls.onnx = OnnxEmbeddings(AppConfig.DEFAULT_EMBEDDING_MODEL)
+        except (OSError, ValueError) as error:
+            raise unittest.SkipTest(f"Model files are not available: {error}")
+
+    def test_onnx_vectors_match_reference(self):
+        # Act
+        vectors = np.array(self.onnx.embed_documents(PARITY_CORPUS))
+        query = np.array(self.onnx.embed_query(PARITY_CORPUS[0]))
+
+        # Assert
+        self.assertEqual(vectors.shape, self.reference.shape)
+        self.assertGreater(cosine_similarities(vectors, self.reference).min(), 0.9999)
+        np.testing.assert_allclose(query, vectors[0], atol=1e-5)
+
+    def test_int8_vectors_agree_with_reference(self):
+        # Arrange
+        try:
+            quantized = OnnxEmbeddings(AppConfig.DEFAULT_EMBEDDING_MODEL, quantized=True)
+        except ImportError as error:
+            self.skipTest(str(error))
+
+        # Act
+        vectors = np.array(quantized.embed_documents(PARITY_CORPUS))
+
+        # Assert
+        similarities = cosine_similarities(vectors, self.reference)
+        self.assertGreater(similarities.mean(), 0.99)
+        self.assertGreater(similarities.min(), 0.97)
+        # The nearest neighbour of every text stays the same
+        np.testing.assert_array_equal(self._nearest(vectors), self._nearest(self.reference))
+
+    @staticmethod
+    def _nearest(vectors: np.ndarray) -> np.ndarray:
+        """Return the index of each row's most similar other row."""
+        similarities = vectors @ vectors.T
+        np.fill_diagonal(similarities, -np.inf)
+        return similarities.argmax(axis=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import base64
+import os
+import tempfile
+import unittest
+import fitz
+from utils.page_selector import PageSelector
+from utils.pdf_processor import PDFProcessor
+
+VOCABULARY = ["graph", "traffic", "neural", "references", "appendix", "proof"]
+
+
+class KeywordEmbeddings:
+    """Deterministic stand-in for the embedding model counting vocabulary words."""
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    def embed_documents(self, texts):
+        return [[text.lower().count(word) + 0.01 for word in VOCABULARY] for text in texts]
+
+
+def create_pdf(path, page_texts):
+    """Create a PDF with one page per text."""
+    pdf_document = fitz.open()
+    for text in page_texts:
+        pdf_document.new_page().insert_textbox(fitz.Rect(50, 50, 550, 750), text)
+    pdf_document.save(path)
+    pdf_document.close()
+
+
+class TestPageSelector(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.paper_a = os.path.join(self.temp_dir.name, "a.pdf")
+        self.paper_b = os.path.join(self.temp_dir.name, "b.pdf")
+        create_pdf(self.paper_a, ["Title page", "references " * 20, "graph traffic neural " * 10, "appendix " * 20])
+        create_pdf(self.paper_b, ["Another title", "proof " * 20, "traffic graph " * 10, ""])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_select_keeps_first_pages_and_picks_relevant_pages(self):
+        # Arrange
+        selector = PageSelector(KeywordEmbeddings(), page_budget=4)
+
+        # Act
+        selected = selector.select("graph neural networks for traffic", [self.paper_a, self.paper_b])
+
+        # Assert
+        self.assertEqual(selected, [[0, 2], [0, 2]])
+
+    def test_select_never_drops_first_pages_below_budget(self):
+        # Arrange
+        selector = PageSelector(KeywordEmbeddings(), page_budget=1)
+
+        # Act
+        selected = selector.select("graph traffic", [self.paper_a, self.paper_b])
+
+        # Assert
+        self.assertEqual(selected, [[0], [0]])
+
+    def test_pages_without_text_score_like_their_document(self):
+        # Arrange
+        selector = PageSelector(KeywordEmbeddings())
+
+        # Act
+        scores = selector.score_pages("traffic", [self.paper_b])[0]
+
+        # Assert
+        self.assertAlmostEqual(float(scores[3]), float(scores[:3].mean()), places=5)
+
+    def test_processor_renders_selected_pages_within_byte_budget(self):
+        # Arrange
+        documents = [{"metadata": {"title": "A", "local_file_path": self.paper_a}},
+                     {"metadata": {"title": "B", "local_file_path": self.paper_b}}]
+        selector = PageSelector(KeywordEmbeddings(), page_budget=6)
+        processor = PDFProcessor(max_workers=1, image_format="png", dpi=36, use_page_cache=False,
+                                 page_selector=selector, drop_redundant_pages=False)
+        _, unlimited_images = processor.process_pdf_documents(documents, query="graph traffic")
+        unlimited_images = list(unlimited_images)
+        processor.byte_budget = sum(len(base64.b64decode(image)) for image in unlimited_images) - 1
+
+        # Act
+        metadata_list, pdf_images = processor.process_pdf_documents(documents, query="graph traffic")
+        pdf_images = list(pdf_images)
+
+        # Assert
+        self.assertEqual(len(unlimited_images), 6)
+        self.assertEqual(len(pdf_images), 5)
+        self.assertEqual([meta['image_pages'] for meta in metadata_list], [[1, 3], [1, 3, 4]])
+
+if __name__ == '__main__':
+    unittest.main()
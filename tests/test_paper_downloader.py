@@ -0,0 +1,386 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+import requests
+
+from utils.circuit_breaker import CircuitBreaker
+from utils.download_manifest import DownloadManifest
+from utils.error_handler import APIError
+from utils.paper_downloader import PaperDownloader
+from utils.pdf_store import PdfStore
+
+PDF_BYTES = b"%PDF-1.4\n" + b"x" * 4000 + b"\n%%EOF"
+
+
+def make_response(status_code=200, body=PDF_BYTES, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {"Content-Type": "application/pdf"}
+    response.iter_content.side_effect = lambda chunk_size: (body[i:i + chunk_size]
+                                                            for i in range(0, len(body), chunk_size))
+    response.__enter__ = Mock(return_value=response)
+    response.__exit__ = Mock(return_value=False)
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(f"HTTP {status_code}", response=response)
+    return response
+
+
+def make_paper(paper_id="abc", url="https://arxiv.org/abc.pdf"):
+    return {"paperId": paper_id, "title": "Same Title", "openAccessPdf": {"url": url}}
+
+
+class TestPdfStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = PdfStore(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_commit_stores_by_paper_id_and_hash(self):
+        # Arrange
+        part_path = self.store.partial_path("abc")
+        with open(part_path, "wb") as part_file:
+            part_file.write(PDF_BYTES)
+
+        # Act
+        file_path = self.store.commit("abc", part_path, "https://arxiv.org/abc.pdf")
+
+        # Assert
+        sha256 = PdfStore.file_hash(file_path)
+        self.assertEqual(os.path.basename(file_path), f"abc_{sha256[:16]}.pdf")
+        self.assertFalse(os.path.exists(part_path))
+        self.assertEqual(self.store.lookup("abc", verify=True), file_path)
+        self.assertEqual(PdfStore(self.temp_dir.name).lookup("abc"), file_path)
+
+    def test_lookup_rejects_modified_copy(self):
+        # Arrange
+        part_path = self.store.partial_path("abc")
+        with open(part_path, "wb") as part_file:
+            part_file.write(PDF_BYTES)
+        file_path = self.store.commit("abc", part_path)
+
+        # Act
+        with open(file_path, "ab") as stored_file:
+            stored_file.write(b"garbage")
+
+        # Assert
+        self.assertIsNone(self.store.lookup("abc"))
+
+    def test_lookup_recovers_unindexed_copy(self):
+        # Arrange
+        part_path = self.store.partial_path("abc")
+        with open(part_path, "wb") as part_file:
+            part_file.write(PDF_BYTES)
+        file_path = self.store.commit("abc", part_path)
+        os.remove(self.store.index_path)
+
+        # Act
+        recovered = PdfStore(self.temp_dir.name).lookup("abc")
+
+        # Assert
+        self.assertEqual(recovered, file_path)
+
+
+class TestPaperDownloader(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.mock_session = Mock()
+        self.downloader = PaperDownloader(download_dir=self.temp_dir.name, session=self.mock_session)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_download_paper_skips_stored_copy(self):
+        # Arrange
+        self.mock_session.get.return_value = make_response()
+        first = make_paper()
+        self.downloader.download_paper(first)
+
+        # Act
+        second = make_paper()
+        self.downloader.download_paper(second)
+
+        # Assert
+        self.mock_session.get.assert_called_once()
+        self.assertEqual(first['local_file_path'], second['local_file_path'])
+        with open(second['local_file_path'], "rb") as pdf_file:
+            self.assertEqual(pdf_file.read(), PDF_BYTES)
+
+    def test_papers_with_same_title_do_not_overwrite_each_other(self):
+        # Arrange
+        self.mock_session.get.side_effect = [make_response(body=PDF_BYTES), make_response(body=PDF_BYTES + b"2")]
+        first, second = make_paper("one"), make_paper("two")
+
+        # Act
+        self.downloader.download_paper(first)
+        self.downloader.download_paper(second)
+
+        # Assert
+        self.assertNotEqual(first['local_file_path'], second['local_file_path'])
+        self.assertTrue(os.path.exists(first['local_file_path']))
+        self.assertTrue(os.path.exists(second['local_file_path']))
+
+    def test_download_paper_resumes_partial_download(self):
+        # Arrange
+        part_path = self.downloader.store.partial_path("abc")
+        with open(part_path, "wb") as part_file:
+            part_file.write(PDF_BYTES[:1000])
+        self.mock_session.get.return_value = make_response(206, body=PDF_BYTES[1000:])
+        paper = make_paper()
+
+        # Act
+        self.downloader.download_paper(paper)
+
+        # Assert
+        self.assertEqual(self.mock_session.get.call_args.kwargs["headers"], {"Range": "bytes=1000-"})
+        with open(paper['local_file_path'], "rb") as pdf_file:
+            self.assertEqual(pdf_file.read(), PDF_BYTES)
+
+    def test_download_paper_restarts_when_range_is_ignored(self):
+        # Arrange
+        part_path = self.downloader.store.partial_path("abc")
+        with open(part_path, "wb") as part_file:
+            part_file.write(b"stale bytes")
+        self.mock_session.get.return_value = make_response(200)
+        paper = make_paper()
+
+        # Act
+        self.downloader.download_paper(paper)
+
+        # Assert
+        with open(paper['local_file_path'], "rb") as pdf_file:
+            self.assertEqual(pdf_file.read(), PDF_BYTES)
+    def test_failed_download_is_recorded_and_skipped_during_cooldown(self):
+        # Arrange
+        self.mock_session.get.return_value = make_response(403)
+
+        # Act
+        with self.assertRaises(APIError):
+            self.downloader.download_paper(make_paper())
+        paper = make_paper()
+        self.downloader.download_paper(paper)
+
+        # Assert
+        self.mock_session.get.assert_called_once()
+        self.mock_session.get.return_value.__exit__.assert_called_once()
+        self.assertEqual(paper['local_file_path'], "")
+        report = self.downloader.manifest.report()
+        self.assertEqual(report[0]['host'], "arxiv.org")
+        self.assertEqual((report[0]['attempts'], report[0]['successes']), (1, 0))
+
+    def test_open_circuit_skips_host(self):
+        # Arrange
+        self.downloader.circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        self.mock_session.get.return_value = make_response(403)
+
+        # Act
+        for paper_id in ("a", "b"):
+            with self.assertRaises(APIError):
+                self.downloader.download_paper(make_paper(paper_id, url=f"https://slow.org/{paper_id}.pdf"))
+        self.downloader.download_paper(make_paper("c", url="https://slow.org/c.pdf"))
+
+        # Assert
+        self.assertEqual(self.mock_session.get.call_count, 2)
+        self.assertEqual(self.downloader.circuit_breaker.state("slow.org"), CircuitBreaker.OPEN)
+
+    def test_transient_failure_is_retried_and_counts_toward_circuit(self):
+        # Arrange
+        self.downloader.circuit_breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        self.mock_session.get.side_effect = [make_response(503), requests.ReadTimeout("read timed out"),
+                                             make_response()]
+
+        # Act
+        for _ in range(2):
+            with self.assertRaises(APIError):
+                self.downloader.download_paper(make_paper())
+        paper = make_paper()
+        self.downloader.download_paper(paper)
+
+        # Assert
+        self.assertEqual(self.mock_session.get.call_count, 3)
+        self.assertTrue(paper['local_file_path'])
+        self.assertEqual(self.downloader.circuit_breaker.state("arxiv.org"), CircuitBreaker.CLOSED)
+        self.assertEqual(self.downloader.manifest.report()[0]['attempts'], 3)
+
+    @patch('utils.circuit_breaker.time.monotonic')
+    def test_transient_failure_of_half_open_trial_reopens_circuit(self, mock_monotonic):
+        # Arrange
+        mock_monotonic.return_value = 0.0
+        self.downloader.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        self.mock_session.get.side_effect = [make_response(403), requests.ConnectionError("connection reset")]
+        with self.assertRaises(APIError):
+            self.downloader.download_paper(make_paper("a", url="https://slow.org/a.pdf"))
+
+        # Act
+        mock_monotonic.return_value = 11.0
+        with self.assertRaises(APIError):
+            self.downloader.download_paper(make_paper("b", url="https://slow.org/b.pdf"))
+        self.downloader.download_paper(make_paper("c", url="https://slow.org/c.pdf"))
+
+        # Assert
+        self.assertEqual(self.mock_session.get.call_count, 2)
+        self.assertEqual(self.downloader.circuit_breaker.state("slow.org"), CircuitBreaker.OPEN)
+
+    @patch('utils.paper_downloader.time.monotonic')
+    def test_download_past_deadline_is_resumed_on_next_run(self, mock_monotonic):
+        # Arrange
+        clock = [0.0]
+        mock_monotonic.side_effect = lambda: clock[0]
+
+        def slow_chunks(chunk_size):
+            # The deadline passes while the first chunk is being written
+            yield PDF_BYTES[:1000]
+            clock[0] = 10.0
+            yield PDF_BYTES[1000:2000]
+
+        interrupted = make_response()
+        interrupted.iter_content.side_effect = slow_chunks
+        self.mock_session.get.side_effect = [interrupted, make_response(206, body=PDF_BYTES[1000:])]
+
+        # Act
+        with self.assertRaises(APIError):
+            self.downloader.download_paper(make_paper(), deadline=2.0)
+        paper = make_paper()
+        self.downloader.download_paper(paper)
+
+        # Assert
+        self.assertEqual(self.mock_session.get.call_args.kwargs["headers"], {"Range": "bytes=1000-"})
+        with open(paper['local_file_path'], "rb") as pdf_file:
+            self.assertEqual(pdf_file.read(), PDF_BYTES)
+
+    def test_html_landing_page_is_rejected_before_download(self):
+        # Arrange
+        response = make_response(headers={"Content-Type": "text/html; charset=utf-8"}, body=b"<html></html>")
+        self.mock_session.get.return_value = response
+        paper = make_paper()
+
+        # Act
+        with self.assertRaises(APIError):
+            self.downloader.download_paper(paper)
+
+        # Assert
+        response.iter_content.assert_not_called()
+        self.assertEqual(paper['local_file_path'], "")
+        self.assertFalse(os.path.exists(self.downloader.store.partial_path("abc")))
+
+    def test_non_pdf_content_is_rejected_on_first_chunk(self):
+        # Arrange
+        self.mock_session.get.return_value = make_response(
+            headers={"Content-Type": "application/octet-stream"}, body=b"PK\x03\x04" + b"x" * 100)
+        paper = make_paper()
+
+        # Act
+        with self.assertRaises(APIError):
+            self.downloader.download_paper(paper)
+
+        # Assert
+        self.assertEqual(paper['local_file_path'], "")
+        self.assertFalse(os.path.exists(self.downloader.store.partial_path("abc")))
+
+    def test_oversized_download_is_aborted(self):
+        # Arrange
+        self.downloader.max_bytes = 2000
+        self.downloader.chunk_size = 512
+        self.mock_session.get.return_value = make_response()
+        paper = make_paper()
+
+        # Act
+        with self.assertRaises(APIError):
+            self.downloader.download_paper(paper)
+
+        # Assert
+        self.assertEqual(self.downloader.manifest.report()[0]['bytes'], 1536)
+        self.assertFalse(os.path.exists(self.downloader.store.partial_path("abc")))
+
+    def test_declared_oversized_download_is_rejected_from_headers(self):
+        # Arrange
+        self.downloader.max_bytes = 2000
+        response = make_response(headers={"Content-Type": "application/pdf", "Content-Length": "5000"})
+        self.mock_session.get.return_value = response
+
+        # Act
+        with self.assertRaises(APIError):
+            self.downloader.download_paper(make_paper())
+
+        # Assert
+        response.iter_content.assert_not_called()
+
+
+class TestDownloadManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manifest = DownloadManifest(os.path.join(self.temp_dir.name, "manifest.sqlite3"), cooldown=60)
+
+    def tearDown(self):
+        self.manifest.close()
+        self.temp_dir.cleanup()
+
+    @patch('utils.download_manifest.time.time')
+    def test_should_skip_until_cooldown_passes(self, mock_time):
+        # Arrange
+        mock_time.return_value = 1000.0
+        self.manifest.record("https://a.org/x.pdf", False, error="403 Forbidden", permanent=True)
+
+        # Act/Assert
+        self.assertEqual(self.manifest.should_skip("https://a.org/x.pdf"), "403 Forbidden")
+        mock_time.return_value = 1061.0
+        self.assertIsNone(self.manifest.should_skip("https://a.org/x.pdf"))
+
+    def test_transient_failure_is_not_skipped(self):
+        # Arrange
+        self.manifest.record("https://a.org/x.pdf", False, error="Read timed out")
+
+        # Act
+        skip_reason = self.manifest.should_skip("https://a.org/x.pdf")
+
+        # Assert
+        self.assertIsNone(skip_reason)
+
+    def test_report_summarizes_hosts(self):
+        # Arrange
+        self.manifest.record("https://a.org/1.pdf", True, bytes_downloaded=2000, latency=1.0)
+        self.manifest.record("https://a.org/2.pdf", True, bytes_downloaded=6000, latency=1.0)
+        self.manifest.record("https://a.org/3.pdf", False, latency=5.0)
+        self.manifest.record("https://b.org/1.pdf", False)
+
+        # Act
+        report = self.manifest.report()
+
+        # Assert
+        self.assertEqual([row['host'] for row in report], ["a.org", "b.org"])
+        self.assertAlmostEqual(report[0]['success_rate'], 2 / 3)
+        self.assertEqual(report[0]['throughput'], 4000.0)
+        self.assertIn("a.org", self.manifest.format_report())
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    @patch('utils.circuit_breaker.time.monotonic')
+    def test_circuit_opens_and_half_opens(self, mock_monotonic):
+        # Arrange
+        mock_monotonic.return_value = 0.0
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+
+        # Act/Assert
+        breaker.record_failure("a.org")
+        self.assertTrue(breaker.allow("a.org"))
+        breaker.record_failure("a.org")
+        self.assertFalse(breaker.allow("a.org"))
+        mock_monotonic.return_value = 11.0
+        self.assertTrue(breaker.allow("a.org"))
+        self.assertFalse(breaker.allow("a.org"))
+        breaker.record_failure("a.org")
+        self.assertEqual(breaker.state("a.org"), CircuitBreaker.OPEN)
+        mock_monotonic.return_value = 22.0
+        self.assertTrue(breaker.allow("a.org"))
+        breaker.record_success("a.org")
+        self.assertEqual(breaker.state("a.org"), CircuitBreaker.CLOSED)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,398 @@
+import base64
+import os
+import tempfile
+import tracemalloc
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import Mock, patch
+import fitz
+from classes.model_adapter.claude_model_adapter import ClaudeModelAdapter
+from utils import page_renderer
+from utils.page_image_cache import PageImageCache
+from utils.page_renderer import RenderSettings
+from utils.pdf_processor import PDFProcessor
+
+
+def create_pdf(path, page_count, label=""):
+    """Create a PDF whose pages differ, so rendered images can be told apart."""
+    pdf_document = fitz.open()
+    for page_num in range(page_count):
+        page = pdf_document.new_page(width=200, height=200)
+        page.insert_text((20, 40 + page_num * 5), f"{label} Page {page_num}")
+        page.draw_rect(fitz.Rect(20, 60, 20 + page_num * 10 + 10, 80), color=(0, 0, 0), fill=(0.5, 0.5, 0.5))
+    pdf_document.save(path)
+    pdf_document.close()
+
+
+class TestPDFProcessor(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pdf_paths = []
+        for doc_num, page_count in enumerate((5, 3)):
+            pdf_path = os.path.join(self.temp_dir.name, f"doc{doc_num}.pdf")
+            create_pdf(pdf_path, page_count, label=f"Document {doc_num}")
+            self.pdf_paths.append(pdf_path)
+        self.documents = [
+            {"metadata": {"title": "Doc 0", "local_file_path": self.pdf_paths[0]}, "similarity_score": 0.9},
+            {"metadata": {"title": "Missing", "local_file_path": "/does/not/exist.pdf"}},
+            {"metadata": {"title": "Doc 1", "local_file_path": self.pdf_paths[1]}, "similarity_score": 0.8},
+        ]
+
+        self.page_cache = PageImageCache(path=os.path.join(self.temp_dir.name, "pages.sqlite3"))
+
+    def tearDown(self):
+        self.page_cache.close()
+        self.temp_dir.cleanup()
+
+    def test_process_pdf_documents_renders_pages_in_order(self):
+        # Arrange
+        processor = PDFProcessor(max_pages_per_pdf=4, max_workers=1, image_format="png", dpi=36, use_page_cache=False)
+
+        # Act
+        metadata_list, pdf_images = processor.process_pdf_documents(self.documents)
+        pdf_images = list(pdf_images)
+
+        # Assert
+        self.assertEqual([meta['document_number'] for meta in metadata_list], [1, 3])
+        self.assertEqual(len(pdf_images), 4 + 3)
+        self.assertTrue(all(base64.b64decode(image).startswith(b"\x89PNG") for image in pdf_images))
+        self.assertEqual(len(set(pdf_images[:4])), 4)
+
+    def test_parallel_rendering_matches_serial_rendering(self):
+        # Arrange
+        serial = PDFProcessor(max_pages_per_pdf=4, max_workers=1, image_format="png", dpi=36, use_page_cache=False)
+        parallel = PDFProcessor(max_pages_per_pdf=4, max_workers=2, pages_per_task=1, image_format="png",
+                                dpi=36, use_page_cache=False)
+
+        # Act
+        _, serial_images = serial.process_pdf_documents(self.documents)
+        serial_images = list(serial_images)
+        _, parallel_images = parallel.process_pdf_documents(self.documents)
+        parallel_images = list(parallel_images)
+
+        # Assert
+        self.assertEqual(parallel_images, serial_images)
+
+    def test_cached_pages_are_not_rendered_again(self):
+        # Arrange
+        processor = PDFProcessor(max_pages_per_pdf=4, max_workers=1, dpi=36, page_cache=self.page_cache)
+        _, first_images = processor.process_pdf_documents(self.documents)
+        first_images = list(first_images)
+
+        # Act
+        with patch.object(page_renderer, 'render_pages', wraps=page_renderer.render_pages) as render_pages, \
+                patch.object(page_renderer, 'page_signatures', wraps=page_renderer.page_signatures) as page_signatures:
+            _, second_images = processor.process_pdf_documents(self.documents)
+            second_images = list(second_images)
+
+        # Assert
+        render_pages.assert_not_called()
+        page_signatures.assert_not_called()
+        self.assertEqual(second_images, first_images)
+        # An image and a thumbnail signature per page
+        self.assertEqual(self.page_cache.stats()['entries'], 2 * (4 + 3))
+
+    def test_changed_render_settings_miss_the_cache(self):
+        # Arrange
+        warm_up = PDFProcessor(max_pages_per_pdf=2, max_workers=1, dpi=36, page_cache=self.page_cache)
+        list(warm_up.process_pdf_documents(self.documents)[1])
+        processor = PDFProcessor(max_pages_per_pdf=3, max_workers=1, dpi=36, page_cache=self.page_cache)
+
+        # Act
+        with patch.object(page_renderer, 'render_pages', wraps=page_renderer.render_pages) as render_pages:
+            list(processor.process_pdf_documents(self.documents)[1])
+            rendered_pages = [call.args[1] for call in render_pages.call_args_list]
+            render_pages.reset_mock()
+            higher_dpi = PDFProcessor(max_pages_per_pdf=3, max_workers=1, dpi=72, page_cache=self.page_cache)
+            list(higher_dpi.process_pdf_documents(self.documents)[1])
+
+        # Assert
+        self.assertEqual(rendered_pages, [[2], [2]])
+        self.assertEqual(sum(len(call.args[1]) for call in render_pages.call_args_list), 3 + 3)
+
+
+    def test_jpeg_quality_and_bytes_per_document(self):
+        # Arrange
+        high_quality = PDFProcessor(max_pages_per_pdf=4, max_workers=1, image_format="jpeg", quality=95,
+                                    use_page_cache=False)
+        jpeg = PDFProcessor(max_pages_per_pdf=4, max_workers=1, image_format="jpeg", quality=60,
+                            use_page_cache=False)
+
+        # Act
+        high_quality_metadata, high_quality_images = high_quality.process_pdf_documents(self.documents)
+        list(high_quality_images)
+        jpeg_metadata, jpeg_images = jpeg.process_pdf_documents(self.documents)
+        jpeg_images = list(jpeg_images)
+
+        # Assert
+        self.assertEqual(jpeg.mime_type, "image/jpeg")
+        self.assertTrue(base64.b64decode(jpeg_images[0]).startswith(b"\xff\xd8"))
+        self.assertEqual([meta['page_count'] for meta in jpeg_metadata], [4, 3])
+        self.assertEqual(jpeg_metadata[0]['image_bytes'],
+                         sum(len(base64.b64decode(image)) for image in jpeg_images[:4]))
+        self.assertLess(jpeg_metadata[0]['image_bytes'], high_quality_metadata[0]['image_bytes'])
+
+    def test_max_dimension_and_grayscale(self):
+        # Arrange
+        processor = PDFProcessor(max_pages_per_pdf=1, max_workers=1, image_format="png", dpi=300,
+                                 grayscale=True, max_dimension=100, use_page_cache=False)
+
+        # Act
+        _, pdf_images = processor.process_pdf_documents(self.documents[:1])
+        images = list(pdf_images)
+
+        # Assert
+        self.assertEqual(len(images), 1)
+        pix = fitz.Pixmap(base64.b64decode(images[0]))
+        self.assertEqual(max(pix.width, pix.height), 100)
+        self.assertEqual(pix.n, 1)
+
+    def test_unsupported_image_format_is_rejected(self):
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            RenderSettings(image_format="gif")
+
+
+    def test_text_first_renders_only_visual_pages(self):
+        # Arrange
+        pdf_path = os.path.join(self.temp_dir.name, "mixed.pdf")
+        create_mixed_pdf(pdf_path)
+        documents = [{"metadata": {"title": "Mixed", "local_file_path": pdf_path}}]
+        processor = PDFProcessor(max_workers=1, image_format="png", dpi=36, use_page_cache=False, text_first=True,
+                                 drop_redundant_pages=False)
+
+        # Act
+        metadata_list, pdf_images = processor.process_pdf_documents(documents)
+        pdf_images = list(pdf_images)
+
+        # Assert
+        self.assertEqual(metadata_list[0]['image_pages'], [2, 3, 4])
+        self.assertEqual(len(pdf_images), 3)
+        self.assertIn("[Page 1]", metadata_list[0]['text'])
+        self.assertIn("[Page 5]", metadata_list[0]['text'])
+        self.assertNotIn("[Page 3]", metadata_list[0]['text'])
+
+
+    def test_prepare_pdf_documents_trims_to_selected_pages(self):
+        # Arrange
+        processor = PDFProcessor(max_pages_per_pdf=4, use_page_cache=False)
+
+        # Act
+        metadata_list, pdf_documents = processor.prepare_pdf_documents(self.documents)
+
+        # Assert
+        trimmed = fitz.open(stream=base64.b64decode(pdf_documents[0]), filetype="pdf")
+        self.assertEqual(len(trimmed), 4)
+        self.assertIn("Page 3", trimmed.load_page(3).get_text())
+        with open(self.pdf_paths[1], 'rb') as pdf_file:
+            self.assertEqual(base64.b64decode(pdf_documents[1]), pdf_file.read())
+        self.assertEqual(metadata_list[0]['document_pages'], [1, 2, 3, 4])
+        self.assertEqual(metadata_list[1]['document_bytes'], os.path.getsize(self.pdf_paths[1]))
+
+    def test_blank_and_duplicate_pages_are_dropped(self):
+        # Arrange
+        pdf_path = os.path.join(self.temp_dir.name, "redundant.pdf")
+        create_redundant_pdf(pdf_path)
+        documents = [{"metadata": {"title": "Redundant", "local_file_path": pdf_path}}]
+        processor = PDFProcessor(max_workers=1, image_format="png", dpi=36, use_page_cache=False)
+
+        # Act
+        metadata_list, pdf_images = processor.process_pdf_documents(documents)
+        pdf_images = list(pdf_images)
+
+        # Assert
+        self.assertEqual(metadata_list[0]['dropped_pages'], [3, 4])
+        self.assertEqual(metadata_list[0]['image_pages'], [1, 2, 5])
+        self.assertEqual(len(pdf_images), 3)
+
+    def test_cached_signatures_skip_thumbnails_on_document_path(self):
+        # Arrange
+        processor = PDFProcessor(max_pages_per_pdf=4, max_workers=1, page_cache=self.page_cache)
+        processor.prepare_pdf_documents(self.documents)
+
+        # Act
+        with patch.object(page_renderer, 'page_signatures', wraps=page_renderer.page_signatures) as page_signatures:
+            metadata_list, _ = processor.prepare_pdf_documents(self.documents)
+
+        # Assert
+        page_signatures.assert_not_called()
+        self.assertEqual(metadata_list[0]['document_pages'], [1, 2, 3, 4])
+
+    def test_passes_share_one_worker_pool(self):
+        # Arrange
+        processor = PDFProcessor(max_pages_per_pdf=4, max_workers=2, pages_per_task=1, dpi=36,
+                                 use_page_cache=False, text_first=True)
+
+        # Act
+        with patch('utils.pdf_processor.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool_class:
+            _, pdf_images = processor.process_pdf_documents(self.documents)
+            pdf_images = list(pdf_images)
+
+        # Assert
+        pool_class.assert_called_once()
+        self.assertTrue(pdf_images)
+
+    def test_streaming_keeps_peak_memory_bounded(self):
+        # Arrange
+        pdf_path = os.path.join(self.temp_dir.name, "noise.pdf")
+        create_noise_pdf(pdf_path, page_count=20)
+        documents = [{"metadata": {"title": "Noise", "local_file_path": pdf_path}}]
+        processor = PDFProcessor(max_workers=1, pages_per_task=1, image_format="png", dpi=72,
+                                 max_dimension=0, use_page_cache=False)
+        mock_model = Mock()
+        with patch('classes.model_adapter.claude_model_adapter.init_chat_model', return_value=mock_model):
+            adapter = ClaudeModelAdapter()
+
+        # Act
+        tracemalloc.start()
+        try:
+            metadata_list, pdf_images = processor.process_pdf_documents(documents)
+            adapter.invoke_with_images("Summarize", pdf_images)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # Assert
+        message = mock_model.invoke.call_args[0][0][0]
+        payload = sum(len(part["image_url"]["url"]) for part in message["content"][1:])
+        self.assertEqual(metadata_list[0]['page_count'], 20)
+        self.assertGreater(payload, 20 * 250_000)
+        # The request message holds the payload once; a materialized list of images would double it
+        self.assertLess(peak, payload * 1.25)
+
+
+def create_noise_pdf(path, page_count):
+    """Create a PDF whose pages are incompressible noise images of about 270 KB each."""
+    pdf_document = fitz.open()
+    for _ in range(page_count):
+        page = pdf_document.new_page(width=300, height=300)
+        noise = fitz.Pixmap(fitz.csRGB, 300, 300, os.urandom(300 * 300 * 3), False)
+        page.insert_image(page.rect, pixmap=noise)
+    pdf_document.save(path)
+    pdf_document.close()
+
+
+def create_redundant_pdf(path):
+    """Create a PDF with a title page, a banner page, a blank page, the banner again and a text page."""
+    pdf_document = fitz.open()
+    pdf_document.new_page().insert_textbox(fitz.Rect(50, 50, 550, 200), "A Study of Redundant Pages", fontsize=24)
+
+    for page_num in range(3):
+        page = pdf_document.new_page()
+        if page_num != 1:
+            page.draw_rect(fitz.Rect(50, 50, 550, 150), fill=(0.2, 0.2, 0.6))
+            page.insert_textbox(fitz.Rect(60, 60, 540, 140), "Journal of Repeated Banners", fontsize=20,
+                                color=(1, 1, 1))
+
+    text_page = pdf_document.new_page()
+    text_page.draw_rect(fitz.Rect(50, 50, 550, 150), fill=(0.2, 0.2, 0.6))
+    text_page.insert_textbox(fitz.Rect(50, 200, 550, 700), "Results differ from the banner. " * 40)
+    pdf_document.save(path)
+    pdf_document.close()
+
+
+def create_mixed_pdf(path):
+    """Create a PDF with a text page, a nearly empty page, a figure, an image and another text page."""
+    pdf_document = fitz.open()
+    body = "This page holds nothing but running text of the paper. " * 10
+
+    pdf_document.new_page().insert_textbox(fitz.Rect(50, 50, 550, 400), body)
+    pdf_document.new_page().insert_text((50, 50), "Appendix")
+
+    figure_page = pdf_document.new_page()
+    figure_page.insert_textbox(fitz.Rect(50, 50, 550, 300), body)
+    for bar in range(60):
+        figure_page.draw_rect(fitz.Rect(50 + bar * 8, 700 - bar * 5, 55 + bar * 8, 700), fill=(0, 0, 1))
+
+    image_page = pdf_document.new_page()
+    image_page.insert_textbox(fitz.Rect(50, 50, 550, 300), body)
+    image = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), False)
+    image.clear_with(128)
+    image_page.insert_image(fitz.Rect(50, 350, 450, 750), pixmap=image)
+
+    pdf_document.new_page().insert_textbox(fitz.Rect(50, 50, 550, 400), body)
+    pdf_document.save(path)
+    pdf_document.close()
+
+
+class TestClassifyPages(unittest.TestCase):
+
+    def test_pages_are_classified_by_content(self):
+        # Arrange
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path = os.path.join(temp_dir, "mixed.pdf")
+            create_mixed_pdf(pdf_path)
+
+            # Act
+            pages = page_renderer.classify_pages(pdf_path, range(5), min_text_chars=200,
+                                                 min_image_area=0.1, min_drawings=50)
+
+        # Assert
+        self.assertEqual([page['reason'] for page in pages], [None, "no_text", "drawing", "image", None])
+        self.assertEqual([page['visual'] for page in pages], [False, True, True, True, False])
+        self.assertTrue(pages[0]['text'].startswith("This page holds"))
+
+
+class TestPageSignatures(unittest.TestCase):
+
+    def test_difference_hash_is_stable_and_discriminates(self):
+        # Arrange
+        gradient = bytes(x * 2 for _ in range(64) for x in range(100))
+        inverted = bytes(255 - value for value in gradient)
+
+        # Act
+        gradient_hash = page_renderer.difference_hash(gradient, 100, 64)
+        inverted_hash = page_renderer.difference_hash(inverted, 100, 64)
+
+        # Assert
+        self.assertEqual(gradient_hash, page_renderer.difference_hash(gradient, 100, 64))
+        self.assertEqual(bin(gradient_hash ^ inverted_hash).count("1"), page_renderer.HASH_SIZE ** 2)
+
+
+class TestPageImageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_make_key_includes_render_settings(self):
+        # Arrange
+        settings = RenderSettings()
+        keys = {
+            PageImageCache.make_key("abc", 0, settings),
+            PageImageCache.make_key("abc", 1, settings),
+            PageImageCache.make_key("abc", 0, RenderSettings(dpi=100)),
+            PageImageCache.make_key("abc", 0, RenderSettings(image_format="jpeg", quality=80)),
+            PageImageCache.make_key("abc", 0, RenderSettings(image_format="jpeg", quality=60)),
+            PageImageCache.make_key("abc", 0, RenderSettings(grayscale=True)),
+            PageImageCache.make_key("abc", 0, RenderSettings(max_dimension=1568)),
+            PageImageCache.make_key("abd", 0, settings),
+        }
+
+        # Assert
+        self.assertEqual(len(keys), 8)
+        self.assertEqual(PageImageCache.make_key("abc", 0, RenderSettings(image_format="PNG", quality=10)),
+                         PageImageCache.make_key("abc", 0, settings))
+
+    def test_least_recently_used_pages_are_evicted(self):
+        # Arrange
+        cache = PageImageCache(path=os.path.join(self.temp_dir.name, "pages.sqlite3"), max_bytes=250)
+        settings = RenderSettings()
+        cache.set_page("abc", 0, settings, b"0" * 100)
+        cache.set_page("abc", 1, settings, b"1" * 100)
+        cache.get_page("abc", 0, settings)
+
+        # Act
+        cache.set_page("abc", 2, settings, b"2" * 100)
+
+        # Assert
+        self.assertEqual(cache.get_page("abc", 0, settings), b"0" * 100)
+        self.assertIsNone(cache.get_page("abc", 1, settings))
+        self.assertEqual(cache.get_page("abc", 2, settings), b"2" * 100)
+        cache.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from api.rate_limiter import TokenBucketRateLimiter
+
+
+class TestTokenBucketRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.time_patcher = patch('api.rate_limiter.time.time', return_value=1000.0)
+        self.mock_time = self.time_patcher.start()
+        self.sleep_patcher = patch('api.rate_limiter.time.sleep')
+        self.mock_sleep = self.sleep_patcher.start()
+
+    def tearDown(self):
+        self.sleep_patcher.stop()
+        self.time_patcher.stop()
+        self.temp_dir.cleanup()
+
+    def test_acquire_spaces_out_requests_beyond_burst(self):
+        # Arrange
+        limiter = TokenBucketRateLimiter(rate=2.0, capacity=2.0)
+
+        # Act
+        waits = [limiter.acquire() for _ in range(4)]
+
+        # Assert
+        self.assertEqual(waits, [0.0, 0.0, 0.5, 1.0])
+        self.assertEqual(self.mock_sleep.call_count, 2)
+
+    def test_acquire_refills_over_time(self):
+        # Arrange
+        limiter = TokenBucketRateLimiter(rate=1.0, capacity=1.0)
+        limiter.acquire()
+
+        # Act
+        self.mock_time.return_value = 1001.0
+        wait = limiter.acquire()
+
+        # Assert
+        self.assertEqual(wait, 0.0)
+
+    def test_rate_adapts_to_rate_limit_responses(self):
+        # Arrange
+        limiter = TokenBucketRateLimiter(rate=4.0, min_rate=1.0)
+
+        # Act/Assert
+        limiter.on_rate_limited()
+        self.assertEqual(limiter.rate, 2.0)
+        limiter.on_rate_limited()
+        limiter.on_rate_limited()
+        self.assertEqual(limiter.rate, 1.0)
+        for _ in range(100):
+            limiter.on_success()
+        self.assertEqual(limiter.rate, 4.0)
+
+    def test_state_file_shares_budget_between_limiters(self):
+        # Arrange
+        state_path = os.path.join(self.temp_dir.name, "rate_limit.sqlite3")
+        first = TokenBucketRateLimiter(rate=1.0, capacity=1.0, state_path=state_path, name="s2")
+        second = TokenBucketRateLimiter(rate=1.0, capacity=1.0, state_path=state_path, name="s2")
+
+        # Act
+        first_wait = first.acquire()
+        second_wait = second.acquire()
+        second.on_rate_limited()
+
+        # Assert
+        self.assertEqual(first_wait, 0.0)
+        self.assertEqual(second_wait, 1.0)
+        self.assertEqual(first.rate, 0.5)
+        first.close()
+        second.close()
+
+    def test_shared_returns_one_instance_per_name(self):
+        # Act
+        first = TokenBucketRateLimiter.shared("test-shared", rate=1.0)
+        second = TokenBucketRateLimiter.shared("test-shared", rate=5.0)
+
+        # Assert
+        self.assertIs(first, second)
+        self.assertIsNot(first, TokenBucketRateLimiter.shared("test-shared-other", rate=1.0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,12 @@
 import unittest
 from unittest.mock import Mock, patch
-from langchain import ResearchAgent
+from services.langchain import ResearchAgent
 from models.query_keywords import QueryKeywords
 from classes.document_summarizer.multimodal_document_summarizer import MultimodalDocumentSummarizer
 from services.paper_retriever import PaperRetriever
 from classes.vector_db.chroma_vector_db import ChromaVectorDb
+from config.app_config import AppConfig
+from utils.error_handler import APIError
 
 class TestResearchAgent(unittest.TestCase):
     
@@ -38,7 +40,7 @@ class TestResearchAgent(unittest.TestCase):
     def test_get_query_keywords(self):
         # Arrange
         expected_keywords = ["machine", "learning", "neural networks"]
-        self.mock_model_adapter.with_structured_output.return_value = QueryKeywords(keywords=expected_keywords)
+        self.mock_model_adapter.with_structured_output.return_value = QueryKeywords(query=self.args.query, keywords=expected_keywords)
         
         # Act
         result = self.agent.get_query_keywords(self.args.query)
@@ -58,8 +60,11 @@ class TestResearchAgent(unittest.TestCase):
         summary = "This is a research summary."
         
         # Setup mock returns
-        self.mock_model_adapter.with_structured_output.return_value = QueryKeywords(keywords=keywords)
+        stale_papers = [{"paperId": "old", "title": "Old Paper"}]
+        self.mock_model_adapter.with_structured_output.return_value = QueryKeywords(query=self.args.query, keywords=keywords)
         self.mock_paper_retriever.retrieve_papers.return_value = test_papers
+        self.mock_vector_db.get_stale_paper_ids.return_value = ["old"]
+        self.mock_paper_retriever.refresh_papers.return_value = stale_papers
         self.mock_vector_db.query_vector_database.return_value = test_search_results
         self.mock_document_summarizer.create_summary.return_value = summary
         
@@ -78,11 +83,67 @@ class TestResearchAgent(unittest.TestCase):
             test_papers,
             append=True
         )
+        self.mock_paper_retriever.refresh_papers.assert_called_once_with(["old"])
+        self.mock_vector_db.update_paper_metadata.assert_called_once_with(stale_papers)
         self.mock_vector_db.query_vector_database.assert_called_once_with(
             self.args.query,
             n_results=2
         )
-        self.mock_document_summarizer.create_summary.assert_called_once_with(test_search_results)
+        self.mock_document_summarizer.create_summary.assert_called_once_with(test_search_results, query="Machine Learning")
+
+    def test_refresh_stale_metadata_without_stale_papers(self):
+        # Arrange
+        self.mock_vector_db.get_stale_paper_ids.return_value = []
+
+        # Act
+        self.agent.refresh_stale_metadata()
+
+        # Assert
+        self.mock_paper_retriever.refresh_papers.assert_not_called()
+        self.mock_vector_db.update_paper_metadata.assert_not_called()
+
+    def test_refresh_stale_metadata_marks_unresolved_papers(self):
+        # Arrange
+        fresh_papers = [{"paperId": "known", "title": "Known Paper"}]
+        self.mock_vector_db.get_stale_paper_ids.return_value = ["known", "gone"]
+        self.mock_paper_retriever.refresh_papers.return_value = fresh_papers
+
+        # Act
+        self.agent.refresh_stale_metadata()
+
+        # Assert
+        self.mock_vector_db.get_stale_paper_ids.assert_called_once_with(
+            AppConfig.METADATA_MAX_AGE_DAYS, limit=AppConfig.METADATA_REFRESH_LIMIT)
+        self.mock_vector_db.update_paper_metadata.assert_called_once_with(fresh_papers)
+        self.mock_vector_db.mark_papers_refreshed.assert_called_once_with(["gone"])
+
+    def test_refresh_stale_metadata_keeps_papers_stale_when_api_fails(self):
+        # Arrange
+        self.mock_vector_db.get_stale_paper_ids.return_value = ["old"]
+        self.mock_paper_retriever.refresh_papers.side_effect = APIError("unavailable")
+
+        # Act
+        self.agent.refresh_stale_metadata()
+
+        # Assert
+        self.mock_vector_db.update_paper_metadata.assert_not_called()
+        self.mock_vector_db.mark_papers_refreshed.assert_not_called()
+
+    @patch('utils.pdf_processor.PDFProcessor')
+    @patch('classes.document_summarizer.multimodal_document_summarizer.MultimodalDocumentSummarizer')
+    def test_page_selector_bypasses_embedding_cache(self, mock_summarizer, mock_pdf_processor):
+        # Arrange
+        self.mock_vector_db.embedding_engine = Mock()
+        self.mock_vector_db.embeddings = Mock()
+        agent = ResearchAgent(args=self.args, model_adapter=self.mock_model_adapter,
+                              paper_retriever=self.mock_paper_retriever, vector_db=self.mock_vector_db)
+
+        # Act
+        agent.document_summarizer
+
+        # Assert
+        page_selector = mock_pdf_processor.call_args.kwargs['page_selector']
+        self.assertIs(page_selector.embeddings, self.mock_vector_db.embedding_engine)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
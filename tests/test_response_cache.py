@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+from api.response_cache import ResponseCache
+from api.rate_limiter import TokenBucketRateLimiter
+from api.semantic_scholar import SemanticScholarClient
+from utils.sqlite_cache import SqliteCache
+
+
+class TestSqliteCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = SqliteCache(os.path.join(self.temp_dir.name, "cache.sqlite3"), max_bytes=10)
+
+    def tearDown(self):
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def test_get_counts_hits_and_misses(self):
+        # Arrange
+        self.cache.set("a", b"1")
+
+        # Act
+        hit = self.cache.get("a")
+        miss = self.cache.get("b")
+
+        # Assert
+        self.assertEqual(hit, b"1")
+        self.assertIsNone(miss)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    @patch('utils.sqlite_cache.time.time')
+    def test_expired_entries_are_misses(self, mock_time):
+        # Arrange
+        mock_time.return_value = 1000.0
+        self.cache.set("a", b"1", ttl=5)
+
+        # Act
+        mock_time.return_value = 1006.0
+        result = self.cache.get("a")
+
+        # Assert
+        self.assertIsNone(result)
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    @patch('utils.sqlite_cache.time.time')
+    def test_least_recently_used_entries_are_evicted(self, mock_time):
+        # Arrange
+        mock_time.return_value = 1.0
+        self.cache.set("a", b"1234")
+        mock_time.return_value = 2.0
+        self.cache.set("b", b"1234")
+        mock_time.return_value = 3.0
+        self.cache.get("a")
+
+        # Act
+        mock_time.return_value = 4.0
+        self.cache.set("c", b"1234")
+
+        # Assert
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), b"1234")
+        self.assertEqual(self.cache.get("c"), b"1234")
+
+
+    def test_total_size_is_kept_up_to_date(self):
+        # Arrange
+        self.cache.set("a", b"123")
+        self.cache.set("b", b"45")
+
+        # Act
+        self.cache.set("a", b"1")
+        self.cache.delete("b")
+        self.cache.set("c", b"6789")
+
+        # Assert
+        self.assertEqual(self.cache.stats()['bytes'], 5)
+        self.cache.clear()
+        self.assertEqual(self.cache.stats()['bytes'], 0)
+
+    def test_total_size_of_existing_cache_is_counted_on_open(self):
+        # Arrange
+        self.cache.set("a", b"123")
+        self.cache.set("b", b"45")
+        self.cache._conn.execute("DROP TABLE cache_size")
+        self.cache._conn.commit()
+        self.cache.close()
+
+        # Act
+        self.cache = SqliteCache(self.cache.path, max_bytes=10)
+        self.cache.set("c", b"6789")
+
+        # Assert
+        self.assertEqual(self.cache.stats()['bytes'], 9)
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(os.path.join(self.temp_dir.name, "responses.sqlite3"))
+
+    def tearDown(self):
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def test_make_key_normalizes_params(self):
+        # Act
+        key1 = ResponseCache.make_key("url", {"query": "Graph  Networks", "fields": "title,year", "limit": 10})
+        key2 = ResponseCache.make_key("url", {"limit": 10, "fields": "year, title", "query": "graph networks"})
+        key3 = ResponseCache.make_key("url", {"query": "graph networks", "fields": "title,year", "limit": 20})
+
+        # Assert
+        self.assertEqual(key1, key2)
+        self.assertNotEqual(key1, key3)
+
+    def test_cached_search_skips_network(self):
+        # Arrange
+        mock_session = Mock()
+        mock_session.request.return_value.json.return_value = {"data": [{"paperId": "1"}]}
+        client = SemanticScholarClient(session=mock_session, cache=self.cache,
+                                       rate_limiter=TokenBucketRateLimiter(rate=1000))
+
+        # Act
+        first = client.search_papers("query", limit=5)
+        second = client.search_papers("query", limit=5)
+
+        # Assert
+        self.assertEqual(first, second)
+        mock_session.request.assert_called_once()
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import Mock, patch
+import requests
+from api.http_session import create_session, RETRY_STATUS_CODES
+from api.rate_limiter import TokenBucketRateLimiter
+from api.semantic_scholar import SemanticScholarClient
+
+
+def make_response(status_code, json_data=None, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = json_data or {}
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+    else:
+        response.raise_for_status.return_value = None
+    return response
+
+
+class TestHttpSession(unittest.TestCase):
+
+    def test_create_session_mounts_pooled_adapter_with_retries(self):
+        # Act
+        session = create_session(pool_size=4, max_retries=2, backoff_factor=0.5)
+
+        # Assert
+        adapter = session.get_adapter("https://api.semanticscholar.org")
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertEqual(adapter.max_retries.backoff_factor, 0.5)
+        self.assertTrue(adapter.max_retries.respect_retry_after_header)
+        self.assertEqual(tuple(adapter.max_retries.status_forcelist), RETRY_STATUS_CODES)
+        self.assertIs(session.get_adapter("http://example.org"), adapter)
+
+
+class TestSemanticScholarClient(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_session = Mock()
+        self.mock_rate_limiter = Mock(spec=TokenBucketRateLimiter)
+        self.client = SemanticScholarClient(api_key="key", session=self.mock_session, timeout=(1, 2),
+                                            rate_limiter=self.mock_rate_limiter)
+
+    def test_search_papers_uses_session_with_timeout(self):
+        # Arrange
+        self.mock_session.request.return_value = make_response(200, {"data": [{"paperId": "1"}]})
+
+        # Act
+        result = self.client.search_papers("graph networks", year={"start_year": 2020, "end_year": 2022},
+                                           limit=5, fields=["title"])
+
+        # Assert
+        self.assertEqual(result, {"data": [{"paperId": "1"}]})
+        _, kwargs = self.mock_session.request.call_args
+        self.assertEqual(kwargs["timeout"], (1, 2))
+        self.assertEqual(kwargs["headers"], {"x-api-key": "key"})
+        self.assertEqual(kwargs["params"]["year"], ">=2020,<=2022")
+        self.assertEqual(kwargs["params"]["fields"], "title")
+
+    @patch('api.semantic_scholar.time.sleep')
+    def test_search_papers_retry_honors_retry_after(self, mock_sleep):
+        # Arrange
+        self.mock_session.request.side_effect = [
+            make_response(429, headers={"Retry-After": "7"}),
+            make_response(200, {"data": []})
+        ]
+
+        # Act
+        result = self.client.search_papers("query", initial_backoff=0.1, jitter=0)
+
+        # Assert
+        self.assertEqual(result, {"data": []})
+        mock_sleep.assert_called_once_with(7.0)
+        self.assertEqual(self.mock_rate_limiter.acquire.call_count, 2)
+        self.mock_rate_limiter.on_rate_limited.assert_called_once()
+        self.mock_rate_limiter.on_success.assert_called_once()
+
+    def test_retry_after_accepts_http_date(self):
+        # Arrange
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        response = make_response(429, headers={"Retry-After": format_datetime(retry_at, usegmt=True)})
+
+        # Act
+        seconds = SemanticScholarClient._retry_after_seconds(response)
+
+        # Assert
+        self.assertAlmostEqual(seconds, 30, delta=2)
+        malformed = make_response(429, headers={"Retry-After": "soon"})
+        self.assertEqual(SemanticScholarClient._retry_after_seconds(malformed), 0.0)
+
+    @patch('api.semantic_scholar.time.sleep')
+    def test_search_papers_raises_after_max_retries(self, mock_sleep):
+        # Arrange
+        self.mock_session.request.return_value = make_response(429)
+
+        # Act/Assert
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.client.search_papers("query", max_retries=2, initial_backoff=0.1)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test_search_papers_does_not_retry_other_errors(self):
+        # Arrange
+        self.mock_session.request.return_value = make_response(404)
+
+        # Act/Assert
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.client.search_papers("query")
+        self.mock_session.request.assert_called_once()
+
+    def test_iter_search_papers_pages_until_max_results(self):
+        # Arrange
+        corpus = [{"paperId": str(i)} for i in range(1, 11)]
+
+        def search_papers(**kwargs):
+            offset, limit = kwargs["offset"], kwargs["limit"]
+            return {"offset": offset, "next": offset + limit, "data": corpus[offset:offset + limit]}
+
+        self.client.search_papers = Mock(side_effect=search_papers)
+
+        # Act
+        papers = list(self.client.iter_search_papers("query", max_results=3, page_size=2))
+
+        # Assert
+        self.assertEqual([paper["paperId"] for paper in papers], ["1", "2", "3"])
+        limits = [call.kwargs["limit"] for call in self.client.search_papers.call_args_list]
+        self.assertEqual(limits, [2, 1])
+
+    def test_iter_search_papers_stops_when_no_next_page(self):
+        # Arrange
+        self.client.search_papers = Mock(return_value={"offset": 0, "data": [{"paperId": "1"}]})
+
+        # Act
+        papers = list(self.client.iter_search_papers("query", max_results=50))
+
+        # Assert
+        self.assertEqual(papers, [{"paperId": "1"}])
+        self.client.search_papers.assert_called_once()
+
+    def test_iter_search_papers_is_lazy(self):
+        # Arrange
+        self.client.search_papers = Mock(return_value={"offset": 0, "next": 1, "data": [{"paperId": "1"}]})
+
+        # Act
+        iterator = self.client.iter_search_papers("query", max_results=1000, page_size=1)
+
+        # Assert
+        self.client.search_papers.assert_not_called()
+        self.assertEqual(next(iterator), {"paperId": "1"})
+        iterator.close()
+        self.assertLessEqual(self.client.search_papers.call_count, 2)
+    def test_get_papers_batch_chunks_ids_and_preserves_order(self):
+        # Arrange
+        self.client.MAX_BATCH_SIZE = 2
+
+        def batch_response(method, url, **kwargs):
+            ids = kwargs["json"]["ids"]
+            return make_response(200, [{"paperId": i} if i != "missing" else None for i in ids])
+
+        self.mock_session.request.side_effect = batch_response
+        paper_ids = ["a", "b", "missing", "d", "e"]
+
+        # Act
+        papers = self.client.get_papers_batch(paper_ids, fields=["title", "year"], max_workers=3)
+
+        # Assert
+        self.assertEqual(papers, [{"paperId": "a"}, {"paperId": "b"}, None, {"paperId": "d"}, {"paperId": "e"}])
+        self.assertEqual(self.mock_session.request.call_count, 3)
+        for call in self.mock_session.request.call_args_list:
+            self.assertEqual(call.args[0], "POST")
+            self.assertTrue(call.args[1].endswith("/paper/batch"))
+            self.assertEqual(call.kwargs["params"], {"fields": "title,year"})
+            self.assertLessEqual(len(call.kwargs["json"]["ids"]), 2)
+    def test_iter_bulk_search_follows_continuation_token(self):
+        # Arrange
+        self.mock_session.request.side_effect = [
+            make_response(200, {"token": "next", "data": [{"paperId": "1"}]}),
+            make_response(200, {"data": [{"paperId": "2"}]})
+        ]
+
+        # Act
+        pages = list(self.client.iter_bulk_search("gnn", year={"start_year": 2020}))
+
+        # Assert
+        self.assertEqual(pages, [([{"paperId": "1"}], "next"), ([{"paperId": "2"}], None)])
+        first_params = self.mock_session.request.call_args_list[0].kwargs["params"]
+        second_params = self.mock_session.request.call_args_list[1].kwargs["params"]
+        self.assertEqual(first_params, {"query": "gnn", "year": "2020-"})
+        self.assertEqual(second_params["token"], "next")
+
+if __name__ == '__main__':
+    unittest.main()
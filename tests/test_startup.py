@@ -0,0 +1,107 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that take hundreds of milliseconds to seconds to import and are only needed
+# once a run reaches ingestion, retrieval or summarization
+HEAVY_MODULES = ("chromadb", "langchain_chroma", "langchain_huggingface", "sentence_transformers",
+                 "torch", "onnxruntime", "fitz", "numpy")
+# Cumulative import time of main.py reported by python -X importtime (measured: ~10 ms)
+IMPORT_BUDGET_MS = 150
+# Wall-clock time of "python main.py --help", interpreter start included (measured: ~0.07 s,
+# down from ~1.5 s when main.py imported langchain, Chroma and PyMuPDF at module load)
+CLI_STARTUP_TARGET_SECONDS = 0.5
+
+
+def run_python(*args):
+    """Run the interpreter in the repository directory and return the completed process."""
+    return subprocess.run([sys.executable, *args], cwd=REPO_DIR, capture_output=True, text=True, timeout=120)
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_importing_main_stays_within_budget(self):
+        # Act
+        result = run_python("-X", "importtime", "-c", "import main")
+
+        # Assert
+        self.assertEqual(result.returncode, 0, result.stderr)
+        cumulative = {}
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, total, name = line.split("|")
+                if total.strip().isdigit():
+                    cumulative[name.strip()] = int(total)
+        self.assertLess(cumulative["main"] / 1000, IMPORT_BUDGET_MS)
+        self.assertEqual([module for module in HEAVY_MODULES if module in cumulative], [])
+
+    def test_research_agent_defers_vector_database_and_pdf_modules(self):
+        # Arrange
+        script = (
+            "import sys\n"
+            "from unittest.mock import Mock\n"
+            "from services.langchain import ResearchAgent\n"
+            "ResearchAgent(Mock(), Mock(), paper_retriever=Mock(DOWNLOAD_DIR='papers'))\n"
+            f"print(','.join(module for module in {HEAVY_MODULES!r} if module in sys.modules))\n"
+        )
+
+        # Act
+        result = run_python("-c", script)
+
+        # Assert
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_cli_help_meets_startup_target(self):
+        # Act
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            result = run_python("main.py", "--help")
+            timings.append(time.perf_counter() - start)
+
+        # Assert
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertLess(statistics.median(timings), CLI_STARTUP_TARGET_SECONDS)
+
+    def test_harvest_help_does_not_load_heavy_modules(self):
+        # Arrange
+        script = (
+            "import sys\n"
+            "import harvest\n"
+            "try:\n"
+            "    harvest.parse_harvest_arguments(['--help'])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            f"print('heavy:' + ','.join(module for module in {HEAVY_MODULES!r} if module in sys.modules))\n"
+        )
+
+        # Act
+        result = run_python("-c", script)
+
+        # Assert
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("bulk search", result.stdout)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "heavy:")
+
+    def test_research_query_named_harvest_is_not_a_subcommand(self):
+        # Arrange
+        import main
+
+        # Act
+        with patch.object(sys, 'argv', ['main.py', 'harvest', '--paper-count', '3']):
+            args = main.parse_arguments()
+
+        # Assert
+        self.assertEqual(args.query, "harvest")
+        self.assertEqual(args.paper_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import threading
+import time
+from typing import Dict
+
+from config.app_config import AppConfig
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    After ``failure_threshold`` consecutive failures a host's circuit opens and requests
+    to it are refused for ``reset_timeout`` seconds. Afterwards a single trial request is
+    let through (half-open): success closes the circuit again, failure reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = AppConfig.HOST_FAILURE_THRESHOLD,
+                 reset_timeout: float = AppConfig.HOST_RESET_TIMEOUT):
+        """
+        Initialize the CircuitBreaker class.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open a host's circuit
+            reset_timeout (float): Seconds a circuit stays open before a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, host: str) -> bool:
+        """
+        Check whether a request to a host may be sent.
+
+        Args:
+            host (str): Host name
+
+        Returns:
+            bool: False while the host's circuit is open or its trial request is in flight
+        """
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None or state['state'] == self.CLOSED:
+                return True
+            if state['state'] == self.OPEN and time.monotonic() >= state['opened_at'] + self.reset_timeout:
+                state['state'] = self.HALF_OPEN
+                return True
+            return False
+
+    def state(self, host: str) -> str:
+        """Return the circuit state of a host."""
+        with self._lock:
+            return self._hosts.get(host, {'state': self.CLOSED})['state']
+
+    def record_success(self, host: str):
+        """Close the host's circuit after a successful request."""
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def record_failure(self, host: str):
+        """Count a failed request and open the host's circuit when needed."""
+        with self._lock:
+            state = self._hosts.setdefault(host, {'state': self.CLOSED, 'failures': 0, 'opened_at': 0.0})
+            state['failures'] += 1
+            if state['state'] == self.HALF_OPEN or state['failures'] >= self.failure_threshold:
+                state['state'] = self.OPEN
+                state['opened_at'] = time.monotonic()
@@ -1,6 +1,38 @@
+import time
+
+
 class DocumentProcessor:
     """A class for processing and preparing documents for the vector database."""
 
+    @staticmethod
+    def document_id(paper):
+        """
+        Return the vector database ID of a paper.
+
+        Args:
+            paper (dict): Paper details from the Semantic Scholar API
+
+        Returns:
+            str: The document ID, or None if the paper has no abstract or paper ID to store
+        """
+        if paper and paper.get('abstract') and paper.get('paperId'):
+            return f"paper_{paper.get('paperId')}"
+        return None
+
+    @staticmethod
+    def candidate_ids(papers):
+        """
+        Return the distinct document IDs of the papers that can be stored.
+
+        Args:
+            papers (list): List of papers to process
+
+        Returns:
+            list: Document IDs in the order of papers, to check for existence in the database
+        """
+        ids = (DocumentProcessor.document_id(paper) for paper in papers)
+        return list(dict.fromkeys(paper_id for paper_id in ids if paper_id))
+
     @staticmethod
     def prepare_documents(documents, existing_ids, ids, metadatas, papers, papers_added):
         """
@@ -8,7 +40,8 @@ class DocumentProcessor:
 
         Args:
             documents (list): List to store document abstracts
-            existing_ids (set): Set of existing paper IDs in the database
+            existing_ids (set): IDs of the papers that are already in the database; it is enough
+                to pass the candidate IDs that were found, not every ID in the database
             ids (list): List to store paper IDs
             metadatas (list): List to store paper metadata
             papers (list): List of papers to process
@@ -17,26 +50,74 @@ class DocumentProcessor:
         Returns:
             int: Number of papers added to the database
         """
+        skipped_ids = set(existing_ids)
         for paper in papers:
-            if 'abstract' in paper and paper['abstract'] and paper.get('paperId'):
-                paper_id = f"paper_{paper.get('paperId')}"
-
-                # Skip if this paper is already in the database
-                if paper_id in existing_ids:
-                    continue
-
-                documents.append(paper['abstract'])
-
-                # Create metadata for each paper
-                metadata = {
-                    'title': paper.get('title', ''),
-                    'authors': ', '.join([author.get('name', '') for author in paper.get('authors', [])]),
-                    'year': paper.get('year', ''),
-                    'url': paper.get('url', ''),
-                    'paperId': paper.get('paperId', ''),
-                    'local_file_path': paper.get('local_file_path', ''),
-                }
-                metadatas.append(metadata)
-                ids.append(paper_id)
-                papers_added += 1
+            paper_id = DocumentProcessor.document_id(paper)
+
+            # Skip if this paper is already in the database or earlier in the batch
+            if paper_id is None or paper_id in skipped_ids:
+                continue
+            skipped_ids.add(paper_id)
+
+            documents.append(paper['abstract'])
+
+            # Create metadata for each paper
+            metadatas.append(DocumentProcessor.build_metadata(paper))
+            ids.append(paper_id)
+            papers_added += 1
         return papers_added
+
+    @staticmethod
+    def changed_metadata(papers, stored_metadata):
+        """
+        Build fresh metadata for stored papers whose details changed, e.g. a PDF downloaded
+        since the paper was first stored.
+
+        A stored local PDF path is kept when the paper comes without one, and a change of
+        'retrieved_at' alone does not count as a change.
+
+        Args:
+            papers (list): List of papers to process
+            stored_metadata (dict): Stored metadata by document ID, of the papers found in the database
+
+        Returns:
+            tuple: (ids, metadatas) of the papers whose metadata should be updated
+        """
+        ids = []
+        metadatas = []
+        seen_ids = set()
+        for paper in papers:
+            paper_id = DocumentProcessor.document_id(paper)
+            if paper_id not in stored_metadata or paper_id in seen_ids:
+                continue
+            seen_ids.add(paper_id)
+
+            stored = stored_metadata[paper_id] or {}
+            metadata = DocumentProcessor.build_metadata(paper)
+            if not metadata['local_file_path']:
+                metadata['local_file_path'] = stored.get('local_file_path', '')
+            if any(stored.get(key) != value for key, value in metadata.items() if key != 'retrieved_at'):
+                ids.append(paper_id)
+                metadatas.append(metadata)
+        return ids, metadatas
+
+    @staticmethod
+    def build_metadata(paper):
+        """
+        Build the vector database metadata for a paper.
+
+        Args:
+            paper (dict): Paper details from the Semantic Scholar API
+
+        Returns:
+            dict: Metadata stored alongside the paper's embedding
+        """
+        return {
+            'title': paper.get('title', ''),
+            'authors': ', '.join([author.get('name', '') for author in paper.get('authors', [])]),
+            'year': paper.get('year', ''),
+            'url': paper.get('url', ''),
+            'paperId': paper.get('paperId', ''),
+            'local_file_path': paper.get('local_file_path', ''),
+            'retrieved_at': int(time.time()),
+        }
@@ -0,0 +1,137 @@
+import sqlite3
+import threading
+import time
+import urllib.parse
+from typing import Dict, List, Optional
+
+from config.app_config import AppConfig
+
+
+class DownloadManifest:
+    """
+    Persistent log of PDF download attempts stored in SQLite.
+
+    Every attempt is recorded with its outcome, size, latency, content type and error.
+    URLs whose last attempt showed them to be bad (e.g. a 404 or an HTML landing page)
+    are skipped until a cool-down has passed; transient failures such as timeouts are
+    only logged, so the next run retries them. The log can be summarized into per-host
+    success rates and throughput.
+    """
+
+    def __init__(self, path: str, cooldown: float = AppConfig.DOWNLOAD_FAILURE_COOLDOWN):
+        """
+        Initialize the DownloadManifest class.
+
+        Args:
+            path (str): Path of the SQLite manifest file
+            cooldown (float): Seconds to skip a URL after a failed download
+        """
+        self.path = path
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS download_attempts ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL, host TEXT NOT NULL, "
+            "succeeded INTEGER NOT NULL, http_status INTEGER, bytes INTEGER NOT NULL, "
+            "latency REAL NOT NULL, content_type TEXT, error TEXT, attempted_at REAL NOT NULL, "
+            "permanent INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(download_attempts)")}
+        if 'permanent' not in columns:
+            # Manifests created before transient failures were told apart
+            self._conn.execute("ALTER TABLE download_attempts ADD COLUMN permanent INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_download_attempts_url ON download_attempts (url, attempted_at)")
+        self._conn.commit()
+
+    def record(self, url: str, succeeded: bool, bytes_downloaded: int = 0, latency: float = 0.0,
+               content_type: Optional[str] = None, http_status: Optional[int] = None,
+               error: Optional[str] = None, permanent: bool = False):
+        """
+        Record a download attempt.
+
+        Args:
+            url (str): Downloaded URL
+            succeeded (bool): Whether a valid PDF was stored
+            bytes_downloaded (int): Number of bytes received
+            latency (float): Wall-clock duration of the attempt in seconds
+            content_type (str, optional): Content-Type of the response
+            http_status (int, optional): HTTP status code of the response
+            error (str, optional): Error message of a failed attempt
+            permanent (bool): Whether the failure shows the URL itself is bad, so that it is
+                              skipped during the cool-down
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO download_attempts "
+                "(url, host, succeeded, http_status, bytes, latency, content_type, error, attempted_at, permanent) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, urllib.parse.urlparse(url).netloc, int(succeeded), http_status, bytes_downloaded,
+                 latency, content_type, error, time.time(), int(permanent and not succeeded))
+            )
+            self._conn.commit()
+
+    def should_skip(self, url: str) -> Optional[str]:
+        """
+        Check whether a URL is known to be bad and still cooling down.
+
+        Only a permanent failure as the last attempt makes a URL skipped; after a transient
+        failure it is retried, resuming the partial download.
+
+        Args:
+            url (str): URL about to be downloaded
+
+        Returns:
+            Optional[str]: The error of the last failed attempt if the URL should be skipped, else None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT permanent, error, attempted_at FROM download_attempts "
+                "WHERE url = ? ORDER BY attempted_at DESC LIMIT 1", (url,)
+            ).fetchone()
+        if row is None or not row[0] or row[2] + self.cooldown <= time.time():
+            return None
+        return row[1] or "previous download failed"
+
+    def report(self) -> List[Dict]:
+        """
+        Summarize the recorded attempts per host.
+
+        Returns:
+            list: One dict per host with attempts, successes, success rate, bytes and
+                  throughput (bytes per second over successful downloads), most attempts first
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT host, COUNT(*), SUM(succeeded), SUM(bytes), "
+                "SUM(CASE WHEN succeeded THEN bytes ELSE 0 END), "
+                "SUM(CASE WHEN succeeded THEN latency ELSE 0 END) "
+                "FROM download_attempts GROUP BY host ORDER BY COUNT(*) DESC, host"
+            ).fetchall()
+        return [
+            {
+                'host': host,
+                'attempts': attempts,
+                'successes': successes,
+                'success_rate': successes / attempts,
+                'bytes': total_bytes,
+                'throughput': success_bytes / success_latency if success_latency else 0.0,
+            }
+            for host, attempts, successes, total_bytes, success_bytes, success_latency in rows
+        ]
+
+    def format_report(self) -> str:
+        """Render the per-host report as a text table."""
+        lines = [f"{'Host':<40} {'Attempts':>8} {'Success':>8} {'MB':>9} {'MB/s':>7}"]
+        for row in self.report():
+            lines.append(
+                f"{row['host'][:40]:<40} {row['attempts']:>8} {row['success_rate']:>8.0%} "
+                f"{row['bytes'] / 1e6:>9.1f} {row['throughput'] / 1e6:>7.2f}"
+            )
+        return "\n".join(lines)
+
+    def close(self):
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,78 @@
+import threading
+import time
+import urllib.parse
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from config.app_config import AppConfig
+from utils.logger import Logger
+
+
+class DownloadPool:
+    """
+    Bounded worker pool for PDF downloads.
+
+    At most ``max_workers`` downloads run at once, and at most ``per_host_limit`` of
+    them against the same host, so a slow publisher cannot take over the pool and no
+    host gets hammered. Every download is given a deadline, after which the downloader
+    aborts it.
+    """
+
+    def __init__(self, downloader, max_workers: int = AppConfig.DOWNLOAD_WORKERS,
+                 per_host_limit: int = AppConfig.DOWNLOAD_PER_HOST_LIMIT):
+        """
+        Initialize the DownloadPool class.
+
+        Args:
+            downloader (PaperDownloader): Downloader used by the workers
+            max_workers (int): Maximum number of concurrent downloads
+            per_host_limit (int): Maximum number of concurrent downloads from one host
+        """
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self.downloader = downloader
+        self.per_host_limit = per_host_limit
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-download")
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+
+    def submit(self, paper: Dict[str, Any], deadline: Optional[float] = None) -> Future:
+        """
+        Schedule the download of a paper's PDF.
+
+        Args:
+            paper (dict): Paper details; 'local_file_path' is set in place on success
+            deadline (float, optional): time.monotonic() value after which the download is aborted
+
+        Returns:
+            Future: Resolves to the paper once the download finished or failed
+        """
+        paper.setdefault('local_file_path', "")
+        return self._executor.submit(self._download, paper, deadline)
+
+    def shutdown(self):
+        """Stop accepting downloads and cancel the ones that have not started yet."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _download(self, paper: Dict[str, Any], deadline: Optional[float]) -> Dict[str, Any]:
+        """Download one paper while holding its host's concurrency slot."""
+        pdf_url = (paper.get('openAccessPdf') or {}).get('url')
+        if not pdf_url:
+            return paper
+
+        with self._host_semaphore(urllib.parse.urlparse(pdf_url).netloc):
+            if deadline is not None and time.monotonic() >= deadline:
+                Logger.warning(self.logger, f"Download deadline passed, skipping: {pdf_url}")
+                return paper
+            try:
+                self.downloader.download_paper(paper, deadline=deadline)
+            except Exception:
+                # The downloader already logged the failure; the paper is kept without a PDF
+                paper['local_file_path'] = ""
+        return paper
+
+    def _host_semaphore(self, host: str) -> threading.BoundedSemaphore:
+        """Return the semaphore limiting concurrent downloads from a host."""
+        with self._host_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_semaphores[host]
@@ -0,0 +1,313 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from config.app_config import AppConfig
+
+
+class EmbeddingCache:
+    """
+    Persistent cache of embedding vectors keyed by model name and the SHA-256 of the text.
+
+    The vectors of each model are stored as fixed-size rows in a memory-mapped file, and
+    an SQLite index maps every (model, text hash) to its row together with a last-access
+    timestamp. When the number of entries exceeds ``max_entries``, the least recently
+    used ones are evicted and their rows are reused. Hit and miss counters are kept for
+    the lifetime of the instance. The cache is safe to share between threads, and row
+    allocation runs in an SQLite transaction so processes can share a cache directory.
+    """
+
+    INDEX_FILE = "index.sqlite3"
+    DTYPES = ("float32", "float16")
+    # Rows allocated when a model's vector file is created; it doubles when it fills up
+    INITIAL_ROWS = 1024
+    # Maximum number of hashes per SQL query, below SQLite's host parameter limit
+    QUERY_CHUNK = 500
+
+    def __init__(self, cache_dir: str = AppConfig.EMBEDDING_CACHE_DIR,
+                 dtype: str = AppConfig.EMBEDDING_CACHE_DTYPE,
+                 max_entries: int = AppConfig.EMBEDDING_CACHE_MAX_ENTRIES):
+        """
+        Initialize the EmbeddingCache class.
+
+        Args:
+            cache_dir (str): Directory holding the index and the vector files
+            dtype (str): Storage type of new vectors, "float32" or "float16"
+            max_entries (int): Maximum number of cached vectors before LRU eviction
+        """
+        if dtype not in self.DTYPES:
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+        self.cache_dir = cache_dir
+        self.dtype = dtype
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._arrays: Dict[str, np.memmap] = {}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(cache_dir, self.INDEX_FILE), check_same_thread=False,
+                                     timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_models ("
+            "model TEXT PRIMARY KEY, file TEXT NOT NULL, dimension INTEGER NOT NULL, "
+            "dtype TEXT NOT NULL, next_row INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_rows ("
+            "model TEXT NOT NULL, text_hash TEXT NOT NULL, row INTEGER NOT NULL, "
+            "last_access REAL NOT NULL, PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embedding_rows_last_access ON embedding_rows (last_access)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_free_rows ("
+            "model TEXT NOT NULL, row INTEGER NOT NULL, PRIMARY KEY (model, row))"
+        )
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """Return the SHA-256 hex digest of a text."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, text_hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached vectors and mark them as recently used.
+
+        Args:
+            model (str): Name of the embedding model
+            text_hashes (Sequence[str]): SHA-256 digests of the texts
+
+        Returns:
+            Dict[str, np.ndarray]: float32 vectors of the texts that were found, by text hash
+        """
+        unique_hashes = list(dict.fromkeys(text_hashes))
+        with self._lock:
+            model_info = self._model_info(model)
+            rows = self._find_rows(model, unique_hashes) if model_info is not None else {}
+
+            vectors = {}
+            if rows:
+                now = time.time()
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "UPDATE embedding_rows SET last_access = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, text_hash) for text_hash in rows]
+                )
+                self._conn.execute("COMMIT")
+                array = self._array(model, model_info, max(rows.values()) + 1)
+                vectors = {text_hash: np.array(array[row], dtype=np.float32) for text_hash, row in rows.items()}
+
+            self.hits += len(vectors)
+            self.misses += len(unique_hashes) - len(vectors)
+            return vectors
+
+    def set_many(self, model: str, vectors: Dict[str, Sequence[float]]) -> Dict[str, np.ndarray]:
+        """
+        Store vectors, evicting least recently used entries if the entry limit is exceeded.
+
+        Args:
+            model (str): Name of the embedding model
+            vectors (Dict[str, Sequence[float]]): Vectors by SHA-256 digest of their text
+
+        Returns:
+            Dict[str, np.ndarray]: The vectors as stored, as float32, so callers return the
+                                   same values on a miss as on a later hit
+        """
+        if not vectors:
+            return {}
+        text_hashes = list(vectors)
+        matrix = np.asarray([vectors[text_hash] for text_hash in text_hashes], dtype=np.float32)
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                model_info = self._model_info(model)
+                if model_info is None:
+                    model_info = {'file': self._file_name(model), 'dimension': matrix.shape[1],
+                                  'dtype': self.dtype, 'next_row': 0}
+                    self._conn.execute(
+                        "INSERT INTO embedding_models (model, file, dimension, dtype, next_row) VALUES (?, ?, ?, ?, 0)",
+                        (model, model_info['file'], model_info['dimension'], model_info['dtype'])
+                    )
+                if matrix.shape[1] != model_info['dimension']:
+                    raise ValueError(f"Expected {model_info['dimension']}-dimensional vectors for {model}, "
+                                     f"got {matrix.shape[1]}")
+
+                # Overwrite the rows of vectors another process stored meanwhile instead of leaking them
+                existing_rows = self._find_rows(model, text_hashes)
+                new_rows = iter(self._allocate_rows(model, model_info, len(text_hashes) - len(existing_rows)))
+                rows = [existing_rows[text_hash] if text_hash in existing_rows else next(new_rows)
+                        for text_hash in text_hashes]
+                array = self._array(model, model_info, max(rows) + 1)
+                array[rows] = matrix
+                # Persist the vectors before the index refers to them
+                array.flush()
+
+                now = time.time()
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_rows (model, text_hash, row, last_access) VALUES (?, ?, ?, ?)",
+                    [(model, text_hash, row, now) for text_hash, row in zip(text_hashes, rows)]
+                )
+                self._evict()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            return {text_hash: np.array(array[row], dtype=np.float32) for text_hash, row in zip(text_hashes, rows)}
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return cache statistics.
+
+        Returns:
+            dict: Hits, misses, hit rate, number of entries and total size of the vector files in bytes
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embedding_rows").fetchone()[0]
+            files = [row[0] for row in self._conn.execute("SELECT file FROM embedding_models")]
+        total_bytes = sum(os.path.getsize(os.path.join(self.cache_dir, file)) for file in files
+                          if os.path.exists(os.path.join(self.cache_dir, file)))
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes': total_bytes,
+        }
+
+    def close(self):
+        """Flush the vector files and close the SQLite index."""
+        with self._lock:
+            for array in self._arrays.values():
+                array.flush()
+            self._arrays.clear()
+            self._conn.close()
+
+    def _model_info(self, model: str) -> Optional[Dict]:
+        """Return the vector file, dimension, dtype and next unused row of a model."""
+        row = self._conn.execute(
+            "SELECT file, dimension, dtype, next_row FROM embedding_models WHERE model = ?", (model,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'file': row[0], 'dimension': row[1], 'dtype': row[2], 'next_row': row[3]}
+
+    def _find_rows(self, model: str, text_hashes: Sequence[str]) -> Dict[str, int]:
+        """Return the rows of the cached vectors among text_hashes."""
+        rows = {}
+        for start in range(0, len(text_hashes), self.QUERY_CHUNK):
+            chunk = list(text_hashes[start:start + self.QUERY_CHUNK])
+            rows.update(self._conn.execute(
+                f"SELECT text_hash, row FROM embedding_rows WHERE model = ? "
+                f"AND text_hash IN ({','.join('?' * len(chunk))})", (model, *chunk)
+            ).fetchall())
+        return rows
+
+    def _file_name(self, model: str) -> str:
+        """Return a unique vector file name for a model."""
+        digest = hashlib.sha256(model.encode("utf-8")).hexdigest()[:12]
+        return f"{re.sub(r'[^A-Za-z0-9._-]', '_', model)[-64:]}_{digest}.{self.dtype}"
+
+    def _allocate_rows(self, model: str, model_info: Dict, count: int) -> List[int]:
+        """Take rows freed by eviction first, then rows at the end of the vector file."""
+        free_rows = [row[0] for row in self._conn.execute(
+            "SELECT row FROM embedding_free_rows WHERE model = ? ORDER BY row LIMIT ?", (model, count)
+        )]
+        self._conn.executemany("DELETE FROM embedding_free_rows WHERE model = ? AND row = ?",
+                               [(model, row) for row in free_rows])
+
+        next_row = model_info['next_row']
+        new_rows = list(range(next_row, next_row + count - len(free_rows)))
+        if new_rows:
+            model_info['next_row'] = new_rows[-1] + 1
+            self._conn.execute("UPDATE embedding_models SET next_row = ? WHERE model = ?",
+                               (model_info['next_row'], model))
+        return free_rows + new_rows
+
+    def _array(self, model: str, model_info: Dict, min_rows: int) -> np.memmap:
+        """Return the memory map of a model's vectors, growing the file to hold min_rows."""
+        array = self._arrays.get(model)
+        if array is not None and len(array) >= min_rows:
+            return array
+
+        path = os.path.join(self.cache_dir, model_info['file'])
+        dtype = np.dtype(model_info['dtype'])
+        row_bytes = model_info['dimension'] * dtype.itemsize
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size < min_rows * row_bytes:
+            capacity = max(min_rows, 2 * (size // row_bytes), self.INITIAL_ROWS)
+            with open(path, 'ab') as vector_file:
+                vector_file.truncate(capacity * row_bytes)
+            size = capacity * row_bytes
+
+        array = np.memmap(path, dtype=dtype, mode='r+', shape=(size // row_bytes, model_info['dimension']))
+        self._arrays[model] = array
+        return array
+
+    def _evict(self):
+        """Drop the least recently used entries until under the entry limit, freeing their rows."""
+        entries = self._conn.execute("SELECT COUNT(*) FROM embedding_rows").fetchone()[0]
+        if entries <= self.max_entries:
+            return
+
+        victims = self._conn.execute(
+            "SELECT model, text_hash, row FROM embedding_rows ORDER BY last_access ASC LIMIT ?",
+            (entries - self.max_entries,)
+        ).fetchall()
+        self._conn.executemany("DELETE FROM embedding_rows WHERE model = ? AND text_hash = ?",
+                               [(model, text_hash) for model, text_hash, _ in victims])
+        self._conn.executemany("INSERT OR IGNORE INTO embedding_free_rows (model, row) VALUES (?, ?)",
+                               [(model, row) for model, _, row in victims])
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings that answer from an EmbeddingCache and only run the model on new texts.
+
+    Query embeddings are cached separately from document embeddings, since some models
+    embed queries differently.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str, cache: Optional[EmbeddingCache] = None):
+        """
+        Initialize the CachedEmbeddings class.
+
+        Args:
+            embeddings (Embeddings): Embeddings that compute vectors on a cache miss
+            model_name (str): Name of the model, part of the cache key
+            cache (Optional[EmbeddingCache]): Vector cache. If not provided, the default on-disk cache is used.
+        """
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache or EmbeddingCache()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, running the model only on texts that are not cached."""
+        return self._embed(self.model_name, list(texts), self.embeddings.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, running the model only if it is not cached."""
+        return self._embed(f"{self.model_name}#query", [text],
+                           lambda texts: [self.embeddings.embed_query(texts[0])])[0]
+
+    def _embed(self, model: str, texts: List[str], compute) -> List[List[float]]:
+        """Return the vectors of texts from the cache, computing and storing the missing ones."""
+        text_hashes = [EmbeddingCache.text_hash(text) for text in texts]
+        vectors = self.cache.get_many(model, text_hashes)
+
+        missing = {text_hash: text for text_hash, text in zip(text_hashes, texts) if text_hash not in vectors}
+        if missing:
+            computed = compute(list(missing.values()))
+            vectors.update(self.cache.set_many(model, dict(zip(missing, computed))))
+
+        return [vectors[text_hash].tolist() for text_hash in text_hashes]
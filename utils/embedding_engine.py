@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from config.app_config import AppConfig
+
+# Embeddings of a worker process, created once by _init_worker
+_worker_embeddings: Optional[Embeddings] = None
+
+
+def _init_worker(factory: Callable[[], Embeddings], threads: int):
+    """Load the model once per worker process and share the CPU cores between workers."""
+    global _worker_embeddings
+    # Read by torch and OnnxEmbeddings when they are loaded, i.e. by the factory
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    _worker_embeddings = factory()
+    # The factory imports the backend, so torch is only loaded by now
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+
+def _embed_batch(texts: List[str]) -> List[List[float]]:
+    """Embed a batch of texts in a worker process."""
+    return _worker_embeddings.embed_documents(texts)
+
+
+class EmbeddingEngine(Embeddings):
+    """
+    Embedding stage for bulk ingests.
+
+    Texts are sorted by length and split into batches of ``batch_size``, so each batch
+    holds texts of similar length and the model pads them as little as possible. The
+    batches are embedded in-process or, with more than one worker, by a pool of worker
+    processes that each load the model once. Vectors are returned in the input order.
+
+    Without ``embeddings``, the in-process model is created by ``worker_factory`` on first
+    use, so constructing the engine does not load any model weights.
+    """
+
+    def __init__(self, embeddings: Optional[Embeddings] = None, batch_size: int = AppConfig.EMBEDDING_BATCH_SIZE,
+                 max_workers: int = AppConfig.EMBEDDING_WORKERS,
+                 worker_factory: Optional[Callable[[], Embeddings]] = None):
+        """
+        Initialize the EmbeddingEngine class.
+
+        Args:
+            embeddings (Optional[Embeddings]): Embeddings used in-process and for queries.
+                                    If not provided, they are created by worker_factory on first use.
+            batch_size (int): Number of texts per model call
+            max_workers (int): Number of worker processes (1 embeds in-process, 0 = one per CPU core)
+            worker_factory (Optional[Callable[[], Embeddings]]): Picklable callable that creates
+                                    the embeddings in a worker. Without it, texts are always
+                                    embedded in-process.
+        """
+        if embeddings is None and worker_factory is None:
+            raise ValueError("Either embeddings or a worker_factory is required")
+        self._embeddings = embeddings
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.worker_factory = worker_factory
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """The in-process embeddings, created on first access."""
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    self._embeddings = self.worker_factory()
+        return self._embeddings
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts in length-sorted batches.
+
+        Args:
+            texts (List[str]): Texts to embed
+
+        Returns:
+            List[List[float]]: One vector per text, in the order of texts
+        """
+        order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+        batches = [order[start:start + self.batch_size] for start in range(0, len(order), self.batch_size)]
+        batch_texts = [[texts[index] for index in batch] for batch in batches]
+
+        if self.worker_factory is not None and self.max_workers > 1 and len(batches) > 1:
+            results = self._pool().map(_embed_batch, batch_texts)
+        else:
+            results = (self.embeddings.embed_documents(batch) for batch in batch_texts)
+
+        vectors = [None] * len(texts)
+        for batch, batch_vectors in zip(batches, results):
+            for index, vector in zip(batch, batch_vectors):
+                vectors[index] = vector
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query in-process."""
+        return self.embeddings.embed_query(text)
+
+    def close(self):
+        """Shut down the worker processes; they are started again when needed."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """Return the worker pool, starting it on first use so the model loads once per worker."""
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers do not inherit the parent's threads (download pool, database clients)
+                context = multiprocessing.get_context("spawn")
+                threads = max(1, (os.cpu_count() or 1) // self.max_workers)
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                                     initializer=_init_worker,
+                                                     initargs=(self.worker_factory, threads))
+            return self._executor
@@ -10,6 +10,14 @@ class APIError(ResearchAgentError):
     """Exception raised for API-related errors"""
     pass
 
+class DownloadError(APIError):
+    """Exception raised when a paper download is aborted or rejected"""
+    pass
+
+class InvalidDownloadError(DownloadError):
+    """Exception raised when a download is not a usable PDF"""
+    pass
+
 class DatabaseError(ResearchAgentError):
     """Exception raised for database-related errors"""
     pass
@@ -0,0 +1,144 @@
+import importlib.util
+import os
+import re
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from config.app_config import AppConfig
+
+
+def mean_pool(hidden_states: np.ndarray, attention_mask: np.ndarray, normalize: bool = True) -> np.ndarray:
+    """
+    Average token embeddings over the non-padding tokens, as sentence-transformers does.
+
+    Args:
+        hidden_states (np.ndarray): Token embeddings of shape (batch, tokens, dimension)
+        attention_mask (np.ndarray): 1 for real tokens, 0 for padding, of shape (batch, tokens)
+        normalize (bool): Scale the sentence embeddings to unit length
+
+    Returns:
+        np.ndarray: Sentence embeddings of shape (batch, dimension)
+    """
+    mask = attention_mask[:, :, None].astype(np.float32)
+    pooled = (hidden_states * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    if normalize:
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+    return pooled
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    Sentence-transformer embeddings computed with ONNX Runtime on the CPU.
+
+    The model's ONNX export and tokenizer are taken from a local directory or downloaded
+    from the Hugging Face Hub, where sentence-transformers models publish them under
+    ``onnx/``. With ``quantized``, the weights are dynamically quantized to int8 once and
+    the result is kept in ``onnx_dir``. Token embeddings are mean-pooled over the
+    attention mask and normalized, matching the sentence-transformers pipeline.
+    """
+
+    MODEL_FILE = "onnx/model.onnx"
+    TOKENIZER_FILE = "tokenizer.json"
+
+    def __init__(self, model_name: str = AppConfig.DEFAULT_EMBEDDING_MODEL, quantized: bool = False,
+                 max_tokens: int = AppConfig.EMBEDDING_MAX_TOKENS, batch_size: int = AppConfig.EMBEDDING_BATCH_SIZE,
+                 normalize: bool = True, threads: int = 0, onnx_dir: str = AppConfig.EMBEDDING_ONNX_DIR):
+        """
+        Initialize the OnnxEmbeddings class.
+
+        Args:
+            model_name (str): Hugging Face model ID or a local directory with the same layout
+            quantized (bool): Run int8 dynamically quantized weights (requires the onnx package)
+            max_tokens (int): Texts are truncated to this many tokens
+            batch_size (int): Number of texts per inference call
+            normalize (bool): Scale the embeddings to unit length
+            threads (int): Intra-op threads of ONNX Runtime; 0 uses OMP_NUM_THREADS if set,
+                           otherwise ONNX Runtime chooses
+            onnx_dir (str): Directory holding quantized models
+        """
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("The ONNX embedding backend requires onnxruntime and tokenizers: "
+                              "pip install 'research-agent[onnx]'") from e
+
+        self.model_name = model_name
+        self.quantized = quantized
+        self.batch_size = max(1, batch_size)
+        self.normalize = normalize
+
+        model_path = self._model_file(self.MODEL_FILE)
+        if quantized:
+            model_path = self.quantize(model_path, os.path.join(
+                onnx_dir, f"{re.sub(r'[^A-Za-z0-9._-]', '_', model_name)}_int8.onnx"))
+
+        self.tokenizer = Tokenizer.from_file(self._model_file(self.TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=max_tokens)
+        padding = self.tokenizer.padding or {}
+        self.tokenizer.enable_padding(pad_id=padding.get('pad_id', 0), pad_token=padding.get('pad_token', '[PAD]'))
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = threads or int(os.environ.get("OMP_NUM_THREADS", "0") or 0)
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    @staticmethod
+    def quantize(model_path: str, output_path: str) -> str:
+        """
+        Quantize a model's weights to int8, unless a quantized copy already exists.
+
+        Args:
+            model_path (str): Path of the float32 ONNX model
+            output_path (str): Path of the quantized model
+
+        Returns:
+            str: output_path
+        """
+        if os.path.exists(output_path):
+            return output_path
+        if importlib.util.find_spec("onnx") is None:
+            raise ImportError("int8 quantization requires the onnx package: pip install 'research-agent[onnx-int8]'")
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        temp_path = f"{output_path}.{os.getpid()}.tmp"
+        quantize_dynamic(model_path, temp_path, weight_type=QuantType.QInt8)
+        os.replace(temp_path, output_path)
+        return output_path
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in batches of batch_size."""
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._embed(texts[start:start + self.batch_size]).tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query."""
+        return self._embed([text])[0].tolist()
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Tokenize a batch, run the model and pool its token embeddings."""
+        encodings = self.tokenizer.encode_batch(list(texts))
+        inputs = {
+            'input_ids': np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            'attention_mask': np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64),
+            'token_type_ids': np.array([encoding.type_ids for encoding in encodings], dtype=np.int64),
+        }
+        hidden_states = self.session.run(None, {name: value for name, value in inputs.items()
+                                                if name in self.input_names})[0]
+        return mean_pool(hidden_states, inputs['attention_mask'], self.normalize)
+
+    def _model_file(self, file_name: str) -> str:
+        """Return the path of a model file, downloading it from the Hub unless model_name is a directory."""
+        if os.path.isdir(self.model_name):
+            return os.path.join(self.model_name, file_name)
+        from huggingface_hub import hf_hub_download
+        return hf_hub_download(self.model_name, file_name)
+
@@ -0,0 +1,76 @@
+import json
+from typing import Any, Dict, Optional
+
+from config.app_config import AppConfig
+from utils.page_renderer import RenderSettings
+from utils.sqlite_cache import SqliteCache
+
+
+class PageImageCache(SqliteCache):
+    """
+    On-disk cache of rendered PDF pages.
+
+    Entries hold the encoded image bytes and are keyed by the PDF's content hash, the
+    page number and every setting that changes the rendered output, so a page is only
+    rasterized again when the file or the render settings change. The thumbnail
+    signatures used to find blank and duplicate pages are cached alongside.
+    """
+
+    def __init__(self, path: str = AppConfig.PAGE_CACHE_PATH,
+                 max_bytes: int = AppConfig.PAGE_CACHE_MAX_BYTES):
+        """
+        Initialize the PageImageCache class.
+
+        Args:
+            path (str): Path of the SQLite cache file
+            max_bytes (int): Maximum total size of cached images before LRU eviction
+        """
+        super().__init__(path, max_bytes=max_bytes)
+
+    @staticmethod
+    def make_key(pdf_hash: str, page_num: int, settings: RenderSettings) -> str:
+        """
+        Build the cache key of a rendered page.
+
+        Args:
+            pdf_hash (str): SHA-256 hex digest of the PDF file
+            page_num (int): Zero-based page number
+            settings (RenderSettings): Resolution and encoding the page was rendered with
+
+        Returns:
+            str: Key identifying the rendered page
+        """
+        return f"{pdf_hash}:{page_num}:{settings.cache_key}"
+
+    def get_page(self, pdf_hash: str, page_num: int, settings: RenderSettings) -> Optional[bytes]:
+        """Return the cached image of a page, or None on a cache miss."""
+        return self.get(self.make_key(pdf_hash, page_num, settings))
+
+    def set_page(self, pdf_hash: str, page_num: int, settings: RenderSettings, image: bytes):
+        """Store the encoded image of a page."""
+        self.set(self.make_key(pdf_hash, page_num, settings), image)
+
+
+    @staticmethod
+    def make_signature_key(pdf_hash: str, page_num: int, thumbnail_size: int) -> str:
+        """Build the cache key of a page's thumbnail signature."""
+        return f"{pdf_hash}:{page_num}:signature:{thumbnail_size}"
+
+    def get_signature(self, pdf_hash: str, page_num: int, thumbnail_size: int) -> Optional[Dict[str, Any]]:
+        """Return the cached signature of a page, or None on a cache miss."""
+        value = self.get(self.make_signature_key(pdf_hash, page_num, thumbnail_size))
+        if value is None:
+            return None
+        signature = json.loads(value)
+        return {
+            'page': page_num,
+            'ink_ratio': signature['ink_ratio'],
+            'dhash': int(signature['dhash'], 16),
+            'words': frozenset(signature['words']),
+        }
+
+    def set_signature(self, pdf_hash: str, page_num: int, thumbnail_size: int, signature: Dict[str, Any]):
+        """Store the signature of a page, as computed by page_renderer.page_signatures."""
+        value = {'ink_ratio': signature['ink_ratio'], 'dhash': format(signature['dhash'], 'x'),
+                 'words': sorted(signature['words'])}
+        self.set(self.make_signature_key(pdf_hash, page_num, thumbnail_size), json.dumps(value).encode('utf-8'))
@@ -0,0 +1,211 @@
+"""
+Page rendering functions executed in PDFProcessor's worker processes.
+
+This module is kept free of heavy imports so that spawning a worker stays cheap.
+"""
+import importlib.util
+import io
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+import fitz  # PyMuPDF
+
+IMAGE_FORMATS = ("png", "jpeg", "webp")
+# Gray level below which a thumbnail pixel counts as ink
+INK_THRESHOLD = 200
+# Grid of the difference hash, giving HASH_SIZE * HASH_SIZE bits
+HASH_SIZE = 16
+MIME_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+@dataclass(frozen=True)
+class RenderSettings:
+    """
+    Settings that determine how a page is rasterized and encoded.
+
+    Attributes:
+        image_format: Output encoding, one of "png", "jpeg" or "webp" (WebP requires Pillow)
+        quality: Encoder quality for JPEG and WebP (1-100), ignored for PNG
+        dpi: Rendering resolution (72 DPI = the page's size in points)
+        grayscale: Render without color
+        max_dimension: Upper bound for the longest edge in pixels, 0 for no limit
+    """
+    image_format: str = "png"
+    quality: int = 85
+    dpi: float = 144.0
+    grayscale: bool = False
+    max_dimension: int = 0
+
+    def __post_init__(self):
+        object.__setattr__(self, "image_format", self.image_format.lower().replace("jpg", "jpeg"))
+        if self.image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format: {self.image_format}")
+        if self.image_format == "webp" and importlib.util.find_spec("PIL") is None:
+            raise ImportError("WebP output requires Pillow: pip install 'research-agent[webp]'")
+
+    @property
+    def mime_type(self) -> str:
+        """MIME type of the encoded images."""
+        return MIME_TYPES[self.image_format]
+
+    @property
+    def cache_key(self) -> str:
+        """String identifying every setting that changes the encoded output."""
+        quality = 0 if self.image_format == "png" else self.quality
+        return f"{self.dpi:g}:{self.image_format}:{quality}:{int(self.grayscale)}:{self.max_dimension}"
+
+
+def page_count(pdf_path: str) -> int:
+    """Return the number of pages of a PDF."""
+    with fitz.open(pdf_path) as pdf_document:
+        return len(pdf_document)
+
+
+def page_texts(pdf_path: str, page_numbers: Sequence[int]) -> List[str]:
+    """Return the extracted text layer of pages of a PDF."""
+    with fitz.open(pdf_path) as pdf_document:
+        return [pdf_document.load_page(page_num).get_text("text").strip() for page_num in page_numbers]
+
+
+def classify_pages(pdf_path: str, page_numbers: Sequence[int], min_text_chars: int,
+                   min_image_area: float, min_drawings: int) -> List[Dict[str, Any]]:
+    """
+    Extract the text layer of pages and decide which of them need to be rasterized.
+
+    A page is visual when it has too little extractable text (e.g. a scanned page), when
+    embedded images cover a significant part of it, or when it contains vector figures
+    or tables. The checks run cheapest first and stop at the first that matches.
+
+    Args:
+        pdf_path: Path to the PDF file
+        page_numbers: Zero-based numbers of the pages to classify
+        min_text_chars: Pages with less extractable text are rasterized
+        min_image_area: Fraction of the page covered by images that makes it visual
+        min_drawings: Number of vector drawing paths that makes a page visual
+
+    Returns:
+        List[Dict]: Per page its number, extracted text, whether it is visual and why
+    """
+    pages = []
+
+    with fitz.open(pdf_path) as pdf_document:
+        for page_num in page_numbers:
+            page = pdf_document.load_page(page_num)
+            text = page.get_text("text").strip()
+            reason = None
+
+            if len(text) < min_text_chars:
+                reason = "no_text"
+            else:
+                page_area = abs(page.rect) or 1.0
+                image_area = sum(abs(fitz.Rect(info['bbox']) & page.rect) for info in page.get_image_info())
+                if image_area / page_area >= min_image_area:
+                    reason = "image"
+                else:
+                    drawings = page.get_drawings()
+                    if len(drawings) >= min_drawings:
+                        reason = "drawing"
+                    elif drawings and page.find_tables().tables:
+                        reason = "table"
+
+            pages.append({'page': page_num, 'text': text, 'visual': reason is not None, 'reason': reason})
+
+    return pages
+
+
+def page_signatures(pdf_path: str, page_numbers: Sequence[int], thumbnail_size: int) -> List[Dict[str, Any]]:
+    """
+    Compute cheap fingerprints of pages to detect blank and near-duplicate pages.
+
+    Each page is rendered to a small grayscale thumbnail, from which the fraction of ink
+    pixels and a difference hash (dHash) are taken. The words of the text layer are
+    included so that pages with a similar layout but different content can be told apart.
+
+    Args:
+        pdf_path: Path to the PDF file
+        page_numbers: Zero-based numbers of the pages
+        thumbnail_size: Longest edge of the thumbnail in pixels
+
+    Returns:
+        List[Dict]: Per page its number, ink ratio, dHash and set of words
+    """
+    signatures = []
+
+    with fitz.open(pdf_path) as pdf_document:
+        for page_num in page_numbers:
+            page = pdf_document.load_page(page_num)
+            zoom = thumbnail_size / max(page.rect.width, page.rect.height)
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY)
+            pixels = pix.samples
+            signatures.append({
+                'page': page_num,
+                'ink_ratio': sum(1 for value in pixels if value < INK_THRESHOLD) / max(1, len(pixels)),
+                'dhash': difference_hash(pixels, pix.width, pix.height),
+                'words': frozenset(page.get_text("text").lower().split()),
+            })
+
+    return signatures
+
+
+def difference_hash(pixels: bytes, width: int, height: int) -> int:
+    """Return the dHash of a grayscale image: whether each cell is brighter than its right neighbour."""
+    cells = []
+    for row in range(HASH_SIZE):
+        y0 = row * height // HASH_SIZE
+        y1 = max(y0 + 1, (row + 1) * height // HASH_SIZE)
+        for col in range(HASH_SIZE + 1):
+            x0 = col * width // (HASH_SIZE + 1)
+            x1 = max(x0 + 1, (col + 1) * width // (HASH_SIZE + 1))
+            total = sum(sum(pixels[y * width + x0:y * width + x1]) for y in range(y0, y1))
+            cells.append(total / ((y1 - y0) * (x1 - x0)))
+
+    value = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = cells[row * (HASH_SIZE + 1) + col]
+            value = (value << 1) | (left > cells[row * (HASH_SIZE + 1) + col + 1])
+    return value
+
+
+def render_pages(pdf_path: str, page_numbers: Sequence[int], settings: RenderSettings) -> List[bytes]:
+    """
+    Render pages of a PDF to encoded images.
+
+    Each call opens its own document, so it can safely run in a separate process.
+
+    Args:
+        pdf_path: Path to the PDF file
+        page_numbers: Zero-based numbers of the pages to render
+        settings: Resolution and encoding of the images
+
+    Returns:
+        List[bytes]: Encoded images, in the order of page_numbers
+    """
+    images = []
+    colorspace = fitz.csGRAY if settings.grayscale else fitz.csRGB
+
+    with fitz.open(pdf_path) as pdf_document:
+        for page_num in page_numbers:
+            page = pdf_document.load_page(page_num)
+            zoom = settings.dpi / 72
+            if settings.max_dimension:
+                # Downscale while rasterizing rather than resizing a larger image afterwards
+                zoom = min(zoom, settings.max_dimension / max(page.rect.width, page.rect.height))
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=colorspace)
+            images.append(encode_pixmap(pix, settings))
+
+    return images
+
+
+def encode_pixmap(pix: "fitz.Pixmap", settings: RenderSettings) -> bytes:
+    """Encode a rendered page in the configured image format."""
+    if settings.image_format == "png":
+        return pix.tobytes("png")
+    if settings.image_format == "jpeg":
+        return pix.tobytes("jpeg", jpg_quality=settings.quality)
+
+    from PIL import Image
+    image = Image.frombytes("L" if pix.n == 1 else "RGB", (pix.width, pix.height), pix.samples)
+    output = io.BytesIO()
+    image.save(output, format="WEBP", quality=settings.quality)
+    return output.getvalue()
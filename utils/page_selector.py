@@ -0,0 +1,104 @@
+from typing import List
+
+import numpy as np
+
+from config.app_config import AppConfig
+from utils.logger import Logger
+from utils import page_renderer
+
+# Number of characters of a page's text that is embedded, the embedding model truncates longer input anyway
+MAX_PAGE_CHARS = 2000
+
+
+class PageSelector:
+    """
+    Picks the pages of several PDFs that are most relevant to a research query.
+
+    Every page's text layer is embedded with the same model used for the vector database
+    and scored by cosine similarity to the query. The best pages of all documents share
+    one global page budget, and the first page of each paper (title and abstract) is
+    always kept. Pages without a text layer score like their document's average page.
+    """
+
+    def __init__(self, embeddings, page_budget: int = AppConfig.PAGE_BUDGET,
+                 max_scan_pages: int = AppConfig.PAGE_SELECTION_MAX_SCAN_PAGES):
+        """
+        Initialize the PageSelector class.
+
+        Args:
+            embeddings: LangChain embeddings providing embed_query and embed_documents
+            page_budget (int): Total number of pages selected across all documents
+            max_scan_pages (int): Maximum number of pages scored per PDF
+        """
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self.embeddings = embeddings
+        self.page_budget = page_budget
+        self.max_scan_pages = max_scan_pages
+
+    def select(self, query: str, pdf_paths: List[str]) -> List[List[int]]:
+        """
+        Select the pages to send for each PDF.
+
+        Args:
+            query (str): Research query the pages are scored against
+            pdf_paths (list): Paths to the PDF files
+
+        Returns:
+            list: For each PDF the zero-based numbers of the selected pages, most relevant
+                  first (the first page always leads)
+        """
+        scores = self.score_pages(query, pdf_paths)
+
+        # Each paper's first page is kept, the rest of the budget goes to the best pages overall
+        selected = [[0] if doc_scores.size else [] for doc_scores in scores]
+        candidates = sorted(
+            ((score, doc_index, page_num)
+             for doc_index, doc_scores in enumerate(scores)
+             for page_num, score in enumerate(doc_scores) if page_num > 0),
+            key=lambda candidate: (-candidate[0], candidate[1], candidate[2])
+        )
+        remaining = max(0, self.page_budget - sum(len(pages) for pages in selected))
+        for _, doc_index, page_num in candidates[:remaining]:
+            selected[doc_index].append(page_num)
+
+        for pdf_path, pages, doc_scores in zip(pdf_paths, selected, scores):
+            Logger.debug(self.logger, f"Selected {len(pages)} of {doc_scores.size} pages of {pdf_path}")
+        return selected
+
+    def score_pages(self, query: str, pdf_paths: List[str]) -> List[np.ndarray]:
+        """
+        Score every scanned page of each PDF by cosine similarity to the query.
+
+        Args:
+            query (str): Research query
+            pdf_paths (list): Paths to the PDF files
+
+        Returns:
+            list: One array of page scores per PDF
+        """
+        texts_per_doc = [
+            page_renderer.page_texts(pdf_path, range(min(page_renderer.page_count(pdf_path), self.max_scan_pages)))
+            for pdf_path in pdf_paths
+        ]
+        page_texts = [text[:MAX_PAGE_CHARS] for texts in texts_per_doc for text in texts if text]
+        if not page_texts:
+            return [np.zeros(len(texts)) for texts in texts_per_doc]
+
+        query_vector = self._normalize(np.asarray([self.embeddings.embed_query(query)], dtype=np.float32))[0]
+        page_vectors = self._normalize(np.asarray(self.embeddings.embed_documents(page_texts), dtype=np.float32))
+        similarities = iter(page_vectors @ query_vector)
+
+        scores = []
+        for texts in texts_per_doc:
+            doc_scores = np.array([next(similarities) if text else np.nan for text in texts], dtype=np.float32)
+            if np.isnan(doc_scores).any():
+                fill = np.nanmean(doc_scores) if not np.isnan(doc_scores).all() else 0.0
+                doc_scores = np.where(np.isnan(doc_scores), fill, doc_scores)
+            scores.append(doc_scores)
+        return scores
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """Scale vectors to unit length."""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
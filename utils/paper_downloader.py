@@ -1,36 +1,210 @@
 import os
 import sys
+import time
+import urllib.parse
+from typing import Optional, Tuple
+
 import requests
 
-from utils.error_handler import handle_exceptions, APIError
+from api.http_session import create_session, default_timeout
+from utils.circuit_breaker import CircuitBreaker
+from utils.download_manifest import DownloadManifest
+from utils.error_handler import handle_exceptions, APIError, DownloadError, InvalidDownloadError
 from utils.logger import Logger
+from utils.pdf_store import PdfStore
 from config.app_config import AppConfig
 
+# PDF files start with this marker, readers tolerate leading junk within the first KB
+PDF_MAGIC = b"%PDF-"
+PDF_HEADER_WINDOW = 1024
+# Generic binary types some servers use for PDFs; anything else must mention "pdf"
+GENERIC_CONTENT_TYPES = (
+    "application/octet-stream",
+    "binary/octet-stream",
+    "application/download",
+    "application/force-download",
+    "application/x-download",
+)
+# Client error statuses that say nothing about the URL itself and are worth retrying
+TRANSIENT_HTTP_STATUSES = (408, 429)
+
 
 class PaperDownloader:
     """Handles downloading and storing PDF files"""
     
-    def __init__(self, download_dir=AppConfig.PAPERS_DIR):
+    def __init__(self, download_dir=AppConfig.PAPERS_DIR,
+                 session: Optional[requests.Session] = None,
+                 timeout: Optional[Tuple[float, float]] = None,
+                 max_download_seconds: float = AppConfig.DOWNLOAD_TIMEOUT,
+                 store: Optional[PdfStore] = None,
+                 manifest: Optional[DownloadManifest] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 chunk_size: int = AppConfig.DOWNLOAD_CHUNK_SIZE,
+                 max_bytes: int = AppConfig.DOWNLOAD_MAX_BYTES):
+        """
+        Initialize the PaperDownloader class.
+
+        Args:
+            download_dir (str): Directory where PDF files are stored
+            session (requests.Session, optional): Pooled HTTP session to download with, e.g. the
+                                    one owned by SemanticScholarClient. A new one is created if omitted.
+            timeout (tuple, optional): (connect, read) timeout in seconds for every download
+            max_download_seconds (float): Maximum wall-clock time of a single download
+            store (PdfStore, optional): Content-addressed PDF store, by default one in download_dir
+            manifest (DownloadManifest, optional): Log of download attempts, by default one in download_dir
+            circuit_breaker (CircuitBreaker, optional): Per-host circuit breaker
+            chunk_size (int): Number of bytes read from the response at a time
+            max_bytes (int): Largest PDF accepted; bigger downloads are aborted
+        """
         self.logger = Logger.get_logger(self.__class__.__name__)
         self.download_dir = download_dir
+        self.session = session or create_session()
+        self.timeout = timeout or default_timeout()
+        self.max_download_seconds = max_download_seconds
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
         os.makedirs(self.download_dir, exist_ok=True)
+        self.store = store or PdfStore(self.download_dir)
+        self.manifest = manifest or DownloadManifest(os.path.join(self.download_dir, AppConfig.DOWNLOAD_MANIFEST_FILE))
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
 
     @handle_exceptions(error_type=APIError)
-    def download_paper(self, paper_metadata):
+    def download_paper(self, paper_metadata, deadline: Optional[float] = None):
+        """
+        Download the open access PDF of a paper and record its path in 'local_file_path'.
+
+        PDFs already in the store are not downloaded again, URLs that failed recently are
+        skipped during their cool-down, and hosts with an open circuit are not contacted.
+        Every attempt is recorded in the download manifest and every failure counts toward
+        the host's circuit, but only failures showing the URL is bad (4xx responses, content
+        that is not a PDF) start a cool-down for that URL. Downloads are written to a partial
+        file first; an interrupted download (timeout, server error, deadline) is resumed with
+        an HTTP Range request on the next attempt.
+
+        Args:
+            paper_metadata (dict): Paper details from the Semantic Scholar API
+            deadline (float, optional): time.monotonic() value after which the download is
+                                    aborted, in addition to the per-download time limit
+        """
         if 'openAccessPdf' in paper_metadata and 'url' in paper_metadata['openAccessPdf']:
             pdf_url = paper_metadata['openAccessPdf']['url']
-            paper_title = paper_metadata.get('title', 'paper').replace("/", "_").replace(":", "")  # Avoid invalid file characters
-            file_name = f"{paper_title}.pdf"
-            file_path = os.path.join(self.download_dir, file_name)
+            paper_id = paper_metadata.get('paperId') or \
+                paper_metadata.get('title', 'paper').replace("/", "_").replace(":", "")  # Avoid invalid file characters
             paper_metadata['local_file_path'] = ""
 
-            # Download the PDF
-            response = requests.get(pdf_url, stream=True)
-            response.raise_for_status()
+            # Skip the download when a valid copy is already stored
+            stored_path = self.store.lookup(paper_id)
+            if stored_path:
+                paper_metadata['local_file_path'] = stored_path
+                Logger.debug(self.logger, f"Already downloaded: {os.path.basename(stored_path)}")
+                return
+
+            # Do not retry known-bad URLs or hammer failing hosts
+            skip_reason = self.manifest.should_skip(pdf_url)
+            if skip_reason:
+                Logger.info(self.logger, f"Skipping {pdf_url}, failed recently: {skip_reason}")
+                return
+            host = urllib.parse.urlparse(pdf_url).netloc
+            if not self.circuit_breaker.allow(host):
+                Logger.info(self.logger, f"Skipping {pdf_url}, circuit open for {host}")
+                return
+
+            attempt = {'bytes_downloaded': 0, 'content_type': None, 'http_status': None}
+            start = time.monotonic()
+            try:
+                file_path, resume_from = self._download(pdf_url, paper_id, deadline, attempt)
+            except Exception as e:
+                self.circuit_breaker.record_failure(host)
+                self.manifest.record(pdf_url, False, latency=time.monotonic() - start, error=str(e),
+                                     permanent=self._is_permanent_failure(e), **attempt)
+                raise
+            self.circuit_breaker.record_success(host)
+            self.manifest.record(pdf_url, True, latency=time.monotonic() - start, **attempt)
 
-            # Write PDF to file
-            with open(file_path, 'wb') as pdf_file:
-                for chunk in response.iter_content(chunk_size=1024):
-                    pdf_file.write(chunk)
             paper_metadata['local_file_path'] = file_path
-            Logger.info(self.logger, f"Downloaded: {file_name}")
\ No newline at end of file
+            Logger.info(self.logger, f"Downloaded: {os.path.basename(file_path)}"
+                                     f"{f' (resumed at {resume_from} bytes)' if resume_from else ''}")
+
+    @staticmethod
+    def _is_permanent_failure(error: Exception) -> bool:
+        """Whether a failed download shows the URL is bad, rather than a transient or deadline failure."""
+        if isinstance(error, InvalidDownloadError):
+            return True
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            status = error.response.status_code
+            return 400 <= status < 500 and status not in TRANSIENT_HTTP_STATUSES
+        return False
+
+    def _download(self, pdf_url: str, paper_id: str, deadline: Optional[float], attempt: dict) -> Tuple[str, int]:
+        """
+        Stream a PDF into the store, filling ``attempt`` with the response details.
+
+        Returns:
+            tuple: (stored file path, offset the download was resumed at)
+        """
+        download_deadline = time.monotonic() + self.max_download_seconds
+        if deadline is not None:
+            download_deadline = min(download_deadline, deadline)
+
+        # Download the PDF, resuming a previously interrupted download
+        part_path = self.store.partial_path(paper_id)
+        resume_from = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        response = self._request_pdf(pdf_url, resume_from)
+        if resume_from and response.status_code == 416:
+            # The partial file does not match the remote file anymore, start over
+            response.close()
+            resume_from = 0
+            response = self._request_pdf(pdf_url, resume_from)
+        attempt['http_status'] = response.status_code
+        attempt['content_type'] = response.headers.get('Content-Type')
+
+        # The context manager returns the connection to the pool, also for error responses
+        with response:
+            response.raise_for_status()
+            if resume_from and response.status_code != 206:
+                # The server ignored the Range header and sent the whole file
+                resume_from = 0
+
+            # Reject landing pages and oversized files before reading the body
+            self._validate_headers(pdf_url, response, resume_from)
+
+            # Write PDF to the partial file
+            try:
+                with open(part_path, 'ab' if resume_from else 'wb') as pdf_file:
+                    size = resume_from
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        if time.monotonic() > download_deadline:
+                            raise DownloadError(f"Download timed out: {pdf_url}")
+                        if size == 0 and PDF_MAGIC not in chunk[:PDF_HEADER_WINDOW]:
+                            raise InvalidDownloadError(f"Not a PDF file: {pdf_url}")
+                        size += len(chunk)
+                        if size > self.max_bytes:
+                            raise InvalidDownloadError(f"PDF larger than {self.max_bytes} bytes: {pdf_url}")
+                        pdf_file.write(chunk)
+                        attempt['bytes_downloaded'] += len(chunk)
+            except InvalidDownloadError:
+                # Never resume from content that was rejected
+                os.remove(part_path)
+                raise
+
+        return self.store.commit(paper_id, part_path, pdf_url), resume_from
+
+    def _validate_headers(self, pdf_url: str, response: requests.Response, resume_from: int):
+        """
+        Reject a response by its headers before any of the body is downloaded.
+
+        Raises:
+            InvalidDownloadError: If the response is not a PDF or is too large
+        """
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type and 'pdf' not in content_type and content_type not in GENERIC_CONTENT_TYPES:
+            raise InvalidDownloadError(f"Unexpected content type {content_type}: {pdf_url}")
+
+        content_length = response.headers.get('Content-Length')
+        if content_length and content_length.isdigit() and resume_from + int(content_length) > self.max_bytes:
+            raise InvalidDownloadError(f"PDF larger than {self.max_bytes} bytes: {pdf_url}")
+
+    def _request_pdf(self, pdf_url: str, resume_from: int) -> requests.Response:
+        """Start a streaming PDF request, asking for the remaining bytes when resuming."""
+        headers = {"Range": f"bytes={resume_from}-"} if resume_from else None
+        return self.session.get(pdf_url, stream=True, timeout=self.timeout, headers=headers)
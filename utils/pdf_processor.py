@@ -1,37 +1,226 @@
-import os
 import base64
-from io import BytesIO
-from typing import List, Dict, Any
+import os
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
 import fitz  # PyMuPDF
 
 from config.app_config import AppConfig
 from utils.error_handler import handle_exceptions, ResearchAgentError
+from utils.logger import Logger
+from utils.page_image_cache import PageImageCache
+from utils.page_renderer import RenderSettings
+from utils.page_selector import PageSelector
+from utils.pdf_store import PdfStore
+from utils import page_renderer
+
+# Longest edge in pixels of the thumbnails used to find blank and duplicate pages
+THUMBNAIL_SIZE = 128
+
+
+class _WorkerPool:
+    """Spawned worker processes shared by the passes of one call, started on first use."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = None
+
+    def get(self, task_count: int) -> Optional[ProcessPoolExecutor]:
+        """Return the pool, or None when the tasks are better run in-process."""
+        if self.max_workers <= 1 or (task_count <= 1 and self._executor is None):
+            return None
+        if self._executor is None:
+            # Spawned workers do not inherit the parent's threads (download pool, database clients)
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def shutdown(self):
+        """Stop the workers, cancelling tasks that have not started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
 
 
 class PDFProcessor:
-    def __init__(self, max_pages_per_pdf: int = AppConfig.MAX_PAGES_PER_PDF):
+    def __init__(self, max_pages_per_pdf: int = AppConfig.MAX_PAGES_PER_PDF,
+                 max_workers: int = AppConfig.RENDER_WORKERS,
+                 pages_per_task: int = AppConfig.RENDER_PAGES_PER_TASK,
+                 image_format: str = AppConfig.RENDER_IMAGE_FORMAT,
+                 quality: int = AppConfig.RENDER_IMAGE_QUALITY,
+                 dpi: float = AppConfig.RENDER_DPI,
+                 grayscale: bool = AppConfig.RENDER_GRAYSCALE,
+                 max_dimension: int = AppConfig.RENDER_MAX_DIMENSION,
+                 page_cache: Optional[PageImageCache] = None,
+                 use_page_cache: bool = AppConfig.PAGE_CACHE_ENABLED,
+                 text_first: bool = AppConfig.PDF_TEXT_FIRST,
+                 page_selector: Optional[PageSelector] = None,
+                 byte_budget: int = AppConfig.PAGE_BYTE_BUDGET,
+                 drop_redundant_pages: bool = AppConfig.DROP_REDUNDANT_PAGES):
         """
         Initialize PDFProcessor.
 
         Args:
             max_pages_per_pdf (int): Maximum number of pages to process per PDF
+            max_workers (int): Number of worker processes rendering pages (1 renders in-process,
+                               0 uses one worker per CPU core)
+            pages_per_task (int): Number of consecutive pages rendered by one worker task
+            image_format (str): Image encoding, "png", "jpeg" or "webp" (WebP requires Pillow)
+            quality (int): JPEG/WebP encoder quality (1-100)
+            dpi (float): Rendering resolution
+            grayscale (bool): Render pages without color
+            max_dimension (int): Cap on the longest image edge in pixels, 0 for no cap
+            page_cache (Optional[PageImageCache]): Cache of rendered pages.
+                                    If not provided, the default on-disk cache is used.
+            use_page_cache (bool): Whether rendered pages are cached at all
+            text_first (bool): Send the text layer of plain text pages and rasterize only
+                               pages with visual content
+            page_selector (Optional[PageSelector]): Picks the pages most relevant to the query
+                                    under a global page budget. Without it, the first
+                                    max_pages_per_pdf pages of each PDF are used.
+            byte_budget (int): Maximum total size of the encoded images, 0 for no limit
+            drop_redundant_pages (bool): Leave out blank and near-duplicate pages
         """
         self.max_pages_per_pdf = max_pages_per_pdf
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pages_per_task = max(1, pages_per_task)
+        # Rendering tasks started ahead of the page being consumed
+        self.max_in_flight = 2 * self.max_workers
+        self.render_settings = RenderSettings(image_format=image_format, quality=quality, dpi=dpi,
+                                              grayscale=grayscale, max_dimension=max_dimension)
+        self.logger = Logger.get_logger(self.__class__.__name__)
+        self.page_cache = (page_cache or PageImageCache()) if use_page_cache else None
+        self.text_first = text_first
+        self.min_text_chars = AppConfig.TEXT_FIRST_MIN_TEXT_CHARS
+        self.min_image_area = AppConfig.TEXT_FIRST_MIN_IMAGE_AREA
+        self.min_drawings = AppConfig.TEXT_FIRST_MIN_DRAWINGS
+        self.page_selector = page_selector
+        self.byte_budget = byte_budget
+        self.drop_redundant_pages = drop_redundant_pages
+        self.blank_max_ink_ratio = AppConfig.BLANK_PAGE_MAX_INK_RATIO
+        self.duplicate_max_distance = AppConfig.DUPLICATE_PAGE_MAX_DISTANCE
+        self.duplicate_min_word_overlap = AppConfig.DUPLICATE_PAGE_MIN_WORD_OVERLAP
+        # Content hashes of PDFs by (path, size, modification time), computed once per file version
+        self._pdf_hashes = {}
+
+    @property
+    def mime_type(self) -> str:
+        """MIME type of the images produced by this processor."""
+        return self.render_settings.mime_type
 
     @handle_exceptions(error_type=ResearchAgentError, default_return=([], []))
-    def process_pdf_documents(self, documents: List[Dict[str, Any]]) -> tuple:
+    def process_pdf_documents(self, documents: List[Dict[str, Any]], query: Optional[str] = None) -> tuple:
         """
         Process PDF documents to extract metadata and convert pages to base64 images.
 
+        The metadata of each document includes the number of pages rendered and the
+        encoded size of its images in bytes. In text-first mode only pages with visual
+        content are rendered; the text of the other pages is added to the metadata as
+        'text'. The numbers of the rendered pages are added as 'image_pages'.
+
+        With a page selector and a query, the pages sent are the most relevant ones across
+        all documents instead of the first pages of each.
+
+        Pages are rendered lazily while the images are consumed, in parallel across worker
+        processes by document and page range, with a bounded number of tasks in flight.
+        Pages found in the page cache are not rendered again. The images are produced in
+        document and page order regardless of which worker finished first.
+
         Args:
             documents: List of document dictionaries from vector_db.query_vector_database
+            query: Research query used to select the most relevant pages
 
         Returns:
             tuple: (metadata_list, pdf_images) where metadata_list is a list of document metadata
-                  and pdf_images is a list of base64-encoded images of PDF pages
+                  and pdf_images is a generator of base64-encoded images of PDF pages. The
+                  page count and image bytes of each document are filled in as it is consumed.
+        """
+        metadata_list, pdf_paths = self._collect_documents(documents)
+        priorities = self._prioritize_pages(pdf_paths, query)
+
+        # One pool serves every pass; rendering shuts it down once the images are consumed
+        pool = _WorkerPool(self.max_workers)
+        try:
+            page_selection = [(pdf_path, sorted(pages)) for pdf_path, pages in zip(pdf_paths, priorities)]
+            if self.drop_redundant_pages:
+                page_selection = self._drop_redundant_pages(metadata_list, page_selection, pool)
+            if self.text_first:
+                page_selection = self._select_visual_pages(metadata_list, page_selection, pool)
+
+            if self.byte_budget:
+                # The budget needs the size of every page, so these pages are rendered up front
+                rendered = self._apply_byte_budget(self._render_documents(page_selection, pool), priorities)
+                page_selection = [(pdf_path, [page_num for page_num, _ in page_images])
+                                  for (pdf_path, _), page_images in zip(page_selection, rendered)]
+                page_images = ((doc_index, page_num, image)
+                               for doc_index, doc_images in enumerate(rendered) for page_num, image in doc_images)
+            else:
+                page_images = self._iter_rendered(page_selection, pool)
+        except BaseException:
+            pool.shutdown()
+            raise
+
+        for doc_info, (_, page_numbers) in zip(metadata_list, page_selection):
+            doc_info['image_pages'] = [page_num + 1 for page_num in page_numbers]
+            doc_info['page_count'] = 0
+            doc_info['image_bytes'] = 0
+
+        return metadata_list, self._stream_base64(metadata_list, page_images)
+
+    @handle_exceptions(error_type=ResearchAgentError, default_return=([], []))
+    def prepare_pdf_documents(self, documents: List[Dict[str, Any]], query: Optional[str] = None) -> tuple:
+        """
+        Prepare PDF documents to be attached to a model request as files instead of images.
+
+        Each PDF is trimmed to its selected pages (the most relevant ones with a page selector
+        and a query, otherwise the first max_pages_per_pdf pages). A PDF whose pages are all
+        selected is sent unchanged. The numbers of the pages kept and the size of the PDF are
+        added to the metadata as 'document_pages' and 'document_bytes'.
+
+        Args:
+            documents: List of document dictionaries from vector_db.query_vector_database
+            query: Research query used to select the most relevant pages
+
+        Returns:
+            tuple: (metadata_list, pdf_documents) where metadata_list is a list of document metadata
+                  and pdf_documents is a list of base64-encoded PDF files
+        """
+        metadata_list, pdf_paths = self._collect_documents(documents)
+        priorities = self._prioritize_pages(pdf_paths, query)
+
+        page_selection = [(pdf_path, sorted(pages)) for pdf_path, pages in zip(pdf_paths, priorities)]
+        if self.drop_redundant_pages:
+            pool = _WorkerPool(self.max_workers)
+            try:
+                page_selection = self._drop_redundant_pages(metadata_list, page_selection, pool)
+            finally:
+                pool.shutdown()
+
+        pdf_documents = []
+        for doc_info, (pdf_path, pages) in zip(metadata_list, page_selection):
+            pdf_bytes = self._trim_pdf(pdf_path, pages)
+            doc_info['document_pages'] = [page_num + 1 for page_num in pages]
+            doc_info['document_bytes'] = len(pdf_bytes)
+            pdf_documents.append(base64.b64encode(pdf_bytes).decode('utf-8'))
+            Logger.info(self.logger, f"Document {doc_info['document_number']}: {len(pages)} pages, "
+                                     f"{len(pdf_bytes) / 1024:.0f} KiB (pdf)")
+
+        return metadata_list, pdf_documents
+
+    def _collect_documents(self, documents: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Build the metadata of the documents whose PDF is available locally.
+
+        Args:
+            documents: List of document dictionaries from vector_db.query_vector_database
+
+        Returns:
+            tuple: (metadata_list, pdf_paths) for the documents with a local PDF
         """
         metadata_list = []
-        pdf_images = []
+        pdf_paths = []
 
         for i, doc in enumerate(documents, 1):
             metadata = doc.get('metadata', {})
@@ -50,47 +239,313 @@ class PDFProcessor:
             }
             metadata_list.append(doc_info)
 
-            # Convert PDF pages to images
-            page_images = self._pdf_to_base64_images(pdf_path)
-            pdf_images.extend(page_images)
+            pdf_paths.append(pdf_path)
+
+        return metadata_list, pdf_paths
+
+    def _prioritize_pages(self, pdf_paths: List[str], query: Optional[str]) -> List[List[int]]:
+        """Return the pages to send of each PDF in order of priority, the least important ones last."""
+        if self.page_selector is not None and query:
+            return self.page_selector.select(query, pdf_paths)
+        return [list(range(self._page_count(pdf_path))) for pdf_path in pdf_paths]
+
+    @staticmethod
+    def _trim_pdf(pdf_path: str, page_numbers: List[int]) -> bytes:
+        """Return the PDF reduced to the given pages, or the original file if nothing is removed."""
+        with fitz.open(pdf_path) as pdf_document:
+            if page_numbers == list(range(len(pdf_document))):
+                with open(pdf_path, 'rb') as pdf_file:
+                    return pdf_file.read()
+            pdf_document.select(page_numbers)
+            return pdf_document.tobytes(garbage=3, deflate=True)
 
-        return metadata_list, pdf_images
+    def _page_count(self, pdf_path: str) -> int:
+        """Return the number of pages of a PDF to process."""
+        return min(page_renderer.page_count(pdf_path), self.max_pages_per_pdf)
 
-    def _pdf_to_base64_images(self, pdf_path: str) -> List[str]:
+    def _pdf_hash(self, pdf_path: str) -> str:
+        """Return the content hash of a PDF, hashing each version of the file only once."""
+        stat = os.stat(pdf_path)
+        key = (pdf_path, stat.st_size, stat.st_mtime_ns)
+        if key not in self._pdf_hashes:
+            self._pdf_hashes[key] = PdfStore.file_hash(pdf_path)
+        return self._pdf_hashes[key]
+
+    def _drop_redundant_pages(self, metadata_list: List[Dict[str, Any]], page_selection: List[Tuple[str, List[int]]],
+                              pool: Optional[_WorkerPool] = None) -> List[Tuple[str, List[int]]]:
         """
-        Convert PDF pages to base64-encoded PNG images.
+        Leave out blank pages and pages that nearly duplicate a page kept before them.
+
+        A page is blank when almost none of its thumbnail is ink. A page is a duplicate
+        when its dHash is close to that of a kept page, of any document, and their words
+        largely overlap (e.g. repeated cover sheets and journal banners). The first page
+        of a document is always kept. The dropped page numbers are added to the metadata
+        as 'dropped_pages'. Signatures are kept in the page cache, so thumbnails are only
+        rasterized for pages not seen before.
 
         Args:
-            pdf_path: Path to the PDF file
+            metadata_list: Metadata of each document, updated in place
+            page_selection: Each PDF path with the numbers of its selected pages
+            pool: Worker processes to compute the signatures in
 
         Returns:
-            List[str]: List of base64-encoded PNG images, one per page
+            List[Tuple[str, List[int]]]: Each PDF with the numbers of its remaining pages
         """
-        base64_images = []
+        signatures_per_doc = [[] for _ in page_selection]
+        pdf_hashes = [None] * len(page_selection)
+        tasks = []
+        for doc_index, (pdf_path, selected_pages) in enumerate(page_selection):
+            missing = selected_pages
+            if self.page_cache is not None and selected_pages:
+                pdf_hashes[doc_index] = self._pdf_hash(pdf_path)
+                missing = []
+                for page_num in selected_pages:
+                    signature = self.page_cache.get_signature(pdf_hashes[doc_index], page_num, THUMBNAIL_SIZE)
+                    if signature is None:
+                        missing.append(page_num)
+                    else:
+                        signatures_per_doc[doc_index].append(signature)
+            for _, page_numbers, _ in self._page_tasks(pdf_path, missing):
+                tasks.append((doc_index, (pdf_path, page_numbers, THUMBNAIL_SIZE)))
 
-        # Open the PDF
-        pdf_document = fitz.open(pdf_path)
+        for (doc_index, _), signatures in zip(tasks, self._map(page_renderer.page_signatures,
+                                                               [task for _, task in tasks], pool)):
+            signatures_per_doc[doc_index].extend(signatures)
+            if pdf_hashes[doc_index] is not None:
+                for signature in signatures:
+                    self.page_cache.set_signature(pdf_hashes[doc_index], signature['page'], THUMBNAIL_SIZE, signature)
+        for signatures in signatures_per_doc:
+            signatures.sort(key=lambda signature: signature['page'])
 
-        # Limit the number of pages to process
-        page_count = min(len(pdf_document), self.max_pages_per_pdf)
+        kept_signatures = []
+        remaining_selection = []
+        for doc_info, (pdf_path, _), signatures in zip(metadata_list, page_selection, signatures_per_doc):
+            kept, blank, duplicate = [], [], []
+            for signature in signatures:
+                if signature['page'] != 0 and signature['ink_ratio'] <= self.blank_max_ink_ratio:
+                    blank.append(signature['page'])
+                elif signature['page'] != 0 and any(self._is_duplicate(signature, other) for other in kept_signatures):
+                    duplicate.append(signature['page'])
+                else:
+                    kept.append(signature['page'])
+                    kept_signatures.append(signature)
 
-        # Convert each page to a PNG image
-        for page_num in range(page_count):
-            page = pdf_document.load_page(page_num)
+            doc_info['dropped_pages'] = [page_num + 1 for page_num in sorted(blank + duplicate)]
+            if blank or duplicate:
+                Logger.info(self.logger, f"Document {doc_info['document_number']}: dropped {len(blank)} blank "
+                                         f"and {len(duplicate)} duplicate pages")
+            remaining_selection.append((pdf_path, kept))
 
-            # Set a reasonable resolution (higher values = better quality but larger files)
-            zoom = 2.0
-            mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat)
+        return remaining_selection
 
-            # Convert pixmap to PNG image
-            img_bytes = BytesIO(pix.pil_tobytes(format="PNG"))
+    def _is_duplicate(self, signature: Dict[str, Any], other: Dict[str, Any]) -> bool:
+        """Check whether two page signatures look alike and share most of their words."""
+        if bin(signature['dhash'] ^ other['dhash']).count("1") > self.duplicate_max_distance:
+            return False
+        words, other_words = signature['words'], other['words']
+        if not words and not other_words:
+            return True
+        return len(words & other_words) / len(words | other_words) >= self.duplicate_min_word_overlap
 
-            # Convert to base64
-            base64_image = base64.b64encode(img_bytes.getvalue()).decode('utf-8')
-            base64_images.append(base64_image)
+    def _select_visual_pages(self, metadata_list: List[Dict[str, Any]], page_selection: List[Tuple[str, List[int]]],
+                             pool: Optional[_WorkerPool] = None) -> List[Tuple[str, List[int]]]:
+        """
+        Classify the selected pages of each PDF, store the text of plain text pages in its
+        metadata and return the pages that still have to be rendered.
 
-        pdf_document.close()
+        Args:
+            metadata_list: Metadata of each document, updated in place
+            page_selection: Each PDF path with the numbers of its selected pages
+            pool: Worker processes to classify the pages in
 
-        return base64_images
+        Returns:
+            List[Tuple[str, List[int]]]: Each PDF with the numbers of its visual pages
+        """
+        tasks = []
+        for doc_index, (pdf_path, selected_pages) in enumerate(page_selection):
+            for _, page_numbers, _ in self._page_tasks(pdf_path, selected_pages):
+                tasks.append((doc_index, (pdf_path, page_numbers, self.min_text_chars,
+                                          self.min_image_area, self.min_drawings)))
+
+        pdf_paths = [pdf_path for pdf_path, _ in page_selection]
+        pages_per_doc = [[] for _ in pdf_paths]
+        for (doc_index, _), pages in zip(tasks, self._map(page_renderer.classify_pages, [task for _, task in tasks], pool)):
+            pages_per_doc[doc_index].extend(pages)
+
+        page_selection = []
+        for doc_info, pdf_path, pages in zip(metadata_list, pdf_paths, pages_per_doc):
+            visual_pages = [page['page'] for page in pages if page['visual']]
+            doc_info['text'] = "\n\n".join(
+                f"[Page {page['page'] + 1}]\n{page['text']}" for page in pages if not page['visual']
+            )
+            Logger.info(self.logger, f"Document {doc_info['document_number']}: {len(pages) - len(visual_pages)} "
+                                     f"text pages, {len(visual_pages)} visual pages")
+            page_selection.append((pdf_path, visual_pages))
+
+        return page_selection
+
+    def _render_documents(self, page_selection: List[Tuple[str, List[int]]],
+                          pool: Optional[_WorkerPool] = None) -> List[List[Tuple[int, bytes]]]:
+        """
+        Render selected pages of several PDFs into memory.
+
+        Args:
+            page_selection: Each PDF path with the zero-based numbers of the pages to render
+            pool: Worker processes to render in, shut down when done
+
+        Returns:
+            List[List[Tuple[int, bytes]]]: (page number, encoded image) pairs of each PDF,
+                                           in the order of its page numbers
+        """
+        rendered = [[] for _ in page_selection]
+        for doc_index, page_num, image in self._iter_rendered(page_selection, pool):
+            rendered[doc_index].append((page_num, image))
+        return rendered
+
+    def _iter_rendered(self, page_selection: List[Tuple[str, List[int]]],
+                       pool: Optional[_WorkerPool] = None) -> Iterator[Tuple[int, int, bytes]]:
+        """
+        Yield the encoded images of selected pages, answering from the page cache where possible.
+
+        Pages are rendered in page-range tasks. At most max_in_flight tasks are started ahead
+        of the page being yielded, so the images held in memory stay bounded no matter how
+        many pages are requested.
+
+        Args:
+            page_selection: Each PDF path with the zero-based numbers of the pages to render
+            pool: Worker processes to render in, shut down once every page is yielded
+                  (by default a new pool)
+
+        Yields:
+            Tuple[int, int, bytes]: Document index, page number and encoded image, in document
+                                    and page order
+        """
+        work = []
+        for doc_index, (pdf_path, page_numbers) in enumerate(page_selection):
+            pdf_hash = self._pdf_hash(pdf_path) if self.page_cache is not None and page_numbers else None
+            work.extend((doc_index, pdf_hash, task) for task in self._page_tasks(pdf_path, page_numbers))
+
+        pool = pool or _WorkerPool(self.max_workers)
+        pending = deque()
+        work_items = iter(work)
+
+        try:
+            executor = pool.get(len(work))
+            while True:
+                while len(pending) < self.max_in_flight:
+                    item = next(work_items, None)
+                    if item is None:
+                        break
+                    pending.append((*item, *self._start_task(executor, *item[1:])))
+                if not pending:
+                    break
+
+                doc_index, pdf_hash, (pdf_path, page_numbers, settings), images, missing, future = pending.popleft()
+                if missing:
+                    rendered = future.result() if future is not None else \
+                        page_renderer.render_pages(pdf_path, missing, settings)
+                    for page_num, image in zip(missing, rendered):
+                        images[page_num] = image
+                        # Remember the rendered page for the next run
+                        if pdf_hash is not None:
+                            self.page_cache.set_page(pdf_hash, page_num, settings, image)
+
+                for page_num in page_numbers:
+                    yield doc_index, page_num, images.pop(page_num)
+        finally:
+            pool.shutdown()
+
+    def _start_task(self, executor: Optional[ProcessPoolExecutor], pdf_hash: Optional[str],
+                    task: Tuple[str, List[int], RenderSettings]) -> Tuple[Dict[int, bytes], List[int], Optional[Future]]:
+        """
+        Look up the pages of a task in the page cache and submit the missing ones to the pool.
+
+        Returns:
+            tuple: (cached images by page number, page numbers still to render, the future
+                   rendering them or None when they are rendered in-process)
+        """
+        pdf_path, page_numbers, settings = task
+        images = {}
+        if pdf_hash is not None:
+            for page_num in page_numbers:
+                image = self.page_cache.get_page(pdf_hash, page_num, settings)
+                if image is not None:
+                    images[page_num] = image
+
+        missing = [page_num for page_num in page_numbers if page_num not in images]
+        future = None
+        if executor is not None and missing:
+            future = executor.submit(page_renderer.render_pages, pdf_path, missing, settings)
+        return images, missing, future
+
+    def _apply_byte_budget(self, rendered: List[List[Tuple[int, bytes]]],
+                           priorities: List[List[int]]) -> List[List[Tuple[int, bytes]]]:
+        """
+        Drop the least important rendered pages until the images fit the byte budget.
+
+        Pages are taken from the document with the most pages left, lowest priority first.
+        The first page of a document is never dropped.
+
+        Args:
+            rendered: (page number, encoded image) pairs of each PDF
+            priorities: Page numbers of each PDF, most important first
+
+        Returns:
+            List[List[Tuple[int, bytes]]]: The remaining pages of each PDF, in page order
+        """
+        kept = [dict(page_images) for page_images in rendered]
+        droppable = [[page_num for page_num in reversed(doc_priorities) if page_num in doc_images and page_num != 0]
+                     for doc_priorities, doc_images in zip(priorities, kept)]
+        total_bytes = sum(len(image) for doc_images in kept for image in doc_images.values())
+
+        while total_bytes > self.byte_budget and any(droppable):
+            doc_index = max(range(len(kept)), key=lambda index: (len(droppable[index]) > 0, len(kept[index])))
+            total_bytes -= len(kept[doc_index].pop(droppable[doc_index].pop(0)))
+
+        if total_bytes > self.byte_budget:
+            Logger.warning(self.logger, f"First pages alone take {total_bytes} bytes, over the budget of "
+                                        f"{self.byte_budget} bytes")
+        return [sorted(doc_images.items()) for doc_images in kept]
+
+    def _stream_base64(self, metadata_list: List[Dict[str, Any]],
+                       page_images: Iterator[Tuple[int, int, bytes]]) -> Iterator[str]:
+        """Base64-encode images one at a time for a model request, counting them per document."""
+        for doc_index, _, image in page_images:
+            metadata_list[doc_index]['page_count'] += 1
+            metadata_list[doc_index]['image_bytes'] += len(image)
+            yield base64.b64encode(image).decode('utf-8')
+
+        self._log_byte_report(metadata_list)
+
+    def _page_tasks(self, pdf_path: str, page_numbers: List[int]) -> List[Tuple[str, List[int], RenderSettings]]:
+        """Split the pages to render of a PDF into (pdf_path, page_numbers, settings) tasks."""
+        return [
+            (pdf_path, page_numbers[start:start + self.pages_per_task], self.render_settings)
+            for start in range(0, len(page_numbers), self.pages_per_task)
+        ]
+
+    def _map(self, function: Callable, tasks: List[tuple], pool: Optional[_WorkerPool] = None) -> List[Any]:
+        """
+        Run page tasks, in worker processes when there is more than one, keeping task order.
+
+        The workers of pool are reused and left running; without a pool, one is started
+        for these tasks only.
+        """
+        own_pool = pool is None
+        pool = pool or _WorkerPool(self.max_workers)
+        try:
+            executor = pool.get(len(tasks))
+            if executor is None or not tasks:
+                return [function(*task) for task in tasks]
+            return list(executor.map(function, *zip(*tasks)))
+        finally:
+            if own_pool:
+                pool.shutdown()
 
+    def _log_byte_report(self, metadata_list: List[Dict[str, Any]]):
+        """Log the number of pages and encoded image bytes of each document."""
+        for doc_info in metadata_list:
+            Logger.info(self.logger, f"Document {doc_info['document_number']}: {doc_info['page_count']} pages, "
+                                     f"{doc_info['image_bytes'] / 1024:.0f} KiB ({self.render_settings.image_format})")
+        total_bytes = sum(doc_info['image_bytes'] for doc_info in metadata_list)
+        Logger.info(self.logger, f"Rendered {len(metadata_list)} documents to {total_bytes / 1024:.0f} KiB of images")
@@ -0,0 +1,141 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+
+class PdfStore:
+    """
+    Content-addressed store for downloaded PDFs.
+
+    Each PDF is stored as ``<paperId>_<sha256 prefix>.pdf`` and recorded in an index
+    file mapping the paper ID to its file, size and full content hash. Files are first
+    written to a partial file and atomically renamed into place once complete, so a
+    crash never leaves a truncated PDF under a final name.
+    """
+
+    INDEX_FILE = "index.json"
+    PARTIAL_DIR = ".partial"
+    HASH_PREFIX_LENGTH = 16
+
+    def __init__(self, store_dir: str):
+        """
+        Initialize the PdfStore class.
+
+        Args:
+            store_dir (str): Directory holding the PDFs and the index file
+        """
+        self.store_dir = store_dir
+        self.index_path = os.path.join(store_dir, self.INDEX_FILE)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(store_dir, self.PARTIAL_DIR), exist_ok=True)
+        self._index = self._load_index()
+
+    @staticmethod
+    def safe_name(paper_id: str) -> str:
+        """Turn a paper ID into a string that is safe to use in a file name."""
+        return re.sub(r'[^A-Za-z0-9._-]', '_', paper_id)
+
+    def lookup(self, paper_id: str, verify: bool = False) -> Optional[str]:
+        """
+        Return the path of a stored copy of a paper's PDF.
+
+        Args:
+            paper_id (str): Semantic Scholar paper ID
+            verify (bool): Re-hash the file instead of only checking its size
+
+        Returns:
+            Optional[str]: Path of a valid copy, or None if the paper has to be downloaded
+        """
+        with self._lock:
+            entry = self._index.get(paper_id)
+        if entry is None:
+            return self._recover(paper_id)
+
+        file_path = os.path.join(self.store_dir, entry['file'])
+        if not os.path.exists(file_path) or os.path.getsize(file_path) != entry['size']:
+            return None
+        if verify and self.file_hash(file_path) != entry['sha256']:
+            return None
+        return file_path
+
+    def partial_path(self, paper_id: str) -> str:
+        """Return the path an in-progress download of the paper is written to."""
+        return os.path.join(self.store_dir, self.PARTIAL_DIR, f"{self.safe_name(paper_id)}.part")
+
+    def commit(self, paper_id: str, temp_path: str, url: str = "") -> str:
+        """
+        Move a completed download into the store and record it in the index.
+
+        Args:
+            paper_id (str): Semantic Scholar paper ID
+            temp_path (str): Path of the completed download
+            url (str): URL the PDF was downloaded from
+
+        Returns:
+            str: Final path of the stored PDF
+        """
+        sha256 = self.file_hash(temp_path)
+        file_name = f"{self.safe_name(paper_id)}_{sha256[:self.HASH_PREFIX_LENGTH]}.pdf"
+        file_path = os.path.join(self.store_dir, file_name)
+        os.replace(temp_path, file_path)
+
+        entry = {
+            'file': file_name,
+            'sha256': sha256,
+            'size': os.path.getsize(file_path),
+            'url': url,
+            'stored_at': int(time.time()),
+        }
+        with self._lock:
+            # Merge with entries other processes may have written in the meantime
+            self._index = {**self._load_index(), **self._index, paper_id: entry}
+            self._save_index()
+        return file_path
+
+    @staticmethod
+    def file_hash(file_path: str) -> str:
+        """Return the SHA-256 hex digest of a file's content."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as stored_file:
+            for block in iter(lambda: stored_file.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _recover(self, paper_id: str) -> Optional[str]:
+        """Re-index a stored copy that is missing from the index, e.g. written by another process."""
+        pattern = os.path.join(self.store_dir, f"{glob.escape(self.safe_name(paper_id))}_*.pdf")
+        for file_path in glob.glob(pattern):
+            sha256 = self.file_hash(file_path)
+            if os.path.basename(file_path) != f"{self.safe_name(paper_id)}_{sha256[:self.HASH_PREFIX_LENGTH]}.pdf":
+                continue
+            with self._lock:
+                self._index[paper_id] = {
+                    'file': os.path.basename(file_path),
+                    'sha256': sha256,
+                    'size': os.path.getsize(file_path),
+                    'url': '',
+                    'stored_at': int(time.time()),
+                }
+                self._save_index()
+            return file_path
+        return None
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """Read the index file, treating a missing or unreadable index as empty."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as index_file:
+                return json.load(index_file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        """Write the index atomically."""
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as index_file:
+            json.dump(self._index, index_file, indent=1, sort_keys=True)
+        os.replace(temp_path, self.index_path)
@@ -0,0 +1,172 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class SqliteCache:
+    """
+    Persistent key/value cache stored in a single SQLite file.
+
+    Entries carry an optional expiry time and a last-access timestamp. When the total
+    size of the stored values exceeds ``max_bytes``, the least recently used entries
+    are evicted. The total size is kept up to date by triggers in a one-row table, so
+    storing a value does not scan the cache. Hit and miss counters are kept for the lifetime of the instance.
+    The cache is safe to share between threads.
+    """
+
+    def __init__(self, path: str, max_bytes: int, default_ttl: Optional[float] = None):
+        """
+        Initialize the SqliteCache class.
+
+        Args:
+            path (str): Path of the SQLite file, created if it does not exist
+            max_bytes (int): Maximum total size of the cached values before LRU eviction
+            default_ttl (float, optional): Default time-to-live in seconds, None for no expiry
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache_entries (last_access)")
+        self._conn.commit()
+        self._create_size_table()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Look up a cached value and mark it as recently used.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Optional[bytes]: The cached value, or None if it is missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE cache_entries SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return bytes(row[0])
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        """
+        Store a value, evicting least recently used entries if the size cap is exceeded.
+
+        Args:
+            key (str): Cache key
+            value (bytes): Value to store
+            ttl (float, optional): Time-to-live in seconds, defaults to ``default_ttl``
+        """
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO cache_entries (key, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                "expires_at = excluded.expires_at, last_access = excluded.last_access",
+                (key, sqlite3.Binary(value), len(value), expires_at, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def delete(self, key: str):
+        """Remove a single entry from the cache."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return cache statistics.
+
+        Returns:
+            dict: Hits, misses, hit rate, number of entries and total size in bytes
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+            total_bytes = self._total_bytes()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes': total_bytes,
+        }
+
+    def close(self):
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _create_size_table(self):
+        """Create the running total of the value sizes and the triggers maintaining it."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), "
+                               "total INTEGER NOT NULL)")
+            self._conn.execute("CREATE TRIGGER IF NOT EXISTS cache_size_insert AFTER INSERT ON cache_entries "
+                               "BEGIN UPDATE cache_size SET total = total + NEW.size WHERE id = 0; END")
+            self._conn.execute("CREATE TRIGGER IF NOT EXISTS cache_size_update AFTER UPDATE OF size ON cache_entries "
+                               "BEGIN UPDATE cache_size SET total = total - OLD.size + NEW.size WHERE id = 0; END")
+            self._conn.execute("CREATE TRIGGER IF NOT EXISTS cache_size_delete AFTER DELETE ON cache_entries "
+                               "BEGIN UPDATE cache_size SET total = total - OLD.size WHERE id = 0; END")
+            if self._conn.execute("SELECT 1 FROM cache_size WHERE id = 0").fetchone() is None:
+                # New cache file, or one written before the total was kept: count it once
+                self._conn.execute("INSERT INTO cache_size (id, total) "
+                                   "SELECT 0, COALESCE(SUM(size), 0) FROM cache_entries")
+            self._conn.commit()
+
+    def _total_bytes(self) -> int:
+        """Return the total size of the stored values."""
+        return self._conn.execute("SELECT total FROM cache_size WHERE id = 0").fetchone()[0]
+
+    def _evict(self, now: float):
+        """Drop expired entries, then the least recently used ones until under the size cap."""
+        if self._total_bytes() <= self.max_bytes:
+            return
+        self._conn.execute("DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        total_bytes = self._total_bytes()
+        if total_bytes <= self.max_bytes:
+            return
+
+        excess = total_bytes - self.max_bytes
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM cache_entries ORDER BY last_access ASC"):
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+        self._conn.executemany("DELETE FROM cache_entries WHERE key = ?", victims)